@@ -0,0 +1,165 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compare the class list computation of DependencyLoader.classlistFromInclude
+# against the former recursive implementation, on synthetic class graphs:
+#
+# - "random": <num> classes with a few load and run deps each
+# - "chain":  <num> classes, each with a load dep to the next one
+#
+# The deps of the classes are precomputed, so this measures the closure walk
+# alone. With -p, the class lists of the "random" graph are also computed for
+# as many parts, each including a tenth of the classes, which shows the effect
+# of the memoized class deps. The graphs are generated with 1000 classes, and
+# with <num> classes; the recursive walk fails where the recursion limit of
+# the generator is exceeded.
+#
+# Usage: bench-deploader.py [-n <num>] [-p <parts>]
+##
+
+import sys, os, time, random, optparse
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime.Log import Log
+from generator.code.DependencyItem import DependencyItem
+from generator.code.DependencyLoader import DependencyLoader
+
+class FakeLibrary(object):
+    namespace = "bench"
+
+class FakeClass(object):
+    library = FakeLibrary()
+
+    def __init__(self, id, load, run):
+        self.id = id
+        self.load = [DependencyItem(x, '', id, isLoadDep=True) for x in load]
+        self.run = [DependencyItem(x, '', id) for x in run]
+
+    def getCombinedDeps(self, classesAll, variants, config):
+        return {"load" : self.load, "run" : self.run, "ignore" : []}, True
+
+    def dependenciesCached(self, variants):
+        return True
+
+def randomGraph(num):
+    names = ["bench.C%d" % i for i in range(num)]
+    classes = {}
+    for i, name in enumerate(names):
+        load = random.sample(names[:i], min(i, random.randint(0, 3)))  # acyclic
+        run = random.sample(names, random.randint(0, 4))
+        classes[name] = FakeClass(name, load, run)
+    return classes
+
+def chainGraph(num):
+    names = ["bench.C%d" % i for i in range(num)]
+    classes = {}
+    for i, name in enumerate(names):
+        classes[name] = FakeClass(name, names[i+1:i+2], [])
+    return classes
+
+##
+# The recursive closure walk DependencyLoader used before (without the lint
+# and warning handling, which the fake classes don't need)
+def classlistRecursive(classesObj, includeWithDeps, excludeWithDeps, variants):
+
+    def classlistFromClassRecursive(depsItem, result, loadDepsChain):
+        if depsItem.name in excludeWithDeps:
+            return
+        if depsItem.name in resultNames:
+            return
+        deps, cached = classesObj[depsItem.name].getCombinedDeps(classesObj, variants, {})
+        skipNames = [x.name for x in deps["ignore"]]
+        loadDepsChain.append(depsItem.name)
+        for subitem in deps["load"]:
+            if subitem.name in loadDepsChain:
+                raise RuntimeError("Circular class dependencies")
+            if subitem.name not in resultNames and subitem.name not in skipNames:
+                classlistFromClassRecursive(subitem, result, loadDepsChain)
+        if depsItem.name not in resultNames:
+            result.append(depsItem)
+            resultNames.append(depsItem.name)
+        loadDepsChain.remove(depsItem.name)
+        for subitem in deps["run"]:
+            if subitem.name not in resultNames and subitem.name not in skipNames:
+                classlistFromClassRecursive(subitem, result, [])
+
+    result = []
+    resultNames = []
+    for item in includeWithDeps:
+        classlistFromClassRecursive(DependencyItem(item, '', '|config|'), result, [])
+    return [x.name for x in result]
+
+def newLoader(classesObj):
+    return DependencyLoader(classesObj, None, Context.console, {}, {}, {'jobconf' : Context.jobconf})
+
+def measure(fn):
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")  # progress output of the loader
+    t0 = time.time()
+    try:
+        try:
+            result = fn()
+        except RuntimeError:  # maximum recursion depth exceeded
+            return None, "failed"
+    finally:
+        sys.stdout = stdout
+    return result, "%.3fs" % (time.time() - t0)
+
+def main():
+    sys.setrecursionlimit(3500)  # like generator.py
+    parser = optparse.OptionParser(usage="%prog [-n <num>] [-p <parts>]")
+    parser.add_option("-n", dest="num", type="int", default=10000, help="number of classes (default: 10000)")
+    parser.add_option("-p", dest="parts", type="int", default=10, help="number of parts (default: 10)")
+    options, args = parser.parse_args()
+
+    Context.console = Log()
+    Context.console.setLevel("warning")
+    Context.jobconf = ExtMap({"compile-options" : {"code" : {"lint-check" : False, "jobs" : 1}}})
+    random.seed(0)
+
+    for num in sorted(set([min(1000, options.num), options.num])):
+        for graphName, graphFn in (("random", randomGraph), ("chain", chainGraph)):
+            classesObj = graphFn(num)
+            includes = ["bench.C0"] if graphName == "chain" else sorted(classesObj)[:10]
+            old, oldTime = measure(lambda: classlistRecursive(classesObj, includes, [], {}))
+            new, newTime = measure(lambda: newLoader(classesObj).classlistFromInclude(includes, [], {}))
+            report(graphName, "%d classes" % len(new), oldTime, newTime, old, new)
+
+            if graphName == "random" and options.parts:
+                partIncludes = [sorted(classesObj)[i::options.parts][:num / 10] for i in range(options.parts)]
+                def oldParts():
+                    return [classlistRecursive(classesObj, x, [], {}) for x in partIncludes]
+                def newParts():
+                    loader = newLoader(classesObj)
+                    return [loader.classlistFromInclude(x, [], {}) for x in partIncludes]
+                old, oldTime = measure(oldParts)
+                new, newTime = measure(newParts)
+                report(graphName, "%d parts" % options.parts, oldTime, newTime, old, new)
+
+def report(graphName, what, oldTime, newTime, old, new):
+    print "%-7s %-14s recursive: %-10s iterative: %s%s" % (graphName, what, oldTime, newTime,
+        "" if old is None or old == new else "  (DIFFERENT RESULTS)")
+
+if __name__ == '__main__':
+    main()
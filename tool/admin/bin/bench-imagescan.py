@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Time the resource scan of a library over the framework's icon themes
+# (or the given resource folder of the framework):
+#
+# - "serial":  every image analyzed in turn, as on the first run
+# - "threads": every image analyzed, using <jobs> threads
+# - "index":   the image metadata index in the cache is current, so no image
+#              is analyzed (the index is read from disk, as in a new run)
+#
+# The directory listing is taken before, so this measures the creation and
+# the analysis of the resources alone. Prints the time taken and a digest of
+# the image infos, so the runs can be compared.
+#
+# Usage: bench-imagescan.py [-j <jobs>] [<resource path>]
+##
+
+import sys, os, time, shutil, tempfile, optparse
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc import securehash as sha
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime import Cache as CacheModule
+from generator.runtime.Cache import Cache
+from generator.runtime.InterruptRegistry import InterruptRegistry
+from generator.runtime.Log import Log
+from generator.resource.Library import Library
+from generator.resource.Image import Image
+
+frameworkManifest = os.path.join(scriptDir, "../../../framework/Manifest.json")
+
+def newLibrary(resourcePath):
+    lib = Library(unicode(os.path.abspath(frameworkManifest)), Context.console)  # like from the config
+    lib._init_from_manifest()
+    lib.resourcePath = lib.assets["resources"]["path"] = resourcePath
+    lib._snapshot("resources")
+    return lib
+
+def measure(resourcePath):
+    lib = newLibrary(resourcePath)
+    t0 = time.time()
+    resources = lib._scanResourcePath()
+    elapsed = time.time() - t0
+    images = sorted((x.id, x.width, x.height, x.format) for x in resources if isinstance(x, Image))
+    return len(images), elapsed, sha.getHash(repr(images))[:12]
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-j <jobs>] [<resource path>]")
+    parser.add_option("-j", dest="jobs", type="int", default=0, help="number of threads (default: one per CPU)")
+    options, args = parser.parse_args()
+    resourcePath = unicode(args[0] if args else "source/resource/qx/icon")
+
+    Context.console = Log()
+    Context.console.setLevel("warning")
+    tempDir = tempfile.mkdtemp()
+    try:
+        for name, jobs, cache in (("serial", 1, False), ("threads", options.jobs, False), ("index", 1, True)):
+            Context.jobconf = ExtMap({"compile-options" : {"code" : {"jobs" : jobs}}})
+            Context.cache = None
+            if cache:
+                Context.cache = Cache(os.path.join(tempDir, "cache"),
+                    **{'interruptRegistry' : InterruptRegistry(), 'console' : Context.console})
+                measure(resourcePath)  # fill the index
+                CacheModule.memcache.clear()
+            num, elapsed, digest = measure(resourcePath)
+            print "%-8s %d images in %.3fs (result %s)" % (name, num, elapsed, digest)
+    finally:
+        shutil.rmtree(tempDir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compare the decoding of the JSON files of the SDK: demjson (the former way
+# of misc.json) against misc.json.loadStripComments, the first time and with
+# the decoded files in its cache.
+#
+# Reads the configs of the tool, the framework and the applications, all
+# Manifest.json files, and the .meta files of the framework's combined images
+# (or the .json and .meta files under the given paths). The results are
+# compared, and differences reported.
+#
+# Usage: bench-json.py [-r <rounds>] [<path>...]
+##
+
+import sys, os, time, codecs, optparse
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+import demjson
+from misc import json
+
+sdkDir = os.path.normpath(os.path.join(scriptDir, "../../.."))
+
+def sdkFiles():
+    for path in ("tool/data/config", "framework", "application", "component"):
+        for root, dirs, files in os.walk(os.path.join(sdkDir, path)):
+            dirs[:] = sorted(x for x in dirs if x not in ("build", "source", "test", ".git") or
+                root.endswith("framework"))
+            for f in sorted(files):
+                if f.endswith(".json"):
+                    yield os.path.join(root, f)
+    for root, dirs, files in os.walk(os.path.join(sdkDir, "framework/source/resource")):
+        for f in sorted(files):
+            if f.endswith(".meta"):
+                yield os.path.join(root, f)
+
+def pathFiles(paths):
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for f in sorted(files):
+                if f.endswith((".json", ".meta")):
+                    yield os.path.join(root, f)
+
+def measure(fn, files, rounds):
+    t0 = time.time()
+    for _ in range(rounds):
+        result = []
+        for path in files:
+            try:
+                result.append(fn(path))
+            except ValueError:
+                result.append(None)
+    return result, time.time() - t0
+
+def demjsonLoad(path):
+    return demjson.decode(codecs.open(path, "r", "utf-8").read())
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-r <rounds>] [<path>...]")
+    parser.add_option("-r", dest="rounds", type="int", default=3, help="number of rounds (default: 3)")
+    options, args = parser.parse_args()
+
+    files = list(pathFiles(args) if args else sdkFiles())
+    size = sum(os.path.getsize(x) for x in files)
+    print "%d files, %d KB, %d rounds" % (len(files), size / 1024, options.rounds)
+
+    old, oldTime = measure(demjsonLoad, files, options.rounds)
+    json._stripped.clear()
+    new, newTime = measure(json.loadStripComments, files, 1)
+    _, cachedTime = measure(json.loadStripComments, files, options.rounds)
+    newTime += cachedTime
+    json._stripped.clear()
+    fast, fastTime = measure(json.loadStripComments, files, 1)  # first loads only
+    fastTime *= options.rounds
+
+    print "demjson:   %.3fs" % oldTime
+    print "fast path: %.3fs" % fastTime
+    print "cached:    %.3fs (one first load, then from the cache)" % newTime
+    for path, x, y in zip(files, old, new):
+        if repr(x) != repr(y):
+            print "DIFFERENT RESULT: %s" % path
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compare the optimizations of the framework classes (or the .js files under
+# the given paths) run one after another, each with its own walks over the
+# tree (the former way of MClassCode.optimize), against the optimizer
+# pipeline (ecmascript.transform.optimizer.pipeline), which combines them in
+# as few walks as possible. Both have to yield the same code.
+#
+# The optimizations are those of a build ("comments", "variants", "basecalls",
+# "privates", "strings", "variables"); the ones that work on the scopes of
+# the tree ("strings", "variables") are not combined, and only timed.
+#
+# Usage: bench-optimizer.py [-n <max. number of files>] [<path>...]
+##
+
+import sys, os, time, optparse
+import cPickle as pickle
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc import filetool
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime.Log import Log
+from ecmascript.frontend import tokenizer, treegenerator, treecodec
+from ecmascript.frontend.treegenerator import PackerFlags as pp
+from ecmascript.transform.check import scopes, load_time, jshints
+from ecmascript.transform.optimizer import commentoptimizer, variantoptimizer, basecalloptimizer
+from ecmascript.transform.optimizer import privateoptimizer, stringoptimizer, variableoptimizer
+from ecmascript.transform.optimizer import pipeline
+
+VARIANTS = {"qx.debug" : False, "qx.debug.dispose" : False, "qx.aspects" : False,
+            "qx.dynlocale" : True, "qx.promise" : True}
+
+def parse(path):
+    tokens = tokenizer.Tokenizer().parseStream(filetool.read(path), path)
+    tree = treegenerator.createFileTree(tokens, path)
+    tree = scopes.create_scopes(tree)
+    load_time.load_time_check(tree.scope)
+    return jshints.create_hints_tree(tree)
+
+##
+# The tree as a string, to get copies of it
+def dumps(tree):
+    try:
+        return treecodec.dumps(tree)
+    except treecodec.TreeCodecError:
+        return pickle.dumps(tree, 2)
+
+def loads(blob):
+    if treecodec.isEncoded(blob):
+        return treecodec.loads(blob)
+    return pickle.loads(blob)
+
+def jsFiles(paths):
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for f in sorted(files):
+                if f.endswith(".js"):
+                    yield os.path.join(root, f)
+
+def timed(times, name, fn, *args):
+    t0 = time.time()
+    result = fn(*args)
+    times[name] = times.get(name, 0.0) + time.time() - t0
+    return result
+
+##
+# The optimizations one after another; returns the number of walks of the
+# combinable ones
+def optimizeSeparately(tree, classId, privatesMap, times):
+    walks = 4  # comments, variants, basecalls (defines, methods); not the reducer of variants
+    timed(times, "comments", commentoptimizer.patch, tree)
+    timed(times, "variants", variantoptimizer.search, tree, VARIANTS, classId)
+    timed(times, "basecalls", basecalloptimizer.patch, tree)
+    walks += 1 if privateoptimizer.collect(tree) else 2
+    timed(times, "privates", privateoptimizer.patch, tree, id, privatesMap)
+    tree = timed(times, "strings", stringoptimizer.process, tree, classId)
+    timed(times, "variables", variableoptimizer.search, tree)
+    return tree, walks
+
+def optimizeCombined(tree, classId, privatesMap):
+    passes = pipeline.Pipeline()
+    passes.add(*commentoptimizer.passes())
+    passes.add(*variantoptimizer.passes(VARIANTS, classId))
+    passes.add(*basecalloptimizer.passes())
+    passes.add(*privateoptimizer.passes(id, privatesMap))
+    passes.add(pipeline.Step("strings", lambda tree: stringoptimizer.process(tree, classId)))
+    passes.add(pipeline.Step("variables", lambda tree: variableoptimizer.search(tree) or tree))
+    return passes.run(tree)
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-n <num>] [<path>...]")
+    parser.add_option("-n", dest="num", type="int", default=0, help="parse at most <num> files")
+    options, args = parser.parse_args()
+    paths = args or [os.path.join(scriptDir, "../../../framework/source/class")]
+
+    Context.console = Log()
+    Context.jobconf = ExtMap({})
+
+    blobs = []
+    t0 = time.time()
+    for path in jsFiles(paths):
+        blobs.append((path, dumps(parse(path))))
+        if len(blobs) == options.num:
+            break
+    print "Parsed %d files in %.2fs" % (len(blobs), time.time() - t0)
+
+    times, walks, old = {}, 0, []
+    privatesMap = {}
+    for path, blob in blobs:
+        tree, n = optimizeSeparately(loads(blob), path, privatesMap, times)
+        old.append(tree.toJS(pp))
+        walks += n
+
+    pipeline.stats.clear()
+    privatesMap = {}
+    new = []
+    for path, blob in blobs:
+        new.append(optimizeCombined(loads(blob), path, privatesMap).toJS(pp))
+
+    print "Separately: %d walks, %.2fs" % (walks, sum(times[x] for x in times if x not in ("strings", "variables")))
+    for name in ("comments", "variants", "basecalls", "privates"):
+        print "  %-38s %7.2fs" % (name, times[name])
+    stats = dict((x, y) for x, y in pipeline.stats.items() if x not in ("strings", "variables"))
+    print "Pipeline:   %d walks, %.2fs" % (sum(x[1] for x in stats.values()), sum(x[2] for x in stats.values()))
+    for name in sorted(stats):
+        print "  %-38s %7.2fs (%d walks)" % (name, stats[name][2], stats[name][1])
+    print "strings, variables (not combined): %.2fs / %.2fs" % (times["strings"] + times["variables"],
+        pipeline.stats["strings"][2] + pipeline.stats["variables"][2])
+    for (path, _), x, y in zip(blobs, old, new):
+        if x != y:
+            print "DIFFERENT RESULT: %s" % path
+
+if __name__ == '__main__':
+    main()
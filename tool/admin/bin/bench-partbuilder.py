@@ -0,0 +1,143 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Time PartBuilder.getPackages() on a synthetic app: <num> classes with a few
+# load and run deps each, and <parts> parts (one of them "boot"), each
+# including a few classes of its own, which depend on the others. The deps
+# of the classes are precomputed, and the compiled sizes are fixed, so this
+# measures the part and package computation alone (including the merging of
+# packages smaller than <min-package> KB).
+#
+# Prints the time taken and a digest of the result, so runs with different
+# versions of the generator can be compared.
+#
+# Usage: bench-partbuilder.py [-n <num>] [-p <parts>] [-m <min-package>]
+##
+
+import sys, os, time, random, optparse
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc import securehash as sha
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime.Log import Log
+from generator.code.DependencyItem import DependencyItem
+from generator.code.DependencyLoader import DependencyLoader
+from generator.output.PartBuilder import PartBuilder
+from generator.output.Script import Script
+
+class FakeLibrary(object):
+    namespace = "bench"
+
+class FakeClass(object):
+    library = FakeLibrary()
+
+    def __init__(self, id, load, run, size):
+        self.id = id
+        self.load = [DependencyItem(x, '', id, isLoadDep=True) for x in load]
+        self.run = [DependencyItem(x, '', id) for x in run]
+        self.size = size
+
+    def getCombinedDeps(self, classesAll, variants, config, *args, **kwargs):
+        return {"load" : self.load, "run" : self.run, "ignore" : []}, True
+
+    def dependenciesCached(self, variants):
+        return True
+
+    def getCompiledSize(self, compOptions, *args, **kwargs):
+        return self.size
+
+##
+# A graph of <num> classes; the load deps of a class are among the classes
+# before it (mostly close ones), the run deps are anywhere
+def classGraph(num):
+    names = ["bench.C%05d" % i for i in range(num)]
+    classes = {}
+    for i, name in enumerate(names):
+        load = set(names[max(0, i - random.randint(1, 200))] for _ in range(random.randint(0, 3)) if i)
+        run = random.sample(names, random.randint(0, 3))
+        classes[name] = FakeClass(name, sorted(load), run, random.randint(500, 5000))
+    return classes
+
+def main():
+    sys.setrecursionlimit(3500)  # like generator.py
+    parser = optparse.OptionParser(usage="%prog [-n <num>] [-p <parts>] [-m <min-package>]")
+    parser.add_option("-n", dest="num", type="int", default=5000, help="number of classes (default: 5000)")
+    parser.add_option("-p", dest="parts", type="int", default=50, help="number of parts (default: 50)")
+    parser.add_option("-m", dest="minsize", type="int", default=20, help="min-package in KB (default: 20)")
+    options, args = parser.parse_args()
+
+    Context.console = Log()
+    Context.console.setLevel("warning")
+    random.seed(0)
+
+    classesObj = classGraph(options.num)
+    names = sorted(classesObj)
+    # the parts include classes of their own, which load a core class and
+    # a few classes of "their" region of the graph
+    partIncludes = {}
+    region = options.num / options.parts
+    for i in range(options.parts):
+        partId = "boot" if i == 0 else "part%02d" % i
+        partIncludes[partId] = []
+        for j in range(3):
+            name = "bench.%s.C%d" % (partId, j)
+            load = [names[random.randint(0, 50)]] + random.sample(names[i * region:(i + 1) * region], 3)
+            classesObj[name] = FakeClass(name, load, [], random.randint(500, 5000))
+            partIncludes[partId].append(name)
+    jobconf = ExtMap({
+        "compile-options" : {"code" : {"lint-check" : False, "jobs" : 1}},
+        "packages" : {
+            "parts" : dict((x, {"include" : partIncludes[x]}) for x in partIncludes),
+            "sizes" : {"min-package" : options.minsize},
+        },
+    })
+    Context.jobconf = jobconf
+
+    script = Script()
+    script.jobconfig = jobconf
+    script.classesAll = classesObj
+    script._featureMap = {}
+    loader = DependencyLoader(classesObj, None, Context.console, {}, {}, {'jobconf' : jobconf})
+    classList = loader.classlistFromInclude(sum(partIncludes.values(), []), [], {})
+    script.classes = loader.sortClasses(classList, {})
+    script.classesObj = [classesObj[x] for x in script.classes]
+
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")  # progress output
+    t0 = time.time()
+    try:
+        partBuilder = PartBuilder(Context.console, loader)
+        resultParts, script = partBuilder.getPackages(partIncludes, [], {"jobconf" : jobconf}, script)
+    finally:
+        sys.stdout = stdout
+    elapsed = time.time() - t0
+
+    digest = sha.getHash(repr((
+        [[x.id for x in p.classes] for p in script.packagesSorted()],
+        sorted((x.name, [p.id for p in x.packages]) for x in script.parts.values()),
+    )))
+    print "%d classes, %d parts: %d packages in %.3fs (result %s)" % (
+        len(script.classes), len(script.parts), len(script.packages), elapsed, digest[:12])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compare the former tokenizer (a generator pipeline of the low-level Scanner,
+# Scanner.Token objects and LQueues, building a dict per token) with the
+# current one (tokenizer.Tokenizer, a single scanning loop building Token
+# records), on the framework classes (or the .js files under the given paths).
+# Both have to yield the same tokens.
+#
+# The former tokenizer and Scanner modules are read from the git revision
+# <revision>; by default, the one before tokens_2_obj() was removed from
+# tokenizer.py.
+#
+# Usage: bench-tokenizer.py [-b <revision>] [-n <max. number of files>] [-r <repeat>] [<path>...]
+##
+
+import sys, os, gc, imp, time, optparse, subprocess
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+libDir    = os.path.join(scriptDir, "../../pylib")
+sys.path.append(libDir)
+
+from misc import filetool
+from ecmascript.frontend import tokenizer
+from ecmascript.frontend.SyntaxException import SyntaxException
+
+def git(*args):
+    return subprocess.Popen(("git",) + args, stdout=subprocess.PIPE, cwd=libDir).communicate()[0]
+
+def formerRevision():
+    rev = git("log", "-1", "--format=%H", "-Sdef tokens_2_obj", "--", "ecmascript/frontend/tokenizer.py").strip()
+    if not rev:
+        raise RuntimeError("No revision with the former tokenizer found")
+    return rev + "^"
+
+##
+# The Tokenizer class of revision <rev>, with the Scanner module of that
+# revision (the former tokenizer imports it as "Scanner")
+def formerTokenizer(rev):
+    modules = {}
+    for name in ("Scanner", "tokenizer"):
+        source = git("show", "%s:./ecmascript/frontend/%s.py" % (rev, name))
+        if not source:
+            raise RuntimeError("No %s.py in revision %s" % (name, rev))
+        module = modules[name] = imp.new_module("former_" + name)
+        module.__file__ = "%s:%s.py" % (rev, name)
+        sys.modules[module.__name__] = module  # keep it alive, or its globals are cleared
+        saved = sys.modules.get("Scanner")
+        sys.modules["Scanner"] = modules["Scanner"]
+        try:
+            exec compile(source, module.__file__, "exec") in module.__dict__
+        finally:
+            if saved is None:
+                del sys.modules["Scanner"]
+            else:
+                sys.modules["Scanner"] = saved
+    return modules["tokenizer"].Tokenizer
+
+def jsFiles(paths):
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for f in sorted(files):
+                if f.endswith(".js"):
+                    yield os.path.join(root, f)
+
+##
+# Tokenize <content> with <tokenizerClass>; returns (seconds, tokens as dicts
+# or the exception)
+def timeOne(tokenizerClass, content, path):
+    gc.disable()  # not to time collections of garbage made before
+    t0 = time.time()
+    try:
+        tokens = tokenizerClass().parseStream(content, path)
+    except SyntaxException, e:
+        tokens = e
+    t = time.time() - t0
+    gc.enable()
+    if not isinstance(tokens, Exception):
+        tokens = [dict(x) if isinstance(x, dict) else x.asDict() for x in tokens]
+    return t, tokens
+
+##
+# The first different token of <former> and <current>
+def firstDifference(former, current):
+    if isinstance(former, Exception) or isinstance(current, Exception):
+        return "%r / %r" % (former if isinstance(former, Exception) else "tokens",
+                            current if isinstance(current, Exception) else "tokens")
+    for x, y in zip(former, current):
+        if x != y:
+            return "%r / %r" % (x, y)
+    return "%d / %d tokens" % (len(former), len(current))
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-b <revision>] [-n <num>] [-r <repeat>] [<path>...]")
+    parser.add_option("-b", dest="revision", default=None, help="git revision of the former tokenizer")
+    parser.add_option("-n", dest="num", type="int", default=0, help="read at most <num> files")
+    parser.add_option("-r", dest="repeat", type="int", default=3, help="tokenize every file <repeat> times")
+    options, args = parser.parse_args()
+    paths = args or [os.path.join(scriptDir, "../../../framework/source/class")]
+    FormerTokenizer = formerTokenizer(options.revision or formerRevision())
+
+    files = []
+    for path in jsFiles(paths):
+        files.append((path, filetool.read(path)))
+        if len(files) == options.num:
+            break
+
+    times, ntokens, diffs = [0.0, 0.0], 0, []
+    for path, content in files:
+        best, results = [None, None], [None, None]
+        for i in range(options.repeat):
+            for n, cls in enumerate((FormerTokenizer, tokenizer.Tokenizer)):
+                t, results[n] = timeOne(cls, content, path)
+                if best[n] is None or t < best[n]:
+                    best[n] = t
+        times[0] += best[0]
+        times[1] += best[1]
+        if not isinstance(results[1], Exception):
+            ntokens += len(results[1])
+        if results[0] != results[1]:
+            diffs.append((path, firstDifference(*results)))
+
+    print "Tokenized %d files (%d tokens, %.1f MB)" % (len(files), ntokens,
+        sum(len(x[1]) for x in files) / 1e6)
+    print "%-24s %10s %10s" % ("", "former", "current")
+    print "%-24s %9.2fs %9.2fs" % ("tokenize", times[0], times[1])
+    for path, diff in diffs:
+        print "  DIFFERENT RESULT: %s: %s" % (path, diff)
+
+if __name__ == '__main__':
+    main()
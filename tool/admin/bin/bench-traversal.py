@@ -0,0 +1,264 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compare the tree traversals of the former, recursive implementations
+# (copied below) with the current ones (tree.preorderIter/postorderIter and
+# the cached visitor dispatch of treeutil.visitorMethod()), on the framework
+# classes (or the .js files under the given paths). Both have to visit the
+# same nodes in the same order, and yield the same results.
+#
+# Usage: bench-traversal.py [-n <max. number of files>] [-r <repeat>] [<path>...]
+##
+
+import sys, os, gc, time, optparse
+import cPickle as pickle
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc import filetool
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime.Log import Log
+from ecmascript.frontend import tokenizer, treegenerator, treecodec, tree, treeutil
+from ecmascript.frontend.treegenerator import PackerFlags as pp
+from ecmascript.transform.check import scopes
+from ecmascript.transform.optimizer import reducer
+
+# -- the former implementations ------------------------------------------------
+
+def oldNodeIterator(node, nodetypes):
+    if nodetypes:
+        if node.type in nodetypes:
+            yield node
+    else:
+        yield node
+
+    for child in node.children[:]:
+        for fcn in oldNodeIterator(child, nodetypes):
+            yield fcn
+
+def oldNodeIter(node):
+    yield node
+    if node.children:
+        for child in node.children:
+            for x in oldNodeIter(child):
+                yield x
+
+def oldNodeVisit(self, node):
+    if hasattr(self, "visit_"+node.type):
+        getattr(self, "visit_"+node.type)(node)
+    else:
+        for child in node.children:
+            self.visit(child)
+
+def oldScopeVisit(self, scopeNode):
+    if hasattr(self, "visit_"+scopeNode.node.type):
+        getattr(self, "visit_"+scopeNode.node.type)(scopeNode)
+    else:
+        for child in scopeNode.children:
+            self.visit(child)
+
+def oldVarsCollectorVisit(self, scopeNode):
+    if hasattr(self, "visit_"+scopeNode.node.type):
+        getattr(self, "visit_"+scopeNode.node.type)(scopeNode)
+    else:
+        scopes.AssignScopeVarsVisitor(scopeNode).visit(scopeNode.node)
+        for child in scopeNode.children:
+            self.visit(child)
+
+def oldReducerVisit(self, node):
+    nchilds = []
+    for child in node.children:
+        nchilds.append(self.visit(child))
+    nnode = node
+    nnode.children = []
+    for cld in nchilds:
+        nnode.addChild(cld)
+    if hasattr(self, "visit_"+node.type):
+        nnode = getattr(self, "visit_"+node.type)(nnode)
+    return nnode
+
+OLD_VISITS = [
+    (treeutil.NodeVisitor, oldNodeVisit),
+    (scopes.ScopeVisitor, oldScopeVisit),
+    (scopes.VarsCollector, oldVarsCollectorVisit),
+    (reducer.ASTReducer, oldReducerVisit),
+]
+
+##
+# Install the former visit() methods (or the current ones again)
+def useOldVisits(old):
+    for cls, visit in OLD_VISITS:
+        if old:
+            cls._visit, cls.visit = cls.__dict__["visit"], visit
+        else:
+            cls.visit = cls.__dict__["_visit"]
+            del cls._visit
+
+# ------------------------------------------------------------------------------
+
+def parse(path):
+    tokens = tokenizer.Tokenizer().parseStream(filetool.read(path), path)
+    return treegenerator.createFileTree(tokens, path)
+
+##
+# The tree as a string, to get copies of it
+def dumps(tree):
+    try:
+        return treecodec.dumps(tree)
+    except treecodec.TreeCodecError:
+        return pickle.dumps(tree, 2)
+
+def loads(blob):
+    if treecodec.isEncoded(blob):
+        return treecodec.loads(blob)
+    return pickle.loads(blob)
+
+def jsFiles(paths):
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for f in sorted(files):
+                if f.endswith(".js"):
+                    yield os.path.join(root, f)
+
+##
+# The scopes of <tree>, as comparable data
+def scopeSummary(scope):
+    result = []
+    agenda = [scope]
+    while agenda:
+        scope = agenda.pop()
+        result.append((scope.node.type, sorted((name, len(var.decl), len(var.uses), var.is_param)
+            for name, var in scope.vars.items())))
+        agenda.extend(scope.children)
+    return result
+
+##
+# A plain NodeVisitor, handling some node types and descending into the others
+class LeafCollector(treeutil.NodeVisitor):
+
+    def __init__(self):
+        super(LeafCollector, self).__init__()
+        self.found = []
+
+    def visit_identifier(self, node):
+        self.found.append(node)
+
+    def visit_constant(self, node):
+        self.found.append(node)
+
+def collectLeaves(node):
+    visitor = LeafCollector()
+    visitor.visit(node)
+    return [id(x) for x in visitor.found]
+
+##
+# The benchmarks: (name, fn(tree), returning a comparable result, whether fn
+# changes the tree)
+def benchmarks(old):
+    return [
+        ("nodeIterator", lambda t: [id(x) for x in
+            (oldNodeIterator if old else treeutil.nodeIterator)(t, [])], False),
+        ("nodeIterator(types)", lambda t: [id(x) for x in
+            (oldNodeIterator if old else treeutil.nodeIterator)(t, ["identifier", "constant"])], False),
+        ("Node.nodeIter", lambda t: [id(x) for x in
+            (oldNodeIter(t) if old else t.nodeIter())], False),
+        ("NodeVisitor", collectLeaves, False),
+        ("create_scopes", lambda t: scopeSummary(scopes.create_scopes(t).scope), True),
+        ("ast_reduce", lambda t: reducer.ast_reduce(t).toJS(pp), True),
+    ]
+
+##
+# Time <fn> on a copy of the tree in <blob>; returns (seconds, result)
+def timeOne(fn, blob, changes):
+    node = loads(blob)
+    gc.disable()  # not to time collections of garbage made before
+    t0 = time.time()
+    try:
+        r = fn(node)
+    except Exception, e:  # e.g. the reducer on "1/0"
+        r = e.__class__.__name__
+    t = time.time() - t0
+    gc.enable()
+    # ids are only comparable as positions in the (unchanged) tree
+    if not changes:
+        pos = dict((id(x), n) for n, x in enumerate(tree.preorderIter(node)))
+        r = [pos[x] for x in r]
+    return t, r
+
+##
+# Run the former and the current implementations alternately on every tree,
+# <repeat> times each, taking the best times; returns ({name: [former,
+# current]}, {name: [paths with different results]})
+def run(blobs, repeat):
+    times, diffs = {}, {}
+    for name, _, changes in benchmarks(False):
+        times[name], diffs[name] = [0.0, 0.0], []
+        for path, blob in blobs:
+            best, results = [None, None], [None, None]
+            for i in range(repeat):
+                for old in (True, False):
+                    fn = dict((x[0], x[1]) for x in benchmarks(old))[name]
+                    if old:
+                        useOldVisits(True)
+                    try:
+                        t, results[not old] = timeOne(fn, blob, changes)
+                    finally:
+                        if old:
+                            useOldVisits(False)
+                    if best[not old] is None or t < best[not old]:
+                        best[not old] = t
+            times[name][0] += best[0]
+            times[name][1] += best[1]
+            if results[0] != results[1]:
+                diffs[name].append(path)
+    return times, diffs
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-n <num>] [-r <repeat>] [<path>...]")
+    parser.add_option("-n", dest="num", type="int", default=0, help="parse at most <num> files")
+    parser.add_option("-r", dest="repeat", type="int", default=3, help="run each benchmark <repeat> times")
+    options, args = parser.parse_args()
+    paths = args or [os.path.join(scriptDir, "../../../framework/source/class")]
+
+    Context.console = Log()
+    Context.jobconf = ExtMap({})
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))  # for the former ones
+
+    blobs = []
+    t0 = time.time()
+    for path in jsFiles(paths):
+        blobs.append((path, dumps(parse(path))))
+        if len(blobs) == options.num:
+            break
+    print "Parsed %d files in %.2fs" % (len(blobs), time.time() - t0)
+
+    times, diffs = run(blobs, options.repeat)
+
+    print "%-24s %10s %10s" % ("", "former", "current")
+    for name, _, _ in benchmarks(False):
+        print "%-24s %9.2fs %9.2fs" % ((name,) + tuple(times[name]))
+        for path in diffs[name]:
+            print "  DIFFERENT RESULT: %s" % path
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compare the cache formats for syntax trees: size and load time of
+# pickle+zlib (the former format) against ecmascript.frontend.treecodec, with
+# different zlib compression levels.
+#
+# Parses the framework classes (or the .js files under the given paths) the
+# way the generator does, i.e. with scopes and hints.
+#
+# Usage: bench-treecodec.py [-n <max. number of files>] [<path>...]
+##
+
+import sys, os, time, gc, zlib, optparse
+import cPickle as pickle
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc import filetool
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime.Log import Log
+from ecmascript.frontend import tokenizer, treegenerator, treecodec
+from ecmascript.transform.check import scopes, load_time, jshints
+
+LEVELS = (0, 1, 6, 9)
+
+def parse(path):
+    tokens = tokenizer.Tokenizer().parseStream(filetool.read(path), path)
+    tree = treegenerator.createFileTree(tokens, path)
+    tree = scopes.create_scopes(tree)
+    load_time.load_time_check(tree.scope)
+    return jshints.create_hints_tree(tree)
+
+def jsFiles(paths):
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for f in sorted(files):
+                if f.endswith(".js"):
+                    yield os.path.join(root, f)
+
+def measure(trees, dumps, loads, level):
+    blobs = []
+    t0 = time.time()
+    for tree in trees:
+        data = dumps(tree)
+        blobs.append(zlib.compress(data, level) if level else data)
+    dumpTime = time.time() - t0
+    gc.disable()  # as in generator.runtime.Cache
+    try:
+        t0 = time.time()
+        for blob in blobs:
+            loads(blob.decode('zlib') if level else blob)
+        loadTime = time.time() - t0
+    finally:
+        gc.enable()
+    return sum(len(b) for b in blobs), dumpTime, loadTime
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-n <num>] [<path>...]")
+    parser.add_option("-n", dest="num", type="int", default=0, help="parse at most <num> files")
+    options, args = parser.parse_args()
+    paths = args or [os.path.join(scriptDir, "../../../framework/source/class")]
+
+    Context.console = Log()
+    Context.jobconf = ExtMap({})
+
+    trees = []
+    t0 = time.time()
+    for path in jsFiles(paths):
+        trees.append(parse(path))
+        if len(trees) == options.num:
+            break
+    print "Parsed %d files in %.2fs" % (len(trees), time.time() - t0)
+
+    formats = [("pickle", lambda t: pickle.dumps(t, 2), pickle.loads),
+               ("treecodec", treecodec.dumps, treecodec.loads)]
+    print "%-10s %5s %10s %8s %8s" % ("format", "zlib", "size (KB)", "dump (s)", "load (s)")
+    for name, dumps, loads in formats:
+        for level in LEVELS:
+            size, dumpTime, loadTime = measure(trees, dumps, loads, level)
+            print "%-10s %5d %10d %8.2f %8.2f" % (name, level, size / 1024, dumpTime, loadTime)
+
+if __name__ == '__main__':
+    main()
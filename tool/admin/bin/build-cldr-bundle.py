@@ -0,0 +1,55 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Extract the locale data of the CLDR XML files in tool/data/cldr/main (or
+# <cldr main folder>) into the bundle the generator reads instead of the XML
+# files (tool/data/cldr/bundle.zip, see misc.cldr.Bundle). The files are
+# parsed in parallel, with <jobs> processes.
+#
+# Run this after updating the CLDR data, and ship the bundle with the SDK.
+#
+# Usage: build-cldr-bundle.py [-j <jobs>] [<cldr main folder>]
+##
+
+import sys, os, time, optparse
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(scriptDir, "../../pylib"))
+
+from misc import cldr
+from generator.runtime import ProcessPool
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [-j <jobs>] [<cldr main folder>]")
+    parser.add_option("-j", dest="jobs", type="int", default=0, help="number of processes (default: one per CPU)")
+    options, args = parser.parse_args()
+    cldrMain = args[0] if args else os.path.join(scriptDir, "../../data/cldr/main")
+    cldrMain = os.path.normpath(cldrMain)
+    bundlePath = os.path.join(os.path.dirname(cldrMain), cldr.BUNDLE_NAME)
+
+    jobs = ProcessPool.numJobs(options.jobs)
+    t0 = time.time()
+    num = cldr.writeBundle(cldrMain, bundlePath, lambda fn, files: ProcessPool.forkMap(fn, files, jobs))
+    print "%d locales in %s (%d KB), %.1fs with %d jobs" % (num, bundlePath,
+        os.path.getsize(bundlePath) / 1024, time.time() - t0, jobs)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# generator-client.py -- run generator jobs in the generator daemon
+#
+# Takes the same arguments as generator.py, and has them run by the
+# generator daemon ("generator.py --daemon") of this tool chain, which is
+# started if it isn't running yet. As the daemon keeps its data in memory,
+# repeated runs only process what has changed.
+#
+# Additional options:
+#   --daemon-status  tell whether the daemon is running
+#   --daemon-stop    stop the daemon
+##
+
+import sys, os, json, subprocess
+
+scriptDir = os.path.dirname(os.path.abspath(__file__))
+toolDir   = os.path.dirname(scriptDir)
+sys.path.insert(0, os.path.join(toolDir, "pylib"))
+
+from generator.runtime import Generatord
+
+
+def startDaemon(path):
+    sockDir = os.path.dirname(path)
+    if not os.path.isdir(sockDir):
+        os.makedirs(sockDir)
+    log = open(path + ".log", "a")
+    subprocess.Popen([sys.executable, os.path.join(scriptDir, "generator.py"), "--daemon"],
+        stdin=open(os.devnull), stdout=log, stderr=log, close_fds=True,
+        preexec_fn=os.setsid, cwd=toolDir)
+    log.close()
+    return Generatord.waitForDaemon(path)
+
+
+def control(path, kind):
+    sock = Generatord.connect(path)
+    if not sock:
+        print "Generator daemon is not running"
+        return 1
+    try:
+        Generatord.sendFrame(sock, kind)
+        Generatord.recvFrame(sock)
+    finally:
+        sock.close()
+    if kind == Generatord.STATUS:
+        print "Generator daemon is running (%s)" % path
+    return 0
+
+
+def main(argv):
+    path = Generatord.socketPath(toolDir)
+    if "--daemon-stop" in argv:
+        return control(path, Generatord.STOP)
+    elif "--daemon-status" in argv:
+        return control(path, Generatord.STATUS)
+
+    sock = Generatord.connect(path)
+    if not sock:
+        print >>sys.stderr, "Starting generator daemon..."
+        sock = startDaemon(path)
+        if not sock:
+            print >>sys.stderr, "Could not start the generator daemon; see %s.log" % path
+            return 1
+
+    try:
+        Generatord.sendFrame(sock, Generatord.REQUEST, json.dumps({
+            "argv" : argv,
+            "cwd"  : os.getcwd(),
+            "env"  : Generatord.getEnviron(),
+            "tty"  : sys.stdout.isatty(),
+        }))
+        while True:
+            kind, payload = Generatord.recvFrame(sock)
+            if kind == Generatord.STDOUT:
+                sys.stdout.write(payload)
+                sys.stdout.flush()
+            elif kind == Generatord.STDERR:
+                sys.stderr.write(payload)
+                sys.stderr.flush()
+            elif kind == Generatord.EXIT:
+                return int(payload)
+            else:
+                print >>sys.stderr, "Lost connection to the generator daemon"
+                return 1
+    except KeyboardInterrupt:
+        print
+        print "Keyboard interrupt!"
+        return 2
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
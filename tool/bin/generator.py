@@ -29,6 +29,7 @@ from generator.config.Config import Config
 from generator.config.GeneratorArguments import GeneratorArguments
 from generator.runtime.Log import Log
 from generator.runtime.InterruptRegistry import InterruptRegistry
+from generator.runtime import Generatord
 
 #import warnings
 #warnings.filterwarnings("error") # turn warnings into errors - e.g. for UnicodeWarning
@@ -59,7 +60,14 @@ if os.name == 'java':
 
 interruptRegistry = InterruptRegistry()
 
-qxUserHome = os.path.expanduser(os.path.join("~", ".qooxdoo"))
+##
+# The user's qooxdoo folder; looked up for each run, as HOME can differ
+# between the runs in daemon mode
+def getQxUserHome():
+    return os.path.expanduser(os.path.join("~", ".qooxdoo"))
+
+configCache = None  # {(cwd, argv, environment): (config, jobs, file stamps)}, in daemon mode
+DAEMON_MEMORY_LIMIT = 1024  # MB; default for cache/memory-limit in daemon mode
 
 def interruptCleanup():
     for func in interruptRegistry.Callbacks:
@@ -101,7 +109,7 @@ def getJobsDesc(jobs, config):
     return jobsAndDesc
 
 def getUserConfig(config):
-    generatorPrefsPath = os.path.join(qxUserHome, "generator.json")
+    generatorPrefsPath = os.path.join(getQxUserHome(), "generator.json")
     if os.path.exists(generatorPrefsPath):
         # treat the user file like an initial include
         includes = config.get("include", [])
@@ -118,6 +126,33 @@ def getAdditonalArgs(config, args):
 
     return config
 
+def fileStamps(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = os.stat(path).st_mtime
+        except OSError:
+            stamps[path] = None
+    return stamps
+
+##
+# Return the processed config and the expanded list of jobs to run, re-using
+# those of an earlier run with the same command line and environment in
+# daemon mode, as long as the config files haven't changed
+def getJobs(console, options, args):
+    if configCache is None:
+        return processConfig(console, options, args)
+    key = (os.getcwd(), tuple(sys.argv[1:]), tuple(sorted(Generatord.getEnviron().items())))
+    if key in configCache:
+        config, jobs, stamps = configCache[key]
+        if fileStamps(stamps) == stamps:
+            console.debug("Re-using processed configuration")
+            return config, jobs
+    config, jobs = processConfig(console, options, args)
+    configFiles = config.getConfigFiles() + [os.path.join(getQxUserHome(), "generator.json")]
+    configCache[key] = (config, jobs, fileStamps(configFiles))
+    return config, jobs
+
 def initConfig(console, options, args):
    # Load application configuration
    config = Config(console, options.config, **options.letmacros)
@@ -131,54 +166,9 @@ def initConfig(console, options, args):
    return config;
 
 
-def main():
-    global options
-    (options, args) = GeneratorArguments(option_class=ExtendAction).parse_args(sys.argv[1:])
-
-    if args:
-        options.jobs = args[0].split(',')
-    else:
-        options.jobs = []
-
-    # Save cli options to Context
-    gen_opts = [x for x in sys.argv[1:] if x not in args]  # cli options without jobs list
-    Context.generator_opts = gen_opts  # as list
-
-    # Initialize console
-    if options.verbose:
-        level = "debug"
-    elif options.quiet:
-        level = "warning"
-    else:
-        level = "info"
-
-    console = Log(options.logfile, level)
-    Context.console = console
-
-    # Grunt compat: Print list of jobs as json
-    if options.listjobs:
-        config = initConfig(console, options, args)
-        config.resolveIncludes()
-        from misc import json
-        print(json.dumpsPretty(getJobsDesc(config.getExportedJobsList(), config)))
-        sys.exit(0)
-
-    # Treat verbosity of pre-job processing
-    if options.config_verbose:
-        console.setLevel("debug")
-        console.setFilter(["generator.config.*"])
-    else:
-        console.setLevel("info")
-
-    # Show progress indicator?
-    console.progress_indication = options.show_progress_indicator
-
-    # Initial user feedback
-    appname = ((os.path.dirname(os.path.abspath(options.config)).split(os.sep)))[-1]
-    console.head(u"Initializing: %s" % appname.decode('utf-8'), True)
-    console.info(u"Processing configuration")
-    console.debug(u"    file: %s" % options.config)
-
+##
+# Read the config and process it for the jobs to run (from the command line)
+def processConfig(console, options, args):
     config = initConfig(console, options, args);
 
     # Early check for log filter -- doesn't work as there is no job selected yet
@@ -213,8 +203,6 @@ def main():
                 sys.exit(1)
 
     console.debug(u"Jobs: %s" % ", ".join(options.jobs))
-    context = {'config': config, 'console':console, 'jobconf':None, 'interruptRegistry':interruptRegistry}
-    Context.config = config # TODO: clean up overlap between context dict and Context module
 
     # Resolve "extend"- and "run"-Keys
     expandedjobs = config.resolveExtendsAndRuns(options.jobs[:])
@@ -237,6 +225,68 @@ def main():
     # Clean-up config
     config.cleanUpJobs(expandedjobs)
 
+    return config, expandedjobs
+
+
+def main():
+    global options
+    (options, args) = GeneratorArguments(option_class=ExtendAction).parse_args(sys.argv[1:])
+
+    if args:
+        options.jobs = args[0].split(',')
+    else:
+        options.jobs = []
+
+    if options.daemon:
+        serveDaemon()
+        return
+
+    # Save cli options to Context
+    gen_opts = [x for x in sys.argv[1:] if x not in args]  # cli options without jobs list
+    Context.generator_opts = gen_opts  # as list
+
+    # Initialize console
+    if options.verbose:
+        level = "debug"
+    elif options.quiet:
+        level = "warning"
+    else:
+        level = "info"
+
+    console = Log(options.logfile, level)
+    Context.console = console
+
+    # Grunt compat: Print list of jobs as json
+    if options.listjobs:
+        config = initConfig(console, options, args)
+        config.resolveIncludes()
+        from misc import json
+        print(json.dumpsPretty(getJobsDesc(config.getExportedJobsList(), config)))
+        sys.exit(0)
+
+    # Treat verbosity of pre-job processing
+    if options.config_verbose:
+        console.setLevel("debug")
+        console.setFilter(["generator.config.*"])
+    else:
+        console.setLevel("info")
+
+    # Show progress indicator?
+    console.progress_indication = options.show_progress_indicator
+
+    # Initial user feedback
+    appname = ((os.path.dirname(os.path.abspath(options.config)).split(os.sep)))[-1]
+    console.head(u"Initializing: %s" % appname.decode('utf-8'), True)
+    console.info(u"Processing configuration")
+    console.debug(u"    file: %s" % options.config)
+
+    config, expandedjobs = getJobs(console, options, args)
+
+    context = {'config': config, 'console':console, 'jobconf':None, 'interruptRegistry':interruptRegistry}
+    if configCache is not None:
+        context['cache/memory-limit'] = DAEMON_MEMORY_LIMIT
+    Context.config = config # TODO: clean up overlap between context dict and Context module
+
     # Reset console level
     console.setLevel(level)
     console.resetFilter()
@@ -260,7 +310,10 @@ def main():
     return
 
 
-if __name__ == '__main__':
+##
+# Run the generator for the command line in sys.argv, returns the exit code
+def run():
+    global options
     options = None
     try:
         #sys.settrace(stacktrace)
@@ -270,7 +323,7 @@ if __name__ == '__main__':
         print()
         print("Keyboard interrupt!")
         interruptCleanup()
-        sys.exit(2)
+        return 2
 
     except Exception as e:
         interruptCleanup()
@@ -290,4 +343,25 @@ if __name__ == '__main__':
             else:
                 msg = "\nTerminating on {0}; please re-run with -s.".format(type(e))
                 print(msg, file=sys.stderr)
-            sys.exit(1)
+            return 1
+
+    return 0
+
+##
+# Serve the runs of generator-client.py, until stopped or idle for a while
+def serveDaemon():
+    global configCache
+    configCache = {}
+
+    def runRequest(argv):
+        try:
+            return run()
+        finally:
+            interruptRegistry.Callbacks.clear()  # of the Cache objects of the run
+
+    toolDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    Generatord.Generatord(Generatord.socketPath(toolDir), runRequest).serve()
+
+
+if __name__ == '__main__':
+    sys.exit(run())
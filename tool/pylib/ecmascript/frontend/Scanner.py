@@ -19,15 +19,15 @@
 ################################################################################
 
 ##
-# The main purpose of this module is to provide a low-level JS scanner,
-# materialized in the Scanner class. It only recognizes primitive lexems, like
-# numbers, operators, and symbol names, but nothing that requires context
-# awareness like strings or comments.
+# The main purpose of this module is to provide the primitive lexems of JS
+# (Scanner.patt), like numbers, operators, and symbol names, but nothing that
+# requires context awareness like strings or comments; the tokenizer module
+# scans with them. It also has the queues the treegenerator reads tokens
+# with.
 ##
 
-import sys, os, re, types
+import re
 from collections import deque
-from ecmascript.frontend.SyntaxException import SyntaxException
 
 ##
 # IterObject  -- abstract base class for iterators, making them resettable and
@@ -49,19 +49,13 @@ class IterObject(object):
 
 
 ##
-# Scanner -- low-level scanner that reads text from a stream and returns simple tokens as tuples
+# Scanner -- the low-level lexems, as the named groups of a regexp
 #
 # Usage:
-#   f=open('file.js')
-#   fs= f.read()
-#   x=Scanner(text)
-#   a=[y for y in Scanner(text)]
+#   mo = Scanner.patt.match(text, pos)
+#   mo.lastgroup, mo.group()   # e.g. "ident", "foo"
 
-class Scanner(IterObject):
-
-    def __init__(self, stream):
-        super(Scanner, self).__init__(stream)
-        self.next_start = 0
+class Scanner(object):
 
     patt  = re.compile(ur'''
          (?P<float>
@@ -100,56 +94,6 @@ class Scanner(IterObject):
         |(?P<op> \W)            # what remains (operators)
         ''', re.VERBOSE|re.DOTALL|re.MULTILINE|re.UNICODE) # re.LOCALE?!
 
-    # individual regex to search fast-forward to potential string ends (both comments and quoted)
-    stringEnd         = {}
-    stringEnd['\n']   = re.compile('(?P<commI>.*(?=\n|$))', re.UNICODE)
-    stringEnd[r'\*/'] = re.compile(r'(?P<commM>.*?\*/)',  re.DOTALL|re.MULTILINE|re.UNICODE)
-    stringEnd['"']    = re.compile(r'(?P<dquote>.*?")', re.DOTALL|re.UNICODE)
-    stringEnd["'"]    = re.compile(r"(?P<squote>.*?')", re.DOTALL|re.UNICODE)
-
-    ##
-    # yields :
-    # ( <group_name> , <scan_string> , <start_pos> , <scan_length> )
-    def __iter__(self):
-        delimiter  = None
-        inData     = self.inData
-        lenData    = len(inData)
-        cursor     = 0
-        while cursor < lenData:
-            if delimiter:
-                mo = self.stringEnd[delimiter].search(inData, pos=cursor)
-            else:
-                mo = self.patt.match(inData, pos=cursor)
-            if mo:
-                mo_lastgroup = mo.lastgroup
-                mstart       = mo.start()
-                mend         = mo.end()
-                mlength      = mend - mstart
-                if cursor != mstart:
-                    raise RuntimeError("(This should never happen). There is a scan gap AFTER:\n \"%s\"\nAND BEFORE:\n \"%s\"" % (inData[cursor-100:cursor], inData[mstart:mstart+100]))
-                cursor       = mend # when using the 'pos' parameter in re.search, mo.start/end refer to the *entire* underlying string
-                delimiter = (yield (mo_lastgroup, mo.group(mo_lastgroup), mstart, mlength))
-            else:
-                raise SyntaxException("Unable to tokenize text starting with: \"%s\"" % inData[cursor:cursor+200])
-
-
-##
-# Token  -- wraps a low-level scanner tuple into a simple object
-
-class Token(object):
-    __slots__ = 'name', 'value', 'spos', 'len'
-
-    def __init__(self, ttup):
-        (
-        self.name,    # type
-        self.value,
-        self.spos,    # character position within stream
-        self.len,     # length of value
-        )         = ttup
-
-    def __str__(self):
-        return "(%s, %r, %d, %d)" % (self.name, self.value, self.spos, self.len)
-
 
 ##
 # LQueue  -- enhanced queue that allows push-back from one ("Left") side
@@ -253,30 +197,3 @@ def is_last_escaped(s):
             else:
                 break
         return c % 2 == 1  # odd number means last char is escaped
-
-
-# - Main ----------------------------------------------------------------------
-
-# syntax: ./Scanner.py <classfile>.js
-
-if __name__ == "__main__":
-    file = open(sys.argv[1]).read()
-    tokenizer = Scanner(file).__iter__()
-    #for tok in tokenizer:
-    #    print tok
-    c = None
-    while True:
-        try:
-            tok = tokenizer.send(c)
-        except StopIteration:
-            break
-        if tok[1] ==  '//':
-            c = '\n'
-        elif tok[1] == '/*':
-            c = r'\*/'
-        elif tok[1] in ['"', "'"]:
-            c = tok[1]
-        else:
-            c = None
-        print tok
-
@@ -19,453 +19,270 @@
 ################################################################################
 
 ##
-# This module implements a high-level scanner. It uses the low-level scanner
-# from the Scanner module. The main additional functionality is to accumulate
-# literals, such as strings, comments and regular expression literals, and to
-# turn all tokens into dicts suitable for the consumption of the treegenerator
-# parser module.
+# This module implements a high-level scanner. It scans a text in a single
+# loop, with the primitive lexems of the low-level Scanner module and the
+# literals made of several of them (strings, comments and regular expression
+# literals), and turns it into a list of Token records suitable for the
+# consumption of the treegenerator parser module.
+#
+# Tokens have the keys of the former token dicts as attributes, and still
+# answer the dict protocol (tok['type'], tok.get('begin')), for consumers of
+# the former token stream.
 ##
 
 import sys, re
 from ecmascript.frontend                 import lang, Comment
 from ecmascript.frontend.SyntaxException import SyntaxException
 import Scanner
-from Scanner import LQueue
 
 ##
-# Generator to turn low-level token tuples into Scanner.Token objects and
-# provide and eof Token.
-def tokens_2_obj(content):
-    #scanner = Scanner.Scanner(content)
-    scanner = Scanner.Scanner(content).__iter__()
-    Token   = Scanner.Token
-    arg     = None
-    token   = None
-    #for stoken in scanner:
-    while True:
-        try:
-            stoken = scanner.send(arg)  # pass arg, to switch low-level scan mode (s. parseCommentI)
-        except StopIteration:
-            break
-        token = Token(stoken)
-        arg = (yield token)
-    yield Token(('eof', '', token.spos+token.len if token else 0, 0))
-
-
-def scanner_slice(self, a, b):
-    return self.content[a:b]
+# The lexems of the low-level scanner, preceded by the literals that can be
+# recognized without context; regular expression literals look like
+# divisions, and are scanned separately (s. Tokenizer.scanRegexp).
+LEXEMS = re.compile(ur'''
+         (?P<dquote> "[^"\\]*(?:\\.[^"\\]*)*")    # string literals
+        |(?P<squote> '[^'\\]*(?:\\.[^'\\]*)*')
+        |(?P<commI>  //[^\n]*)                    # inline comment
+        |(?P<commM>  /\*.*?\*/)                   # multi-line comment
+        |''' + Scanner.Scanner.patt.pattern, re.VERBOSE|re.DOTALL|re.MULTILINE|re.UNICODE)
 
+BUILTIN = frozenset(lang.BUILTIN)
 
-##
-# check if the preceding tokens contain an odd number of '\'
-def is_last_escaped_token(tokens):
-    cnt = 0
-    i   = 1
-    while True:
-        if tokens[-i]['source'] == '\\':
-            cnt += 1
-            i -= 1
-        else:
-            break
-    return cnt % 2 == 1
-
-
-def is_last_escaped_tokobj(tokens):
-    cnt = 0
-    i   = 1
-    while True:
-        if tokens[-i].value == '\\':
-            cnt += 1
-            i -= 1
-        else:
-            break
-    return cnt % 2 == 1
+# tokens passed over when looking for the token before a '/'
+NON_GRAMMATICAL = ("white", "eol", "comment")
 
 
-class Tokenizer(object):
+##
+# Token  -- a token record; the attributes are those of the former token
+#           dicts
+class Token(object):
+    __slots__ = ("type", "source", "detail", "line", "column", "id")
 
-    def __init__(self):
-        self.in_stream = None
-        self.token_pipe = None # make this a pipe with ready-to-use Token()'s
-        self.out_stream = None
-        self.line = None
-        self.column = None
-        self.sol = None
-        self.scanner = None
-        self.uniqueId = None
+    KEYS = __slots__
 
-    ##
-    # Interface function
-    def parseStream(self, content, uniqueId=""):
-        self.out_stream = []
-        self.uniqueId = uniqueId
-        self.line = self.column = 1
-        self.sol = 0  # index of start-of-line
-        self.scanner = scanner = Scanner.LQueue(tokens_2_obj(content, ))
-        scanner.content = content
-        scanner.slice = scanner_slice
-
-        # set up internal Token stream
-        self.token_pipe = LQueue(self.parseToken())
-
-        for token in self.token_pipe:
-            # delayed property settings on tokens (because they need peek ahead in Token stream)
-            if token['type'] == 'comment':
-                if self.restLineIsEmpty(self.token_pipe):
-                    token['end'] = True                 # last non-white token on line
-                else:
-                    token['end'] = False
-                if token['end'] and not token['begin']:
-                    token['connection'] = "after"
-                else:
-                    token['connection'] = "before"
-            self.out_stream.append(token)
+    def __init__(self, type_, source, detail, line, column, id_):
+        self.type   = type_
+        self.source = source
+        self.detail = detail
+        self.line   = line
+        self.column = column
+        self.id     = id_
 
-        return self.out_stream
+    # -- dict protocol, for consumers of the former token stream
 
+    def __getitem__(self, key):
+        if key in self.KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
 
-    def parseToken(self):
-        for tok in self.scanner:
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
 
-            hasNoPreviousDot = True
-            try:
-                hasNoPreviousDot = self.out_stream[-1]['detail'] != "DOT"
-            except (IndexError):
-                pass
+    def __contains__(self, key):
+        return key in self.KEYS
 
-            # some inital values (tok isinstanceof Scanner.Token())
-            token = {
-                "source" : tok.value,
-                "detail" : "",
-                "line"   : self.line,
-                "column" : tok.spos - self.sol + 1,
-                "id"     : self.uniqueId
-                }
+    def get(self, key, default=None):
+        if key in self.KEYS:
+            return getattr(self, key)
+        return default
 
-            # white space
-            if (tok.name == 'white'):
-                #continue
-                token['type'] = 'white'
+    def keys(self):
+        return list(self.KEYS)
 
-            # end of file
-            elif tok.name == 'eof':
-                token['type'] = 'eof'
+    def asDict(self):
+        return dict((key, getattr(self, key)) for key in self.KEYS)
 
-            # line break
-            elif tok.name == 'nl':
-                token['type']   = 'eol'
-                token['source'] = '\n'
-                self.line += 1                  # increase line count
-                self.sol  = tok.spos + tok.len  # char pos of next line start
-
-            # float
-            elif tok.name == 'float':
-                token['type'] = 'number'
-                token['detail'] = 'float'
-
-            # hex integer
-            elif tok.name == 'hexnum':
-                token['type'] = 'number'
-                token['detail'] = 'int'
-
-            # integer
-            elif tok.name == 'number':
-                token['type'] = 'number'
-                token['detail'] = 'int'
+    def __repr__(self):
+        return repr(self.asDict())
 
-            # string
-            elif tok.value in ('"', "'"):
-                # accumulate strings
-                token['type'] = 'string'
-                if tok.value == '"':
-                    token['detail'] = 'doublequotes'
-                else:
-                    token['detail'] = 'singlequotes'
-                try:
-                    token['source'] = self.parseString(self.scanner, tok.value)
-                except SyntaxException, e:
-                    self.raiseSyntaxException(token, e.args[0])
-                token['source'] = token['source'][:-1]
-                # adapt line number -- this assumes multi-line strings are not generally out
-                linecnt = len(re.findall("\n", token['source']))
-                if linecnt > 0:
-                    self.line += linecnt
-
-            # identifier, operator
-            elif tok.name in ("ident", "op", "mulop"):
-
-                # JS operator symbols
-                if tok.value in lang.TOKENS:
-                    # division, div-assignment, regexp
-                    if tok.value in ('/', '/='):
-                        # get the preceding (real) token
-                        for ptoken in reversed(self.out_stream):
-                            if ptoken['type'] in ('eol', 'white'):
-                                continue
-                            else:
-                                prev_token = ptoken
-                                break
-                        # regex literal
-                        if (len(self.out_stream) == 0 or (
-                                (prev_token['type'] not in ['number',   # divison of number
-                                                            'name',     # var holding a number
-                                                            'string'])  # string representing a number
-                                and (prev_token['detail'] not in ['RP', # call returning a number
-                                                                  'RB'])# <can't remember>
-                                )):
-                            try:
-                                regexp = self.parseRegexp(self.scanner)
-                            except SyntaxException, e:
-                                self.raiseSyntaxException(token, e.args[0])
-                            token['type'] = 'regexp'
-                            token['source'] = tok.value + regexp
-                        # div, div-assign
-                        else:
-                            token['type'] = 'token'
-                            token['detail'] = lang.TOKENS[tok.value]
-
-                    # comment, inline
-                    elif tok.value == '//':
-                        # accumulate inline comments
-                        if (len(self.out_stream) == 0 or
-                            not is_last_escaped_token(self.out_stream)):
-                            #import pydb; pydb.debugger()
-                            commnt = self.parseCommentI(self.scanner)
-                            token['type'] = 'comment'
-                            token['source'] = tok.value + commnt
-                            token['begin'] = not self.hasLeadingContent(self.out_stream)
-                            token['end'] = True
-                            token['connection'] = "before" if token['begin'] else "after"  # "^//...\n i=1;" => comment *before* code; "i=1; //..." => comment *after* code
-                            token['multiline'] = False
-                            token['detail'] = 'inline'
-                        else:
-                            print >> sys.stderr, "Inline comment out of context"
-
-                    # comment, multiline
-                    elif tok.value == '/*':
-                        # accumulate multiline comments
-                        if (len(self.out_stream) == 0 or
-                            not is_last_escaped_token(self.out_stream)):
-                            token['type'] = 'comment'
-                            try:
-                                commnt = self.parseCommentM(self.scanner)
-                            except SyntaxException, e:
-                                self.raiseSyntaxException(token, e.args[0])
-                            commnt = self.alignMultiLines(commnt, token['column'])
-                            token['source'] = tok.value + commnt
-                            token['detail'] = Comment.Comment(token['source']).getFormat()
-                            token['begin'] = not self.hasLeadingContent(self.out_stream)  # first non-white token on line
-                            if token['begin']:
-                                token['source'] = Comment.Text(token['source']).outdent(self.column - 1)
-                            # adapt line number
-                            linecnt = len(re.findall("\n", token['source']))
-                            if linecnt > 0:
-                                self.line += linecnt
-                                token['multiline'] = True
-                            else:
-                                token['multiline'] = False
-
-                        else:
-                            print >> sys.stderr, "Multiline comment out of context"
-
-                    # every other operator goes as is
-                    else:
-                        token['type'] = 'token'
-                        token['detail'] = lang.TOKENS[tok.value]
-
-                # JS keywords
-                elif tok.value in lang.RESERVED and hasNoPreviousDot:
-                    # valid syntax:
-                    #   a.import            // following if condition checks for this
-                    #   a = { import: 1 }   // Note: Generator will still (incorrectly) grumble about that
-                    #
-                    # See: https://developer.mozilla.org/en-US/docs/Web/JavaScript/Reference/Reserved_Words#Reserved_word_usage
-                    try:
-                        prev = self.out_stream[-1]
-                        prevprev = self.out_stream[-2]
-
-                        # only allow FUTURE_RESERVED words because of backwards compatibility
-                        # Note: In ES5 RESERVED_WORDS are allowed here also
-                        if tok.value in lang.FUTURE_RESERVED and self.isPropertyWithinMemberExpression(tok, prev, prevprev):
-                            token['type'] = 'name'
-                            token['detail'] = 'public'  # wouldn't be reserved word if not public
-                        else:
-                            token['type'] = 'reserved'
-                            token['detail'] = lang.RESERVED[tok.value]
-                    except (IndexError):
-                        token['type'] = 'reserved'
-                        token['detail'] = lang.RESERVED[tok.value]
-
-                # JS/BOM objects
-                elif tok.value in lang.BUILTIN:
-                    token['type'] = 'builtin'
-
-                # identifier
-                elif tok.value[:2] == "__":
-                    token['type'] = 'name'
-                    token['detail'] = 'private'
-                elif tok.value[0] == "_":
-                    token['type'] = 'name'
-                    token['detail'] = 'protected'
-                else:
-                    token['type'] = 'name'
-                    token['detail'] = 'public'
 
-            # unknown token
-            else:
-                print >> sys.stderr, "Unhandled lexem: %s" % tok
-                pass
+##
+# CommentToken  -- comment tokens also tell where they are on their line
+class CommentToken(Token):
+    __slots__ = ("begin", "end", "connection", "multiline")
 
-            yield token
+    KEYS = Token.KEYS + __slots__
 
 
-    ##
-    # parse a string (both double and single quoted)
-    def parseString(self, scanner, sstart):
-        # parse string literals
-        result = []
-        try:
-            while True:
-                part = scanner.next(sstart)
-                result.append(part.value)
-                if not Scanner.is_last_escaped(part.value):  # be aware of escaped quotes
-                    break
-        except StopIteration:
-            raise SyntaxException("Unterminated string: '%s'" % u''.join(result))
-        return u"".join(result)
+class Tokenizer(object):
 
+    def __init__(self):
+        self.line = None
+        self.uniqueId = None
 
     ##
-    # parse a regular expression
-    def parseRegexp(self, scanner):
-        # leading '/' is already consumed
-        rexp = ""
-        in_char_class = False
-        token = scanner.next()
-        try:
-            while True:
-                rexp += token.value      # accumulate token strings
-
-                # -- Check last token
-                # character classes
-                if token.value == "[":
-                    if not Scanner.is_last_escaped(rexp): # i.e. not preceded by an odd number of "\"
-                        in_char_class = True
-                elif token.value == "]" and in_char_class:
-                    if not Scanner.is_last_escaped(rexp):
-                        in_char_class = False
-                elif token.name in ['nl','eof']:
-                    raise StopIteration
-                # check for termination of rexp
-                elif rexp[-1] == "/" and not in_char_class:  # rexp[-1] != token.value if token.value == "//"
-                    if not Scanner.is_last_escaped(rexp):
-                        break
-                token = scanner.next()
-
-        except StopIteration:
-            raise SyntaxException("Unterminated regexp literal: '%s'" % rexp)
+    # Interface function
+    def parseStream(self, content, uniqueId=""):
+        self.uniqueId = uniqueId
+        tokens   = []
+        append   = tokens.append
+        comments = []  # indexes of the comment tokens
+        match    = LEXEMS.match
+        TOKENS, RESERVED = lang.TOKENS, lang.RESERVED
+        line     = 1
+        sol      = 0  # index of start-of-line
+        pos      = 0
+        length   = len(content)
+
+        while pos < length:
+            mo     = match(content, pos)
+            kind   = mo.lastgroup
+            source = mo.group()
+            column = pos - sol + 1
+            start, pos = pos, mo.end()
 
-        # regexp modifiers
-        try:
-            if scanner.peek()[0].name == "ident":
-                token = scanner.next()
-                rexp += token.value
-        except StopIteration:
-            pass
+            # white space
+            if kind == "white":
+                append(Token("white", source, "", line, column, uniqueId))
+
+            # identifier
+            elif kind == "ident":
+                if source in RESERVED and (not tokens or tokens[-1].detail != "DOT"):  # not a.delete
+                    append(Token("reserved", source, RESERVED[source], line, column, uniqueId))
+                elif source in BUILTIN:
+                    append(Token("builtin", source, "", line, column, uniqueId))
+                elif source[:2] == "__":
+                    append(Token("name", source, "private", line, column, uniqueId))
+                elif source[0] == "_":
+                    append(Token("name", source, "protected", line, column, uniqueId))
+                else:
+                    append(Token("name", source, "public", line, column, uniqueId))
+
+            # operator
+            elif kind in ("op", "mulop"):
+                if source in ("/", "/="):
+                    # regexp, unless the preceding (real) token is something to divide
+                    i = len(tokens) - 1
+                    while i >= 0 and tokens[i].type in NON_GRAMMATICAL:
+                        i -= 1
+                    if i < 0 or (tokens[i].type not in ("number", "name", "string")
+                                 and tokens[i].detail not in ("RP", "RB")):
+                        try:
+                            pos = self.scanRegexp(content, pos)
+                        except SyntaxException, e:
+                            self.raiseSyntaxException(line, e.args[0])
+                        append(Token("regexp", content[start:pos], "", line, column, uniqueId))
+                    else:
+                        append(Token("token", source, TOKENS[source], line, column, uniqueId))
+                elif source == "/*":
+                    self.raiseSyntaxException(line, "Unterminated multi-line comment:\n '%s'" %
+                                              content[pos:pos+200])
+                elif source in TOKENS:
+                    append(Token("token", source, TOKENS[source], line, column, uniqueId))
+                elif source in ('"', "'"):
+                    self.raiseSyntaxException(line, "Unterminated string: '%s'" % content[pos:pos+200])
+                else:
+                    append(Token("name", source, "public", line, column, uniqueId))
 
-        return rexp
+            # line break
+            elif kind == "nl":
+                append(Token("eol", "\n", "", line, column, uniqueId))
+                line += 1
+                sol = pos
 
+            # number
+            elif kind == "float":
+                append(Token("number", source, "float", line, column, uniqueId))
+            elif kind in ("number", "hexnum"):
+                append(Token("number", source, "int", line, column, uniqueId))
 
-    ##
-    # parse an inline comment // ...
-    def parseCommentI(self, scanner):
-        result = scanner.next('\n')  # inform the low-level scanner to switch to commentI
-        return result.value
+            # string
+            elif kind in ("dquote", "squote"):
+                source = source[1:-1]
+                append(Token("string", source, "doublequotes" if kind == "dquote" else "singlequotes",
+                             line, column, uniqueId))
+                # adapt line number -- this assumes multi-line strings are not generally out
+                line += source.count("\n")
 
+            # comment
+            else:
+                if kind == "commI":
+                    token = CommentToken("comment", source, "inline", line, column, uniqueId)
+                    token.multiline = False
+                else:
+                    source = "/*" + self.alignMultiLines(source[2:], column)
+                    token = CommentToken("comment", source, Comment.Comment(source).getFormat(),
+                                         line, column, uniqueId)
+                    linecnt = source.count("\n")
+                    line += linecnt
+                    token.multiline = linecnt > 0
+                token.begin = not self.hasLeadingContent(tokens)  # first non-white token on line
+                comments.append(len(tokens))
+                append(token)
+
+        self.line = line
+        append(Token("eof", "", "", line, pos - sol + 1, uniqueId))
+
+        # comment properties that need the tokens after the comment
+        for i in comments:
+            token, next_ = tokens[i], tokens[i+1]
+            token.end = (next_.type == "eol" or  # last non-white token on line
+                         (next_.type == "white" and tokens[i+2].type == "eol"))
+            if token.end and not token.begin:
+                token.connection = "after"
+            else:
+                token.connection = "before"
 
-    ##
-    # parse a multiline comment /* ... */
-    def parseCommentM(self, scanner):
-        res = []
-        try:
-            while True:
-                token = scanner.next(r'\*/')  # inform the low-level scanner to switch to commentM
-                res.append(token.value)
-                if not Scanner.is_last_escaped(token.value):
-                    break
-        except StopIteration:
-            raise SyntaxException("Unterminated multi-line comment:\n '%s'" % u''.join(res))
-        return u"".join(res)
+        return tokens
 
 
     ##
-    # generic element parser for delimited strings (string/regex literals,
-    # comments)
-    # both start token and terminator token will be part of the element
-    def parseDelimited(self, scanner, terminator):
-        tokens = []
-        for token in scanner:
-            tokens.append(token)
-            if token.value == terminator:
-                if not is_last_escaped_tokobj (tokens):
+    # Scan a regular expression literal, from <pos> (after the leading '/');
+    # returns the position after it (and its modifiers)
+    def scanRegexp(self, content, pos):
+        match  = Scanner.Scanner.patt.match
+        length = len(content)
+        rexp   = ""
+        in_char_class = False
+        while True:
+            if pos >= length:
+                raise SyntaxException("Unterminated regexp literal: '%s'" % rexp)
+            mo = match(content, pos)
+            pos = mo.end()
+            value = mo.group()
+            rexp += value           # accumulate lexems
+
+            # -- Check last lexem
+            # character classes
+            if value == "[":
+                if not Scanner.is_last_escaped(rexp): # i.e. not preceded by an odd number of "\"
+                    in_char_class = True
+            elif value == "]" and in_char_class:
+                if not Scanner.is_last_escaped(rexp):
+                    in_char_class = False
+            elif mo.lastgroup == "nl":
+                raise SyntaxException("Unterminated regexp literal: '%s'" % rexp)
+            # check for termination of rexp
+            elif rexp[-1] == "/" and not in_char_class:
+                if not Scanner.is_last_escaped(rexp):
                     break
-        else:
-            res = scanner.slice(tokens[0].spos, token.spos + token.len)
-            raise SyntaxException ("Run-away element", res)
 
-        return tokens
+        # regexp modifiers
+        if pos < length:
+            mo = match(content, pos)
+            if mo.lastgroup == "ident":
+                pos = mo.end()
+
+        return pos
 
 
     ##
     # syntax exception helper
-    def raiseSyntaxException (self, token, desc = u""):
-        msg = desc + " (%s:%d)" % (token['id'], token['line'])
+    def raiseSyntaxException (self, line, desc = u""):
+        msg = desc + " (%s:%d)" % (self.uniqueId, line)
         raise SyntaxException (msg)
 
-    ##
-    # check if the rest of the line is empty (only white)
-    def restLineIsEmpty(self, scanner):
-        try:
-            toks = scanner.peek(2)
-        except StopIteration:
-            return True   # TODO: this is a hack
-
-        if (toks[0]['type'] == 'eol' or
-            (toks[0]['type'] == 'white' and toks[1]['type'] == 'eol')):
-            return True
-        else:
-            return False
-
-    ##
-    # Whether tok is a property within a MemberExpression.
-    #
-    # Example:
-    #   foo.bar.interestingProperty
-    #     tok = interestingProperty
-    #     prevtok = .
-    #     preprevtok = bar
-    #
-    #   returns True
-    #
-    def isPropertyWithinMemberExpression(self, tok, prevtok, prevprevtok):
-        pt = prevtok
-        ppt = prevprevtok
-        return (tok.name == 'ident' and (pt['detail'] == 'DOT' and pt['type'] == 'token') and
-                (ppt['detail'] in ('public', 'protected', 'private') and ppt['type'] == 'name'))
-
     ##
     # check if there is a preceding non-white token on this line
     def hasLeadingContent(self, tokens):
-        # tokens empty
-        if not len(tokens):
-            return False
-        else:
-            for token in reversed(tokens):
-                if token["type"] == 'eol':
-                    break
-                if token["type"] not in ('white', 'eol'):
-                    return True
-            return False
+        for token in reversed(tokens):
+            if token.type == 'eol':
+                break
+            if token.type != 'white':
+                return True
+        return False
 
     ##
     # Remove whitespace at the beginning of subsequent lines in a multiline text
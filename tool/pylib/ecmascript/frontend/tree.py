@@ -60,40 +60,81 @@ class NodeAccessException (Exception):
 NODE_VARIABLE_TYPES = ("dotaccessor", "identifier")
 NODE_STATEMENT_CONTAINERS = ("statements", "block")
 
+##
+# Nodes are slotted, as there are millions of them: the instance attributes
+# all nodes have are slots, other ones (like .scope or .hint) go to a
+# __dict__ that is only created for the nodes that get them.
+#
+# Node types are interned. The .attributes dict is created on first use, and
+# nodes without children share the empty tuple as .children, which is
+# replaced by a list when children are added (use addChild() or the like,
+# rather than .children.append()).
+#
 class Node(object):
 
+    __slots__ = ("type", "parent", "children", "_attributes", "dep", "__dict__")
+
     def __init__ (self, ntype):
-        self.type = ntype
+        self.type = intern(ntype) if ntype.__class__ is str else ntype
         self.parent = None
-        self.children = []
-        self.attributes = {}
+        self.children = NO_CHILDREN
+        self._attributes = None
         self.dep = None # a potential DependencyItem()
 
     def __str__(self):
         return nodeToXmlStringNR(self)
 
+    ##
+    # Compact pickle state: the values of the slots, and the dict of the
+    # other attributes (or None)
+    def __getstate__(self):
+        return tuple([getattr(self, name, None) for name in slotNames(self.__class__)]) + (
+            extraAttributes(self) or None,)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):  # pickled before nodes were slotted
+            for key, val in state.items():
+                setattr(self, key, val)
+            return
+        for name, val in zip(slotNames(self.__class__), state):
+            setattr(self, name, val)
+        if state[-1]:
+            self.__dict__.update(state[-1])
+
+    def _getAttributes(self):
+        if self._attributes is None:
+            self._attributes = {}
+        return self._attributes
+
+    def _setAttributes(self, attributes):
+        self._attributes = attributes
+
+    def _delAttributes(self):
+        self._attributes = None
+
+    attributes = property(_getAttributes, _setAttributes, _delAttributes)
+
 
     def hasAttributes(self):
         #return hasattr(self, "attributes")
         # ApiLoader._isNodeIdentical() needs this len() check
         # TODO: remove commented calls to hasAttributes() and hasattr(self,attributes)
-        return len(self.attributes)
+        return len(self._attributes or ())
 
     def set(self, key, value):
         """Sets an attribute"""
         if not isinstance(value, (basestring, int, long, float, complex, bool)):
             raise NodeAccessException("'value' is no string or number: " + str(value), self)
-        #if not self.hasAttributes():
-        if False:
-            self.attributes = {}
-        self.attributes[key] = value
+        if self._attributes is None:
+            self._attributes = {}
+        self._attributes[key] = value
         return self
 
     def get(self, key, default = None):
         value = None
-        #if hasattr(self, "attributes") and key in self.attributes:
-        if key in self.attributes:
-            value = self.attributes[key]
+        attributes = self._attributes
+        if attributes and key in attributes:
+            value = attributes[key]
 
         if value != None:
             return value
@@ -103,12 +144,12 @@ class Node(object):
             raise NodeAccessException("Node " + self.type + " has no attribute " + key, self)
 
     def remove(self, key):
-        if not key in self.attributes:
+        if not self._attributes or not key in self._attributes:
             return
 
-        del self.attributes[key]
-        if len(self.attributes) == 0:
-            del self.attributes
+        del self._attributes[key]
+        if len(self._attributes) == 0:
+            self._attributes = None
 
     ##
     # Make a default copy of self (this includes instanceof)
@@ -116,14 +157,15 @@ class Node(object):
         clone_ = copy.copy(self)
         # keep .attributes non-shared
         if True:
-            clone_.attributes = copy.copy(self.attributes)
+            clone_._attributes = copy.copy(self._attributes)
         return clone_
 
     ##
     # Copy the properties of self into other
     # (this might not be entirely in sync with treegenerator.symbol())
     def patch(self, other):
-        for attr, val in vars(self).items():
+        attrs = [(x, getattr(self, x)) for x in slotNames(self.__class__) if hasattr(self, x)]
+        for attr, val in attrs + extraAttributes(self).items():
             if attr in (
                 "type", "id",  # preserve other's classification
                 "children", # don't adopt existing children (what would their .parent be?!)
@@ -132,8 +174,7 @@ class Node(object):
                 continue
             setattr(other, attr, val)
         # keep .attributes non-shared
-        if hasattr(self, "attributes"):
-            other.attributes = copy.copy(self.attributes)
+        other._attributes = copy.copy(self._attributes)
 
     def hasParent(self):
         return self.parent
@@ -195,6 +236,8 @@ class Node(object):
             if childNode.parent and childNode in childNode.parent.children:
                 childNode.parent.removeChild(childNode)
 
+            if not self.children:
+                self.children = []
             if index != None:
                 self.children.insert(index, childNode)
             else:
@@ -234,28 +277,20 @@ class Node(object):
 
     def hasChildRecursive(self, ntype):
         if isinstance(ntype, basestring):
-            if self.type == ntype:
-                return True
-        elif isinstance(ntype, util.FinSequenceTypes):
-            if self.type in ntype:
+            ntype = (ntype,)
+        elif not isinstance(ntype, util.FinSequenceTypes):
+            return False
+        for node in preorderIter(self):
+            if node.type in ntype:
                 return True
-
-        if self.children:
-            for child in self.children:
-                if child.hasChildRecursive(ntype):
-                    return True
-
         return False
 
     ##
     # Whether <node> is self, or a descendant in the tree rooted by self.
     def contains(self, node):
-        if self is node:
-            return node
-        else:
-            for child in self.children:
-                if child.contains(node):
-                    return node
+        for child in preorderIter(self):
+            if child is node:
+                return node
         return None
 
     ##
@@ -600,10 +635,12 @@ class Node(object):
         if mandatory:
             raise NodeAccessException("Node " + self.type + " has no child " + listName, self)
 
+    ##
+    # All descendants of type <ntype>, in document order
     def getAllChildrenOfType(self, ntype):
         return self._getAllChildrenOfType(ntype, [])
 
-    def _getAllChildrenOfType(self, ntype, found=[]):
+    def _getAllChildrenOfType(self, ntype, found):
         if self.children:
             for child in self.children:
                 if child.type == ntype:
@@ -627,12 +664,7 @@ class Node(object):
 
     def nodeIter(self):
         "A generator/iterator method, to traverse a tree and 'yield' each node"
-        yield self
-
-        if self.children:
-            for child in self.children:
-                for node in child.nodeIter():
-                    yield node
+        return preorderIter(self)
 
     def nodeTreeMap(self, fn):
         """As an alternative, a pure recursion walk that applies a function fn to each node.
@@ -649,6 +681,103 @@ class Node(object):
             return
 
 
+NO_CHILDREN = ()  # .children of the nodes without children
+
+_slotNames = {}  # {node class : (slot name, ...)}
+
+##
+# The names of the slots of the nodes of class <cls>
+def slotNames(cls):
+    try:
+        return _slotNames[cls]
+    except KeyError:
+        names = []
+        for c in reversed(cls.__mro__):
+            for name in c.__dict__.get("__slots__", ()):
+                if name not in ("__dict__", "__weakref__") and name not in names:
+                    names.append(name)
+        names = _slotNames[cls] = tuple(names)
+        return names
+
+##
+# The attributes of <node> that are not slots (like .scope or .hint), as a
+# dict; this does not create the __dict__ of a node that has none
+def extraAttributes(node):
+    extra = node.__dict__
+    if not extra:
+        del node.__dict__
+    return extra
+
+
+##
+# Tree traversal without recursion, for trees of any depth.
+#
+# preorderIter() yields the nodes of the tree rooted by <node> in document
+# order, parents before their children; postorderIter() yields them with
+# the children before their parent. With <nodetypes>, only nodes of these
+# types are yielded (the others are still descended into). With <prune>, a
+# function fn(node), the children of nodes for which it returns True are
+# skipped (the node itself is yielded).
+#
+# By default, the children of a node are iterated as the list is when they
+# are reached (like a recursive "for child in node.children"), without copying
+# it. With <safe>, a copy of the list is taken when the walk descends into the
+# node (in preorderIter(), after it was yielded), so the caller may remove,
+# replace or add nodes while walking.
+##
+
+def preorderIter(node, nodetypes=None, prune=None, safe=False):
+    if nodetypes is None or node.type in nodetypes:
+        yield node
+    if not node.children or (prune and prune(node)):
+        return
+    if safe:
+        stack = list(node.children[::-1])
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            if nodetypes is None or node.type in nodetypes:
+                yield node
+            if node.children and not (prune and prune(node)):
+                extend(node.children[::-1])
+    else:
+        # a stack of iterators over the live lists of children
+        stack = [iter(node.children)]
+        push, pop = stack.append, stack.pop
+        while stack:
+            for node in stack[-1]:
+                if nodetypes is None or node.type in nodetypes:
+                    yield node
+                if node.children and not (prune and prune(node)):
+                    push(iter(node.children))
+                    break
+            else:
+                pop()
+
+
+def postorderIter(node, nodetypes=None, prune=None, safe=False):
+    if not node.children or (prune and prune(node)):
+        if nodetypes is None or node.type in nodetypes:
+            yield node
+        return
+    # (node, iterator over its children) of the nodes on the path
+    children = list(node.children) if safe else node.children
+    stack = [(node, iter(children))]
+    push, pop = stack.append, stack.pop
+    while stack:
+        for child in stack[-1][1]:
+            if child.children and not (prune and prune(child)):
+                children = list(child.children) if safe else child.children
+                push((child, iter(children)))
+                break
+            if nodetypes is None or child.type in nodetypes:
+                yield child
+        else:
+            node = pop()[0]
+            if nodetypes is None or node.type in nodetypes:
+                yield node
+
+
 def nodeToXmlStringNR(node, prefix="", encoding="utf-8"):
     hasText = False
     asString = prefix + "<" + node.type
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# Compact serialization of syntax trees (tree.Node and treegenerator.symbol_base
+# object graphs), for the compile cache.
+#
+# A tree is stored as a flat list of node records in pre-order, each with
+# the index of its parent record, so the .children (and comment) lists and
+# the .parent links are rebuilt on load, rather than unpickled. Node classes
+# and types are kept in tables and referenced by index. The records are
+# written with marshal, which is a lot faster to load than pickle.
+#
+# Everything else attached to the nodes (scopes, hints, ...) is pickled,
+# with references to tree nodes replaced by record indexes.
+#
+# Records of version 2 may have None for the .attributes of a node (see
+# tree.Node), and empty children and comment lists are the empty tuple.
+##
+
+import sys, marshal
+import cPickle as pickle
+from cStringIO import StringIO
+from ecmascript.frontend import tree
+
+MAGIC   = "QXTC"  # never the first bytes of a pickle (protocol 2)
+VERSION = 2
+VERSIONS = (1, 2)  # the versions loads() reads
+
+COMMENT_LISTS = ("comments", "commentsIn", "commentsAfter")
+SLOTS         = ("children",) + COMMENT_LISTS  # lists a record can belong to
+
+MISSING = object()
+
+F_COMMENTS = 1  # node has (empty or record-backed) comment lists
+F_DEP      = 2  # node has a .dep of None
+
+_classes = {}  # {(module, name): class}
+
+
+class TreeCodecError(ValueError): pass
+
+
+##
+# Serialize the tree rooted at <root> into a string
+def dumps(root):
+    classes, classIds = [], {}
+    types, typeIds    = [], {}
+    records = []
+    extras  = {}  # {record index: {attribute: value}}
+    index   = {}  # {id(node): record index}
+    nodes   = []  # keeps the nodes alive, so their id()s are unique
+
+    stack = [(root, -1, 0)]
+    while stack:
+        node, parent, slot = stack.pop()
+        if id(node) in index:
+            raise TreeCodecError("Node occurs more than once in the tree: %r" % node.type)
+        idx = index[id(node)] = len(nodes)
+        nodes.append(node)
+        try:
+            ntype, children, attributes = node.type, node.children, node._attributes
+        except AttributeError, e:
+            raise TreeCodecError("Not a tree node: %s" % e)
+
+        cls = node.__class__
+        clsKey = (cls.__module__, cls.__name__)
+        if clsKey not in classIds:
+            classIds[clsKey] = len(classes)
+            classes.append(clsKey)
+        if ntype not in typeIds:
+            typeIds[ntype] = len(types)
+            types.append(ntype)
+
+        flags = 0
+        extra = dict(tree.extraAttributes(node))
+        nodeParent = getattr(node, "parent", None)
+        if nodeParent is not (nodes[parent] if parent >= 0 and slot == 0 else None):
+            extra["parent"] = nodeParent  # deviating parent link
+        dep = getattr(node, "dep", MISSING)
+        if dep is None:
+            flags |= F_DEP
+        elif dep is not MISSING:
+            extra["dep"] = dep
+        pushed = []
+        comments = [getattr(node, key, MISSING) for key in COMMENT_LISTS]
+        if all(type(x) in (list, tuple) for x in comments):
+            flags |= F_COMMENTS
+            for slot_ in (3, 2, 1):
+                pushed.extend((c, idx, slot_) for c in reversed(comments[slot_ - 1]))
+        else:
+            for key, val in zip(COMMENT_LISTS, comments):
+                if val is not MISSING:
+                    extra[key] = val
+        if type(children) not in (list, tuple):
+            raise TreeCodecError("Not a tree node: .children is a %s" % type(children))
+        pushed.extend((c, idx, 0) for c in reversed(children))
+        stack.extend(pushed)
+
+        if extra:
+            extras[idx] = extra
+        records.append((classIds[clsKey], typeIds[ntype], parent, slot, flags, attributes))
+
+    extrasData = ""
+    if extras:
+        def persistent_id(obj):
+            return index.get(id(obj))
+        out = StringIO()
+        pickler = pickle.Pickler(out, 2)
+        pickler.inst_persistent_id = persistent_id
+        pickler.dump(extras)
+        extrasData = out.getvalue()
+
+    try:
+        return MAGIC + marshal.dumps((VERSION, classes, types, records, extrasData), 2)
+    except ValueError, e:  # unmarshallable attribute value
+        raise TreeCodecError(str(e))
+
+
+##
+# Whether <data> has been produced by dumps()
+def isEncoded(data):
+    return data[:len(MAGIC)] == MAGIC
+
+
+##
+# Rebuild the tree serialized in <data>; returns the root node
+def loads(data):
+    version, classNames, types, records, extrasData = marshal.loads(buffer(data, len(MAGIC)))
+    if version not in VERSIONS:
+        raise TreeCodecError("Unsupported tree format version: %r" % version)
+    classes = [_getClass(key) for key in classNames]
+
+    nodes  = [None] * len(records)
+    new    = object.__new__
+    idx    = 0
+    for cls, ntype, parent, slot, flags, attributes in records:
+        node = nodes[idx] = new(classes[cls])
+        idx += 1
+        node.type, node.children, node._attributes = types[ntype], tree.NO_CHILDREN, attributes
+        if flags & F_COMMENTS:
+            node.comments = node.commentsIn = node.commentsAfter = ()
+        if flags & F_DEP:
+            node.dep = None
+        if slot == 0 and parent >= 0:
+            pnode = node.parent = nodes[parent]
+            if pnode.children:
+                pnode.children.append(node)
+            else:
+                pnode.children = [node]
+        else:
+            node.parent = None
+            if parent >= 0:
+                pnode = nodes[parent]
+                lst = getattr(pnode, SLOTS[slot])
+                if lst:
+                    lst.append(node)
+                else:
+                    setattr(pnode, SLOTS[slot], [node])
+
+    if extrasData:
+        unpickler = pickle.Unpickler(StringIO(extrasData))
+        unpickler.persistent_load = nodes.__getitem__
+        for idx, extra in unpickler.load().iteritems():
+            node = nodes[idx]
+            for key, val in extra.iteritems():
+                setattr(node, key, val)
+
+    return nodes[0]
+
+
+def _getClass(key):
+    cls = _classes.get(key)
+    if cls is None:
+        module, name = key
+        __import__(module)
+        cls = _classes[key] = getattr(sys.modules[module], name)
+    return cls
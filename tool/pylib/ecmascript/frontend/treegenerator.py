@@ -139,7 +139,7 @@ class TokenStream(IterObject):
         while cnt < n:
             t = self.tok_stream.next()
             toks.append(t)
-            if t['type'] == "eof":
+            if t.type == "eof":
                 break
             while self._nonGrammaticalToken(t):
                 t = self.tok_stream.next()
@@ -150,7 +150,7 @@ class TokenStream(IterObject):
         for t in toks[::-1]:
             self.tokenStream.putBack(t)
 
-        return self._symbolFromToken(Token(toks[-1]))
+        return self._symbolFromToken(toks[-1])
 
     ##
     # Peek n tokens behind
@@ -161,7 +161,7 @@ class TokenStream(IterObject):
 
 
     def _nonGrammaticalToken(self, tok):
-        return tok['type'] in ['white', 'comment', 'eol']
+        return tok.type in ('white', 'comment', 'eol')
 
 
     ##
@@ -174,24 +174,24 @@ class TokenStream(IterObject):
         # The following huge dispatch could be avoided if the tokenizer already
         # provided the tokens with the right attributes (esp. name, detail).
 
-        # tok isinstanceof Token()
-        if tok.name == "white":
-            #s = symbol_table.get(tok.name)()  # grammar doesn't provide for 'white' currently
+        # tok isinstanceof tokenizer.Token()
+        if tok.type == "white":
+            #s = symbol_table.get(tok.type)()  # grammar doesn't provide for 'white' currently
             pass
-        elif tok.name == 'comment':
-            s = symbol_table.get(tok.name)()
+        elif tok.type == 'comment':
+            s = symbol_table.get(tok.type)()
             s.set('connection', tok.connection)  # relates to preceding or subsequent code
             s.set('begin', tok.begin)  # first non-white on line
             s.set('end', tok.end)   # last non-white on line
             s.set('detail', tok.detail)
             s.set('multiline', tok.multiline)  # true/false
             self.comments.append(s)         # keep comments in temp. store
-        elif tok.name == "eol":
+        elif tok.type == "eol":
             self.line += 1                  # increase line count
             #pass # don't yield this (yet)
             s = symbol_table.get("eol")()
 
-        elif tok.name == "eof":
+        elif tok.type == "eof":
             symbol = symbol_table.get("eof")
             s = symbol()
             s.value = ""
@@ -203,55 +203,55 @@ class TokenStream(IterObject):
             + SINGLE_LEFT_OPERATORS
             + PREFIX_VERB_OPERATORS
             ):
-            s = symbol_table[tok.value]()
+            s = symbol_table[tok.source]()
             s.type = "operation"
             s.set('operator', tok.detail)
         # 'assignment' nodes
         elif tok.detail in ASSIGN_OPERATORS:
-            s = symbol_table[tok.value]()
+            s = symbol_table[tok.source]()
             s.type = "assignment"
             s.set('operator', tok.detail)
         # 'constant' nodes
-        elif tok.name in ('number', 'string', 'regexp'):
+        elif tok.type in ('number', 'string', 'regexp'):
             symbol = symbol_table["constant"]
             s = symbol()
-            if tok.name == 'number':
+            if tok.type == 'number':
                 s.set('constantType', 'number')
                 s.set('detail', tok.detail)
-            elif tok.name == 'string':
+            elif tok.type == 'string':
                 s.set('constantType', 'string')
                 s.set('detail', tok.detail)
-            elif tok.name == 'regexp':
+            elif tok.type == 'regexp':
                 s.set('constantType', 'regexp')
-        elif tok.name in ('reserved',) and tok.detail in ("TRUE", "FALSE", "NULL"):
+        elif tok.type in ('reserved',) and tok.detail in ("TRUE", "FALSE", "NULL"):
             symbol = symbol_table["constant"]
             s = symbol()
             if tok.detail in ("TRUE", "FALSE"):
                 s.set('constantType', 'boolean')
             elif tok.detail == "NULL":
                 s.set('constantType', 'null')
-        elif tok.name in ('name', 'builtin'):
+        elif tok.type in ('name', 'builtin'):
             s = symbol_table["identifier"]()
             # debug hook
-            if 0 and tok.value == "pydb":  # to activate, enter "pydb;" in JS code
+            if 0 and tok.source == "pydb":  # to activate, enter "pydb;" in JS code
                 import pydb; pydb.debugger()
         else:
             # TODO: token, reserved
             # name or operator
-            if tok.value == "this":
-                # unfortunately, this comes as tok.name=='reserved' like operators
+            if tok.source == "this":
+                # unfortunately, this comes as tok.type=='reserved' like operators
                 # re-labeling this as identifier
                 s = symbol_table["identifier"]()
             else:
-                symbol = symbol_table.get(tok.value)
+                symbol = symbol_table.get(tok.source)
                 if symbol:
                     s = symbol()
                 else:
-                    raise SyntaxException("Unknown operator %r (pos %r)" % (tok.value, (tok.line,tok.column)))
+                    raise SyntaxException("Unknown operator %r (pos %r)" % (tok.source, (tok.line,tok.column)))
                     #s = symbol_table['(unknown)']()
 
         if s:
-            s.set('value', tok.value)
+            s.set('value', tok.source)
             s.set('column', tok.column)
             s.set('line', tok.line)
 
@@ -262,9 +262,8 @@ class TokenStream(IterObject):
     ##
     # yields syntax nodes as "tokens" (kind of a misnomer)
     def __iter__(self):
-        for i,t in enumerate(self.tok_stream):
+        for i,tok in enumerate(self.tok_stream):
             self.tpos = i
-            tok = Token(t)
             s = self._symbolFromToken(tok)
             if not s:
                 continue
@@ -286,26 +285,6 @@ class TokenStream(IterObject):
                 yield s
 
 
-class Token(object):
-    def __init__(tok, t):
-        tok.begin = t.get( "begin")
-        tok.column = t.get( "column")
-        tok.connection = t.get( "connection")
-        tok.detail = t.get( "detail")
-        tok.end = t.get( "end")
-        tok.id = t["id"]
-        tok.line = t.get( "line")
-        tok.multiline = t.get( "multiline")
-        tok.name = t["type"] if t["type"]!="token" else "operator" # i hate the token "token"
-        tok.value = t["source"]
-        tok.len = len(tok.value)
-
-    def __str__(s):
-        return "(%s[\"%s...\"](%s:%s))" % (s.name, s.value[:10],s.line, s.column)
-
-    __repr__ = __str__
-
-
 # - Grammar Infrastructure -------------------------------------------------
 
 # symbol (token type) registry
@@ -329,6 +308,8 @@ def _del_parent(self):
 
 class symbol_base(Node):
 
+    __slots__ = ("comments", "commentsIn", "commentsAfter")
+
     def __init__(self, line=None, column=None):  # to override Node.__init__(self,type)
         #self.attributes = {}  # compat with Node.attributes
         #self.children   = []  # compat with Node.children
@@ -337,9 +318,10 @@ class symbol_base(Node):
             self.set("line", line)
         if column:
             self.set("column", column)
-        self.comments = []   # [Node(comment)] of comments preceding the node ("commentsBefore")
-        self.commentsIn    = []
-        self.commentsAfter = []
+        # (empty tuples are shared; the lists are set by the parser)
+        self.comments = ()   # [Node(comment)] of comments preceding the node ("commentsBefore")
+        self.commentsIn    = ()
+        self.commentsAfter = ()
         #self.scope = None  # pot. link to Scope() object
         #self.hint = None  # pot. link to Hint() object
 
@@ -350,7 +332,10 @@ class symbol_base(Node):
     ##
     # thin wrapper around .children, to maintain .parent in them
     def childappend(self, child):
-        self.children.append(child)
+        if self.children:
+            self.children.append(child)
+        else:
+            self.children = [child]
         child.parent = self
 
     def pfix(self):
@@ -513,9 +498,8 @@ def symbol(id_, bind_left=0):
         s = symbol_table[id_]
     except KeyError:
         class s(symbol_base):
-            pass
+            __slots__ = ()
         s.__name__ = "symbol-" + id_ # for debugging
-        s.type     = id_  # compat with Node.type
         s.id       = id_
         s.value    = None
         s.bind_left = bind_left
@@ -996,7 +980,7 @@ def ifix(self, left):
     accessor.childappend(key)
     key.childappend(expression())
     # assert token.id == ']'
-    affix_comments(key.commentsAfter, token)
+    affix_comments(key, "commentsAfter", token)
     advance("]")
     return accessor
 
@@ -1010,9 +994,9 @@ def pfix(self):
             if is_after_comma:  # preserve dangling comma (bug#6210)
                 arr.childappend(symbol("(empty)")())
             if arr.children:
-                affix_comments(arr.children[-1].commentsAfter, token)
+                affix_comments(arr.children[-1], "commentsAfter", token)
             else:
-                affix_comments(arr.commentsIn, token)
+                affix_comments(arr, "commentsIn", token)
             break
         elif token.id == ",":  # elision
             arr.childappend(symbol("(empty)")())
@@ -2230,9 +2214,14 @@ def parameters():
 # - Helpers --------------------------------------------------------------------
 
 ##
-# Add the comments of node2 to node1's commentsAfter
-def affix_comments(node1_list, node2):
-    node1_list.extend(node2.comments)
+# Add the comments of node2 to node1's <attr> (.commentsAfter, .commentsIn)
+def affix_comments(node1, attr, node2):
+    if node2.comments:
+        comments = getattr(node1, attr)
+        if comments:
+            comments.extend(node2.comments)
+        else:  # the shared empty tuple
+            setattr(node1, attr, list(node2.comments))
 
 
 # - Class Frontend for the Grammar Infrastructure ------------------------------
@@ -314,6 +314,8 @@ tokenStream = None # stream of symbol_base() nodes
 
 class symbol_base(Node):
 
+    __slots__ = ("comments", "commentsIn", "commentsAfter")
+
     def __init__(self, line=None, column=None):  # to override Node.__init__(self,type)
         #self.attributes = {}  # compat with Node.attributes
         #self.children   = []  # compat with Node.children
@@ -322,14 +324,18 @@ class symbol_base(Node):
             self.set("line", line)
         if column:
             self.set("column", column)
-        self.comments = []   # [Node(comment)] of comments preceding the node ("commentsBefore")
-        self.commentsIn    = []
-        self.commentsAfter = []
+        # (empty tuples are shared; the lists are set by the parser)
+        self.comments = ()   # [Node(comment)] of comments preceding the node ("commentsBefore")
+        self.commentsIn    = ()
+        self.commentsAfter = ()
 
     ##
     # thin wrapper around .children, to maintain .parent in them
     def childappend(self, child):
-        self.children.append(child)
+        if self.children:
+            self.children.append(child)
+        else:
+            self.children = [child]
         child.parent = self
 
     def pfix(self):
@@ -584,9 +590,8 @@ def symbol(id_, bind_left=0):
         s = symbol_table[id_]
     except KeyError:
         class s(symbol_base):
-            pass
+            __slots__ = ()
         s.__name__ = "symbol-" + id_ # for debugging
-        s.type     = id_  # compat with Node.type
         s.id       = id_
         s.value    = None
         s.bind_left      = bind_left
@@ -2226,9 +2231,14 @@ def toJS(self, opts):
 # - Helpers --------------------------------------------------------------------
 
 ##
-# Add the comments of node2 to node1's commentsAfter
-def affix_comments(node1_list, node2):
-    node1_list.extend(node2.comments)
+# Add the comments of node2 to node1's <attr> (.commentsAfter, .commentsIn)
+def affix_comments(node1, attr, node2):
+    if node2.comments:
+        comments = getattr(node1, attr)
+        if comments:
+            comments.extend(node2.comments)
+        else:  # the shared empty tuple
+            setattr(node1, attr, list(node2.comments))
 
 
 # - Class Frontend for the Grammar Infrastructure ------------------------------
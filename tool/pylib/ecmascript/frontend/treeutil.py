@@ -236,15 +236,8 @@ def selectNode(node, path, ignoreComments=False):
 # External tree visitor.
 # If <nodetypes> is non-empty, use its elements for filtering tree nodes.
 def nodeIterator(node, nodetypes):
-    if nodetypes:
-        if node.type in nodetypes:
-            yield node
-    else:
-        yield node
-
-    for child in node.children[:]: # using a copy in case nodes are removed by the caller
-        for fcn in nodeIterator(child, nodetypes):
-            yield fcn
+    # safe: nodes may be removed by the caller
+    return tree.preorderIter(node, nodetypes or None, safe=True)
 
 ##
 # Generator for nodes of a certain type and attribute values
@@ -886,18 +879,67 @@ def ensureClosureWrapper(nodes):
 ##
 # NodeVisitor class
 #
+# visit() calls the visit_<type> method of the visitor for a node, if it has
+# one, and visits the children of the node otherwise (without recursion).
+# The methods are looked up once per visitor class (see visitorMethods()).
+#
 class NodeVisitor(object):
 
     def __init__(self, debug=False):
         self.debug = debug
         
     def visit(self, node):
-        if hasattr(self, "visit_"+node.type):
+        methods = visitorMethods(self)
+        method = methods[node.type]
+        if method is not None:
             if self.debug:
                 print "visiting:", node.type
-            getattr(self, "visit_"+node.type)(node)
-        else:
-            for child in node.children:
-                if self.debug:
-                    print "visiting:", child.type
-                self.visit(child)
+            method(self, node)
+            return
+        stack = list(node.children[::-1])
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            if self.debug:
+                print "visiting:", node.type
+            method = methods[node.type]
+            if method is not None:
+                method(self, node)
+            elif node.children:
+                extend(node.children[::-1])
+
+
+##
+# The dispatch table of a visitor class, {"<node type>" : function or None},
+# with the functions of its "<prefix><node type>" methods; it is filled as
+# node types are looked up.
+class VisitorMethods(dict):
+
+    def __init__(self, cls, prefix):
+        dict.__init__(self)
+        self.cls = cls
+        self.prefix = prefix
+
+    def __missing__(self, ntype):
+        method = getattr(self.cls, self.prefix + ntype, None)
+        self[ntype] = method = getattr(method, "im_func", method)
+        return method
+
+_visitorMethods = {}  # {(visitor class, prefix) : VisitorMethods}
+
+##
+# The dispatch table of <visitor>, shared by all visitors of its class; call
+# its functions as fn(visitor, node).
+#
+# The methods are looked up once per class and node type, so they must not be
+# changed on the visitor instances.
+def visitorMethods(visitor, prefix="visit_"):
+    key = (visitor.__class__, prefix)
+    if key not in _visitorMethods:
+        _visitorMethods[key] = VisitorMethods(visitor.__class__, prefix)
+    return _visitorMethods[key]
+
+##
+# The function of the "<prefix><ntype>" method of <visitor>, or None
+def visitorMethod(visitor, ntype, prefix="visit_"):
+    return visitorMethods(visitor, prefix)[ntype]
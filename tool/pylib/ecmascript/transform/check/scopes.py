@@ -30,9 +30,9 @@ from ecmascript.frontend import treeutil
 class ScopeVisitor(object):
 
     def visit(self, scopeNode):
-        scope_type = scopeNode.node.type
-        if hasattr(self, "visit_"+scope_type):
-            getattr(self, "visit_"+scope_type)(scopeNode)
+        method = treeutil.visitorMethod(self, scopeNode.node.type)
+        if method is not None:
+            method(self, scopeNode)
         else:
             for child in scopeNode.children:
                 self.visit(child)
@@ -44,9 +44,9 @@ class ScopeVisitor(object):
 class VarsCollector(ScopeVisitor):
 
     def visit(self, scopeNode):
-        scope_type = scopeNode.node.type
-        if hasattr(self, "visit_"+scope_type):
-            getattr(self, "visit_"+scope_type)(scopeNode)
+        method = treeutil.visitorMethod(self, scopeNode.node.type)
+        if method is not None:
+            method(self, scopeNode)
         else:
             varsCollector = AssignScopeVarsVisitor(scopeNode)
             varsCollector.visit(scopeNode.node)
@@ -24,6 +24,7 @@ import re, sys, types
 
 from ecmascript.frontend import tree, treeutil
 from ecmascript.frontend.treegenerator import PackerFlags as pp
+from ecmascript.transform.optimizer import pipeline
 
 ##
 # Run through all the qx.*.define nodes of a tree. This will cover multiple
@@ -90,32 +91,7 @@ def optimizeConstruct(node, superClass, methodName, classDefNodes):
     if node in classDefNodes:
         return 0
 
-    elif node.isVar() and node.hasParentContext("call/operand"):
-
-        varName, complete = treeutil.assembleVariable(node)
-        if not (complete and varName == "this.base"):
-            return 0
-
-        call = node.parent.parent
-
-        try:
-            firstArgName = treeutil.selectNode(call, "arguments/1/@value")
-        except tree.NodeAccessException:
-            return 0
-
-        if firstArgName != "arguments":
-            return 0
-
-        # "construct"
-        if methodName == "construct":
-            newCall = treeutil.compileString("%s.call()" % superClass)
-        # "member"
-        else:
-            newCall = treeutil.compileString("%s.prototype.%s.call()" % (superClass, methodName))
-        newCall.replaceChild(newCall.getChild("arguments"), call.getChild("arguments")) # replace with old arglist
-        treeutil.selectNode(newCall, "arguments/1").set("value", "this")   # arguments -> this
-        call.parent.replaceChild(call, newCall)
-        patchCount += 1
+    patchCount += patchCall(node, superClass, methodName)
 
     # Handle Children
     if node.hasChildren():
@@ -125,6 +101,106 @@ def optimizeConstruct(node, superClass, methodName, classDefNodes):
     return patchCount
 
 
+##
+# Replace the call of this.base(arguments, ...) of which <node> is the
+# operand, if it is one
+
+def patchCall(node, superClass, methodName):
+    if not (node.isVar() and node.hasParentContext("call/operand")):
+        return 0
+
+    varName, complete = treeutil.assembleVariable(node)
+    if not (complete and varName == "this.base"):
+        return 0
+
+    call = node.parent.parent
+
+    try:
+        firstArgName = treeutil.selectNode(call, "arguments/1/@value")
+    except tree.NodeAccessException:
+        return 0
+
+    if firstArgName != "arguments":
+        return 0
+
+    # "construct"
+    if methodName == "construct":
+        newCall = treeutil.compileString("%s.call()" % superClass)
+    # "member"
+    else:
+        newCall = treeutil.compileString("%s.prototype.%s.call()" % (superClass, methodName))
+    newCall.replaceChild(newCall.getChild("arguments"), call.getChild("arguments")) # replace with old arglist
+    treeutil.selectNode(newCall, "arguments/1").set("value", "this")   # arguments -> this
+    call.parent.replaceChild(call, newCall)
+    return 1
+
+
+##
+# The same as patch(), for an optimizer pipeline: the qx.*.define calls and
+# their methods are tracked during the walk, and calls to this.base are
+# patched where they are found
+
+def passes():
+    contexts = []  # [[define node, superclass, {id(method node) : name}, method node, name]]
+
+    def enter(node):
+        if node.type == "call" and isClassDefine(node):
+            contexts.append(classContext(node))
+        elif contexts:
+            context = contexts[-1]
+            if context[3] is not None:
+                patchCall(node, context[1], context[4])
+            elif id(node) in context[2]:
+                context[3] = node
+                context[4] = context[2][id(node)]
+
+    def leave(node):
+        if contexts:
+            context = contexts[-1]
+            if node is context[0]:
+                contexts.pop()
+            elif node is context[3]:
+                context[3] = context[4] = None
+
+    return [pipeline.Pass("basecalls", enter={None : enter}, leave={None : leave})]
+
+
+##
+# Is <node> the call node of a qx.*.define (as found by treeutil.findQxDefineR)
+
+def isClassDefine(node):
+    operand = node.getChild("operand", False)
+    if not operand:
+        return False
+    for child in operand.children:
+        if treeutil.isQxDefine(child)[0]:
+            return True
+    return False
+
+
+##
+# The superclass and the methods to optimize of a class definition, as
+# optimize() finds them
+
+def classContext(classDefine):
+    superClass = None
+    methods    = {}
+    try:
+        classMap = treeutil.getClassMap(classDefine)
+    except tree.NodeAccessException:
+        classMap = {}
+
+    if "extend" in classMap and classMap["extend"].isVar():
+        superClass = treeutil.assembleVariable(classMap["extend"])[0]
+        if "construct" in classMap:
+            methods[id(classMap["construct"])] = "construct"
+        if "members" in classMap and isinstance(classMap["members"], types.DictType):
+            for methodName, methodNode in classMap["members"].items():
+                methods[id(methodNode)] = methodName
+
+    return [classDefine, superClass, methods, None, None]
+
+
 if __name__ == "__main__":
     cls = """qx.Class.define("qx.Car", {
       extend: qx.core.Object,
@@ -22,7 +22,17 @@
 # Strip comments from tree
 ##
 
+from ecmascript.transform.optimizer import pipeline
+
 def patch(tree):
     for node in tree.nodeIter():
-        if node.comments:
-            node.comments = []
+        strip(node)
+
+def strip(node):
+    if node.comments:
+        node.comments = []
+
+##
+# The same, for an optimizer pipeline
+def passes():
+    return [pipeline.Pass("comments", enter={None : strip})]
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# A pipeline of optimizations of a syntax tree, that applies as many of them
+# as possible in a single walk over the tree.
+#
+# Optimizations that work node by node are Passes, with handlers for the node
+# types they are interested in: 'enter' handlers are called before the
+# children of a node are visited, 'leave' handlers after them. Consecutive
+# passes share a walk, in which the handlers of a node are called in the
+# order of the passes. A pass starts a new walk if it is a 'barrier' (it
+# needs the passes before it completed on the whole tree), or if the pass
+# before it has an 'end' function (which finishes its work after the walk,
+# possibly changing the tree). Optimizations that work on the tree as a whole
+# (e.g. on its scopes) are Steps, which run on their own.
+#
+# A walk visits the children a node had when it was entered, so handlers may
+# replace or remove nodes.
+#
+# The time of every walk and step is recorded in <stats>, under the names of
+# its passes, and reported with logStats() (worker processes pass theirs to
+# mergeStats()).
+##
+
+import time
+
+stats = {}  # {"<pass>+<pass>..." : [runs, walks, seconds]}
+
+
+class Pass(object):
+
+    ##
+    # @param enter {Map} {"<node type>" : fn(node)}, with key None for all
+    #   other node types
+    # @param leave {Map} like <enter>
+    # @param end {Function} fn(tree), called after the walk
+    # @param active {Function} fn(), if False when the walk starts, the pass
+    #   is skipped
+    def __init__(self, name, enter=None, leave=None, end=None, barrier=False, active=None):
+        self.name    = name
+        self.enter   = enter or {}
+        self.leave   = leave or {}
+        self.end     = end
+        self.barrier = barrier
+        self.active  = active
+
+
+class Step(object):
+
+    ##
+    # @param fn {Function} fn(tree), returning the (new) tree
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn   = fn
+
+
+class Pipeline(object):
+
+    def __init__(self):
+        self.passes = []
+
+    def add(self, *passes):
+        self.passes.extend(passes)
+
+    ##
+    # The passes and steps, grouped into walks
+    def groups(self):
+        groups = []
+        for pass_ in self.passes:
+            if groups:
+                last = groups[-1][-1]
+            if (not groups or isinstance(pass_, Step) or isinstance(last, Step)
+                or pass_.barrier or last.end):
+                groups.append([pass_])
+            else:
+                groups[-1].append(pass_)
+        return groups
+
+    def run(self, tree):
+        for group in self.groups():
+            t0 = time.time()
+            if isinstance(group[0], Step):
+                tree = group[0].fn(tree)
+                walks = 0
+            else:
+                group = [x for x in group if x.active is None or x.active()]
+                if not group:
+                    continue
+                walk(tree, handlerTable(group, "enter"), handlerTable(group, "leave"))
+                for pass_ in group:
+                    if pass_.end:
+                        pass_.end(tree)
+                walks = 1
+            record("+".join(x.name for x in group), walks, time.time() - t0)
+        return tree
+
+
+##
+# The handlers of <passes> for the walk, as ({"<node type>" : [fn,...]},
+# [fn,...] for all other types)
+def handlerTable(passes, kind):
+    maps = [getattr(x, kind) for x in passes if getattr(x, kind)]
+    types = set(t for m in maps for t in m if t is not None)
+    table = {}
+    for type_ in types:
+        table[type_] = [m.get(type_, m.get(None)) for m in maps if type_ in m or None in m]
+    return table, [m[None] for m in maps if None in m]
+
+
+##
+# Walk <tree> (without recursion), calling the handlers of every node
+def walk(tree, enter, leave):
+    enterTable, enterAll = enter
+    leaveTable, leaveAll = leave
+    hasLeave = bool(leaveTable or leaveAll)
+    stack  = [tree]
+    pop    = stack.pop
+    push   = stack.append
+    extend = stack.extend
+    while stack:
+        node = pop()
+        if node.__class__ is tuple:  # all children done
+            node = node[0]
+            for fn in leaveTable.get(node.type, leaveAll):
+                fn(node)
+            continue
+        for fn in enterTable.get(node.type, enterAll):
+            fn(node)
+        if hasLeave:
+            push((node,))
+        if node.children:
+            extend(reversed(node.children))
+
+
+def record(name, walks, seconds):
+    entry = stats.setdefault(name, [0, 0, 0.0])
+    entry[0] += 1
+    entry[1] += walks
+    entry[2] += seconds
+
+
+##
+# Add <other> (the stats of a worker process) to the stats
+def mergeStats(other):
+    for name, (runs, walks, seconds) in other.items():
+        entry = stats.setdefault(name, [0, 0, 0.0])
+        entry[0] += runs
+        entry[1] += walks
+        entry[2] += seconds
+
+
+##
+# Log the time spent in the optimizations (of this process), and reset it
+def logStats(console):
+    if not stats:
+        return
+    console.debug("Optimizations: %d tree walks, %.2fs" % (
+        sum(x[1] for x in stats.values()), sum(x[2] for x in stats.values())))
+    console.indent()
+    for name in sorted(stats):
+        console.debug("%-40s runs: %6d, walks: %6d, %7.2fs" % ((name,) + tuple(stats[name])))
+    console.outdent()
+    stats.clear()
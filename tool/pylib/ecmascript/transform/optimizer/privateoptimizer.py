@@ -21,6 +21,8 @@
 
 import os, sys, re, types
 from misc.util import convert
+from ecmascript.frontend import tree
+from ecmascript.transform.optimizer import pipeline
 
 #names = {}  # names = { "<classId>:<private>" : "<repl>", ...}
 #used = {}   # used  = { "<private>" : [ "<classId>", ...], ...} -- only maintained for debug() function, not relevant for optimization
@@ -72,22 +74,92 @@ def patch(tree, id, _globalPrivs=None):
     update(tree, privates)
     
     
+LOOKUP_TYPES = ("definition", "keyvalue", "assignment")  # see definedName()
+UPDATE_TYPES = ("identifier", "keyvalue", "constant")  # see updateNode()
+
+##
+# The same as patch(), for an optimizer pipeline: the privates are collected
+# in one walk, and replaced in the next
+#
+def passes(id, globalPrivs):
+    privates = {}
+    return [
+        pipeline.Pass("privates",
+            enter=dict.fromkeys(LOOKUP_TYPES, lambda node: lookupNode(id, node, privates, globalPrivs))),
+        pipeline.Pass("privates-update",
+            enter=dict.fromkeys(UPDATE_TYPES, lambda node: updateNode(node, privates)),
+            barrier=True, active=lambda: bool(privates)),  # nothing to replace without privates
+    ]
+
+
 def crypt(id, name, privmap):
     combined = "%s:%s" % (id, name)
     if combined in privmap:
         return privmap[combined]
 
-    repl = "__%s" % convert(len(privmap))
+    # a shared map (generator.runtime.SharedMap) hands out the indexes itself,
+    # so that concurrent builds don't use the same name
+    if hasattr(privmap, "allocate"):
+        repl = "__%s" % convert(privmap.allocate())
+    else:
+        repl = "__%s" % convert(len(privmap))
     privmap[combined] = repl
 
     return repl
         
     
+##
+# register private <names> (as returned by collect()) in <globalPrivs>, in
+# order, just as patch() would do while walking the tree
+#
+def register(id, names, globalPrivs):
+    for name in names:
+        crypt(id, name, globalPrivs)
+
+
+##
+# collect the privates defined in <node>, in the order lookup() would
+# associate replacements with them
+#
+def collect(node, names=None):
+    if names is None:
+        names = []
+
+    for node in tree.preorderIter(node, LOOKUP_TYPES):
+        name = definedName(node)
+        if name and name.startswith("__") and not name in names:
+            names.append(name)
+
+    return names
+
+
 ##
 # collect privates and associate a replacement in <privates>
 #
 def lookup(id, node, privates, globalPrivs):
     # privates = { "<private>" : "<repl>", ... }
+    for node in tree.preorderIter(node, LOOKUP_TYPES):
+        lookupNode(id, node, privates, globalPrivs)
+
+    return privates
+
+
+def lookupNode(id, node, privates, globalPrivs):
+    name = definedName(node)
+        
+    if name and name.startswith("__") and not name in privates:
+        privates[name] = crypt(id, name, globalPrivs)
+        
+        #if not name in used:
+        #    used[name] = [id]
+        #elif not id in used[name]:
+        #    used[name].append(id)
+
+
+##
+# the name a node defines, if any
+#
+def definedName(node):
     name = None
     
     if node.type == "definition":
@@ -106,30 +178,19 @@ def lookup(id, node, privates, globalPrivs):
             elif lval.type == "dotaccessor":
                 last = lval.getRightmostOperand()
                 name = last.get("value")
-        
-    if name and name.startswith("__") and not name in privates:
-        privates[name] = crypt(id, name, globalPrivs)
-        
-        #if not name in used:
-        #    used[name] = [id]
-        #elif not id in used[name]:
-        #    used[name].append(id)
 
-    if node.hasChildren():
-        for child in node.children:
-            lookup(id, child, privates, globalPrivs)
-        
-    return privates
+    return name
 
 
 ##
 # replace privates occurrences with replacement
 #
 def update(node, privates):
-    if node.hasChildren():
-        for child in node.children:
-            update(child, privates)
-            
+    for node in tree.postorderIter(node, UPDATE_TYPES):
+        updateNode(node, privates)
+
+
+def updateNode(node, privates):
     name = None
             
     if node.type == "identifier":
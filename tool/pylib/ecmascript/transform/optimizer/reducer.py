@@ -131,23 +131,33 @@ class ASTReducer(treeutil.NodeVisitor):
 
 
     def visit(self, node):
-        # pre-order reduce children, to have their values when reducing current
+        # post-order reduce children, to have their values when reducing current
         # node
-        nchilds = []
-        for child in node.children:
-            nchild = self.visit(child)
-            nchilds.append(nchild)
-
-        nnode = node
-        nnode.children = []
-        for cld in nchilds:
-            nnode.addChild(cld)
-
-        # try reducing current node, might return a fresh symbol()
-        if hasattr(self, "visit_"+node.type):
-            nnode = getattr(self, "visit_"+node.type)(nnode)
-
-        return nnode
+        methods = treeutil.visitorMethods(self)
+        # (node, iterator over its children, reduced children) of the nodes on
+        # the path, without recursion
+        stack = [(node, iter(node.children), [])]
+        while True:
+            nnode, children, nchilds = stack[-1]
+            for child in children:
+                if child.children:
+                    stack.append((child, iter(child.children), []))
+                    break
+                method = methods[child.type]
+                nchilds.append(child if method is None else method(self, child))
+            else:
+                stack.pop()
+                nnode.children = []
+                for cld in nchilds:
+                    nnode.addChild(cld)
+
+                # try reducing current node, might return a fresh symbol()
+                method = methods[nnode.type]
+                if method is not None:
+                    nnode = method(self, nnode)
+                if not stack:
+                    return nnode
+                stack[-1][2].append(nnode)
 
     # - Due to pre-order recursion, type-specific methods don't need to recurse
     # anymore!
@@ -22,7 +22,7 @@
 
 import operator
 from misc.NameMapper import NameMapper
-from ecmascript.frontend import treeutil, lang
+from ecmascript.frontend import tree, treeutil, lang
 from ecmascript.transform.check import scopes
 
 def search(node, verbose=False):
@@ -31,18 +31,15 @@ def search(node, verbose=False):
 ##
 # Returns {"code_string" : ["", [constant_node,...]]}, {}[0] being a placeholder for the var_name
 def search_loop(node, stringMap={}, verbose=False):
-    if node.type == "constant" and node.get("constantType") == "string":
-        code_string = node.toJS(None)
-        if code_string in stringMap:
-            stringMap[code_string][1].append(node)
-        else:
-            stringMap[code_string] = ['',[node]]
-        if verbose:
-            print "      - Found: '%s'" % code_string.encode("utf-8")
-
-    #if check(node, verbose):
-    for child in node.children:
-        search_loop(child, stringMap, verbose)
+    for node in tree.preorderIter(node, ("constant",)):
+        if node.get("constantType") == "string":
+            code_string = node.toJS(None)
+            if code_string in stringMap:
+                stringMap[code_string][1].append(node)
+            else:
+                stringMap[code_string] = ['',[node]]
+            if verbose:
+                print "      - Found: '%s'" % code_string.encode("utf-8")
 
     return stringMap
 
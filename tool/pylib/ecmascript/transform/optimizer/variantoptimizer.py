@@ -23,7 +23,7 @@
 import os, sys, re, types
 from ecmascript.frontend                import treeutil
 from ecmascript.frontend.treegenerator  import symbol, PackerFlags as pp
-from ecmascript.transform.optimizer     import reducer
+from ecmascript.transform.optimizer     import reducer, pipeline
 
 global verbose
 
@@ -217,8 +217,10 @@ def reduceCall(callNode, value):
 InterestingEnvMethods = ["select", "selectAsync", "get", "getAsync", "filter"]
 InterestingEnvClasses = ["qx.core.Environment", "qxWeb.env"]
 
-def findVariantNodes(node):
-    for callnode in list(treeutil.nodeIterator(node, ['call'])): # enforce eagerness so nodes that are moved are still handled
+def findVariantNodes(node, callNodes=None):
+    if callNodes is None:
+        callNodes = list(treeutil.nodeIterator(node, ['call'])) # enforce eagerness so nodes that are moved are still handled
+    for callnode in callNodes:
         if isEnvironmentCall(callnode):
             yield treeutil.selectNode(callnode, "operand").getFirstChild()
         else:
@@ -327,14 +329,31 @@ def getFilterMap(callNode, fileId_):
 def search(node, variantMap, fileId_="", verb=False):
     if not variantMap:
         return False
+    return process(node, None, variantMap, fileId_, verb)
 
+
+##
+# The same, for an optimizer pipeline: the call nodes are collected during
+# the walk, and processed at its end
+def passes(variantMap, fileId_="", verb=False):
+    if not variantMap:
+        return []
+    callNodes = []
+    return [pipeline.Pass("variants", enter={"call" : callNodes.append},
+        end=lambda tree: process(tree, callNodes, variantMap, fileId_, verb))]
+
+
+##
+# Process the variant-specific calls among <callNodes>, the call nodes of
+# tree <node> in document order (None for all of them)
+def process(node, callNodes, variantMap, fileId_="", verb=False):
     global verbose
     global fileId
     verbose = verb
     fileId = fileId_
     modified = False
 
-    variantNodes = findVariantNodes(node)
+    variantNodes = findVariantNodes(node, callNodes)
     for variantNode in variantNodes:
         variantMethod = variantNode.toJS(pp).rsplit('.',1)[1]
         callNode = treeutil.selectNode(variantNode, "../..")
@@ -352,4 +371,3 @@ def search(node, variantMap, fileId_="", verb=False):
             node.replaceChild(cld, new_cld)
 
     return modified
-
@@ -35,8 +35,9 @@ from generator.runtime.CodeIssue import CodeIssue
 class Tree3ToTree1(treeutil.NodeVisitor):
 
     def visit(self, node):
-        if hasattr(self, "visit_" + node.type):
-            nnode = getattr(self, "visit_" + node.type)(node)
+        method = treeutil.visitorMethod(self, node.type)
+        if method is not None:
+            nnode = method(self, node)
         else:
             nnode = node.clone()
             nnode.children = []
@@ -31,6 +31,7 @@ from generator.output.Script           import Script
 from generator.output.Package          import Package
 from generator.output.Part             import Part
 from generator.output.CodeGenerator  import CodeGenerator
+from generator.output.BuildManifest  import BuildManifest
 from generator.action.ActionLib      import ActionLib
 from generator.action.Locale         import Locale as LocaleCls
 from generator.action                import ApiLoader, Locale, CodeMaintenance
@@ -38,7 +39,10 @@ from generator.action                import Logging, FileSystem, Resources
 from generator.action                import MiniWebServer, JsonValidation
 from generator.output                import CodeProvider
 from generator.runtime.Cache         import Cache
+from generator.runtime               import ProcessPool, SharedMap
+from generator.code.Class            import Class, ClassMatchList
 from generator                       import Context
+from ecmascript.transform.optimizer  import pipeline as optimizerPipeline
 
 
 class Generator(object):
@@ -65,6 +69,10 @@ class Generator(object):
                 'console' : context['console'],
                 'cache/downloads' : self._job.get("cache/downloads", cache_path + "/downloads"),
                 'cache/invalidate-on-tool-change' : self._job.get('cache/invalidate-on-tool-change', False),
+                'cache/backend' : self._job.get('cache/backend', "files"),
+                'cache/invalidation' : self._job.get('cache/invalidation', "mtime"),
+                'cache/memory-limit' : self._job.get('cache/memory-limit', context.get('cache/memory-limit', 0)),
+                'cache/compression' : self._job.get('cache/compression', 6),
             })
             context['cache'] = self._cache
 
@@ -223,6 +231,87 @@ class Generator(object):
             return classList
 
 
+        ##
+        # Create the Script object for <variantset>
+        def newScript(variantset, jobTriggers):
+            script = Script()  # a new Script object represents the target code
+            script.classesAll = self._classesObj  # for deps. analysis
+            script.namespace = self.getAppName()
+            script.variants = variantset
+            script.environment = variantset
+            script.optimize = config.get("compile-options/code/optimize", [])
+            script.locales = config.get("compile-options/code/locales", [])
+            script.libraries = self._libraries
+            script.jobconfig = self._job
+            # set source/build version
+            if "compile" in jobTriggers:
+                script.buildType = config.get("compile/type", "")
+                if script.buildType not in ("source","build","hybrid"):
+                    raise ValueError("Unknown compile type '%s'" % script.buildType)
+
+            if (script.buildType == "source"   # TODO: source processing could be placed outside the variant loop
+                or "variants" not in script.optimize  # TODO: script.variants is used both declaratively (config's environment map) *and* to signal variants optimization (e.g. in Class.dependencies())
+                ):
+                script.variants = {}
+            return script
+
+
+        ##
+        # Compute the class lists of those of <variantSets> that cannot share
+        # a recorded one, with a pool of <jobs> worker processes, and record
+        # them for sharedClassList(). Only one set of each group of sets that
+        # agree on the environment keys used by the recorded class lists is
+        # computed, as they are likely to share their class list, too.
+        def computeClassListsParallel(variantSets, jobs, includeWithDeps, excludeWithDeps, includeNoDeps):
+
+            def computeWorker(pos):
+                sys.stdout = open(os.devnull, "w")  # progress output would interleave; warnings go to stderr
+                return computeClassList(includeWithDeps, excludeWithDeps, includeNoDeps, [],
+                                        scripts[pos], verifyDeps=True)
+
+            knownKeys = set()
+            for variantKeys, _, _, _ in classListMemo:
+                knownKeys.update(variantKeys)
+            scripts, groups = [], set()
+            for variantset in variantSets:
+                script = newScript(variantset, jobTriggers)
+                groupKey = util.toString(Class.projectClassVariantsToCurrent(knownKeys, script.variants))
+                if groupKey not in groups and sharedClassList(script)[0] is None:
+                    groups.add(groupKey)
+                    scripts.append(script)
+            if len(scripts) < 2:
+                return
+
+            self._console.info("Collecting classes of %d variant sets with %d jobs" % (len(scripts), jobs))
+            classLists = ProcessPool.forkMap(computeWorker, range(len(scripts)), jobs)
+            for script, classList in zip(scripts, classLists):
+                script.classes = classList
+                script.classesObj = [self._classesObj[id] for id in classList]
+                recordClassList(script, excludeWithDeps, [])
+
+
+        ##
+        # Look up the class list of an earlier variant set that is also valid
+        # for <script>, i.e. whose set agrees with script.variants on all
+        # environment keys used in the classes of the list, or excluded from
+        # it (the only classes the dependency analysis looks at). Returns
+        # (classList, shared) or (None, None).
+        def sharedClassList(script):
+            for variantKeys, relevantVariants, classList, shared in classListMemo:
+                if Class.projectClassVariantsToCurrent(variantKeys, script.variants) == relevantVariants:
+                    return classList[:], shared
+            return None, None
+
+        def recordClassList(script, excludeWithDeps, excludeWithDepsHard):
+            if excludeWithDepsHard:
+                return  # hard excludes have their own, variant-dependent closure
+            variantKeys = script.classVariants()
+            for classId in textutil.expandGlobs(excludeWithDeps, self._classesObj):
+                variantKeys.update(self._classesObj[classId].classVariants())
+            relevantVariants = Class.projectClassVariantsToCurrent(variantKeys, script.variants)
+            classListMemo.append((variantKeys, relevantVariants, script.classes, script.shared))
+
+
         ##
         # Invoke the PartBuilder to compute the packages for the configured
         # parts.
@@ -260,10 +349,15 @@ class Generator(object):
             # out messages regarding parts which irritates the user and assumes
             # that includeWithDeps is used (and fails with includeNoDeps).
             if self._job.get("packages"):
-                (boot,
-                partPackages,           # partPackages[partId]=[0,1,3]
-                packageClasses          # packageClasses[0]=['qx.Class','qx.bom.Stylesheet',...]
-                ) = evalPackagesConfig(excludeWithDeps, classList, variants)
+                if script.manifest and script.manifest.restoreParts(script):
+                    boot, partPackages, packageClasses = script.boot, script.parts, script.packagesSorted()
+                else:
+                    (boot,
+                    partPackages,           # partPackages[partId]=[0,1,3]
+                    packageClasses          # packageClasses[0]=['qx.Class','qx.bom.Stylesheet',...]
+                    ) = evalPackagesConfig(excludeWithDeps, classList, variants)
+                    if script.manifest:
+                        script.manifest.recordParts(script)
             else:
                 # bug#7667: Tried to consolidate with if body above, but the
                 # codebase needs too many adaptions to be also compatible with
@@ -448,6 +542,8 @@ class Generator(object):
              self._translations,
              self._libraries) = self.scanLibrary(config.get("library", []))
 
+            # parse classes with stale syntax trees up-front, in parallel
+            self.warmUpTreeCache(self._classesObj)
 
             # create tool chain instances
             self._locale = LocaleCls(self._context, self._classesObj, self._translations, self._cache, self._console, )
@@ -490,131 +586,149 @@ class Generator(object):
         # Create tool chain instances
         self._actionLib = ActionLib(self._config, self._console)
 
-        # process simple triggers
-        if takeout(jobTriggers, "collect-environment-info"):
-            Logging.runCollectEnvironmentInfo(self._job, self._config)
-        if takeout(jobTriggers, "copy-files"):
-            FileSystem.runCopyFiles(self._job, self._config)
-        if takeout(jobTriggers, "combine-images"):
-            Resources.runImageCombining(self._job, self._config)
-        if takeout(jobTriggers, "font-map"):
-            Resources.runFontMap(self._job, self._config)
-        if takeout(jobTriggers, "clean-files"):
-            FileSystem.runClean(self._job, self._config, self._cache)
-        if takeout(jobTriggers, "validation-config"):
-            JsonValidation.validateConfig(self._config, self._config.getSchema())
-        if takeout(jobTriggers, "validation-manifest"):
-            JsonValidation.validateManifest(self._job, self._config)
-        if takeout(jobTriggers, "migrate-files"):
-            CodeMaintenance.runMigration(self._job, config.get("library"))
-        if takeout(jobTriggers, "shell"):
-            self._actionLib.runShellCommands(self._job)
-        if takeout(jobTriggers, "slice-images"):
-            Resources.runImageSlicing(self._job, self._config)
-        if takeout(jobTriggers, "watch-files"):
-            self._actionLib.watch(self._job, self._config)
-        if takeout(jobTriggers, "web-server"):
-            MiniWebServer.runWebServer(self._job, self._config)
-        if takeout(jobTriggers, "web-server-config"):
-            MiniWebServer.generateHttpdConfig(self._job, self._config)
-
-        if jobTriggers:
-
-            # -- Process job triggers that require a class list (and some)
-            prepareGenerator()
-
-            # Preprocess include/exclude lists
-            includeWithDeps, includeNoDeps = getIncludes(self._job.get("include", []))
-            excludeWithDeps, excludeWithDepsHard = getExcludes(self._job.get("exclude", []))
-
-            # process classdep triggers
-            if takeout(jobTriggers, "fix-files"):
-                CodeMaintenance.runFix(self._job, self._classesObj)
-            if takeout(jobTriggers, "lint-check"):
-                CodeMaintenance.runLint(self._job, self._classesObj)
-            if takeout(jobTriggers, "translate"):
-                Locale.runUpdateTranslation(self._job, self._classesObj, self._libraries, self._translations)
-            if takeout(jobTriggers, "pretty-print"):
-                self._codeGenerator.runPrettyPrinting(self._classesObj)
-            if takeout(jobTriggers, "provider"):
-                script = Script()
-                script.classesObj = self._classesObj.values()
-                environData = getVariants("environment")
-                variantSets = util.computeCombinations(environData)
-                script.variants = variantSets[0]
-                script.optimize = config.get("compile-options/code/optimize", [])
-                script.libraries = self._libraries
-                script.namespace = self.getAppName()
-                script.locales = config.get("compile-options/code/locales", [])
-                CodeProvider.runProvider(script, self)
-
-        if jobTriggers:
-
-            # -- Process job triggers that require the full tool chain
-
-            # Processing all combinations of variants
-            environData = getVariants("environment")   # e.g. {'qx.debug':false, 'qx.aspects':[true,false]}
-            variantSets = util.computeCombinations(environData) # e.g. [{'qx.debug':'on','qx.aspects':'on'},...]
-            for variantSetNum, variantset in enumerate(variantSets):
-                # some console output
-                printVariantInfo(variantSetNum, variantset, variantSets, environData)
-
-                script = Script()  # a new Script object represents the target code
-                script.classesAll = self._classesObj  # for deps. analysis
-                script.namespace = self.getAppName()
-                script.variants = variantset
-                script.environment = variantset
-                script.optimize = config.get("compile-options/code/optimize", [])
-                script.locales = config.get("compile-options/code/locales", [])
-                script.libraries = self._libraries
-                script.jobconfig = self._job
-                # set source/build version
-                if "compile" in jobTriggers:
-                    script.buildType = config.get("compile/type", "")
-                    if script.buildType not in ("source","build","hybrid"):
-                        raise ValueError("Unknown compile type '%s'" % script.buildType)
-
-                if (script.buildType == "source"   # TODO: source processing could be placed outside the variant loop
-                    or "variants" not in script.optimize  # TODO: script.variants is used both declaratively (config's environment map) *and* to signal variants optimization (e.g. in Class.dependencies())
-                    ):
-                    script.variants = {}
-
-                # get current class list
-                script.classes = computeClassList(includeWithDeps, excludeWithDeps,
-                                   includeNoDeps, excludeWithDepsHard, script, verifyDeps=True)
-                # keep the list of class objects in sync
-                script.classesObj = [self._classesObj[id] for id in script.classes]
-
-                if "statics" in script.optimize:
-                    featureMap = self._depLoader.registerDependeeFeatures(script.classesObj, script.variants, script.buildType)
-                    script._featureMap = featureMap
-                else:
-                    script._featureMap = {}
-
-                # set the complete exclude list for classes
-                excludes = set(excludeWithDeps[:])
-                excludes.update(self._depLoader.expand_hard_excludes(excludeWithDepsHard, script))
-                script.excludes = list(excludes)
-
-                # prepare 'script' object
-                if set(("compile", "log")).intersection(jobTriggers):
-                    partsConfigFromClassList(includeWithDeps, excludeWithDeps, script)
-
-                # Execute real tasks
-                if "api" in jobTriggers:
-                    ApiLoader.runApiData(self._job, self._config, script, self._docs)
-                if "copy-resources" in jobTriggers:
-                    FileSystem.runResources(self._config, script)
-                if "compile" in jobTriggers:
-                    self._codeGenerator.runCompiled(script)
-                if "log" in jobTriggers:
-                    Logging.runLogDependencies(self._job, script)
-                    Logging.runPrivateDebug(self._job)
-                    Logging.runStaticsOptimizedDebug(self._job)
-                    #Logging.runClassOrderingDebug(self._job, script)
-                    Logging.runLogUnusedClasses(self._job, script)
-                    Logging.runLogResources(self._job, script)
-
+        # the shared maps are written back even if the job fails, so a daemon
+        # doesn't keep them for its next request
+        try:
+            # process simple triggers
+            if takeout(jobTriggers, "collect-environment-info"):
+                Logging.runCollectEnvironmentInfo(self._job, self._config)
+            if takeout(jobTriggers, "copy-files"):
+                FileSystem.runCopyFiles(self._job, self._config)
+            if takeout(jobTriggers, "combine-images"):
+                Resources.runImageCombining(self._job, self._config)
+            if takeout(jobTriggers, "font-map"):
+                Resources.runFontMap(self._job, self._config)
+            if takeout(jobTriggers, "clean-files"):
+                FileSystem.runClean(self._job, self._config, self._cache)
+            if takeout(jobTriggers, "validation-config"):
+                JsonValidation.validateConfig(self._config, self._config.getSchema())
+            if takeout(jobTriggers, "validation-manifest"):
+                JsonValidation.validateManifest(self._job, self._config)
+            if takeout(jobTriggers, "migrate-files"):
+                CodeMaintenance.runMigration(self._job, config.get("library"))
+            if takeout(jobTriggers, "shell"):
+                self._actionLib.runShellCommands(self._job)
+            if takeout(jobTriggers, "slice-images"):
+                Resources.runImageSlicing(self._job, self._config)
+            if takeout(jobTriggers, "watch-files"):
+                self._actionLib.watch(self._job, self._config)
+            if takeout(jobTriggers, "web-server"):
+                MiniWebServer.runWebServer(self._job, self._config)
+            if takeout(jobTriggers, "web-server-config"):
+                MiniWebServer.generateHttpdConfig(self._job, self._config)
+
+            if jobTriggers:
+
+                # -- Process job triggers that require a class list (and some)
+                prepareGenerator()
+
+                # Preprocess include/exclude lists
+                includeWithDeps, includeNoDeps = getIncludes(self._job.get("include", []))
+                excludeWithDeps, excludeWithDepsHard = getExcludes(self._job.get("exclude", []))
+
+                # process classdep triggers
+                if takeout(jobTriggers, "fix-files"):
+                    CodeMaintenance.runFix(self._job, self._classesObj)
+                if takeout(jobTriggers, "lint-check"):
+                    CodeMaintenance.runLint(self._job, self._classesObj)
+                if takeout(jobTriggers, "translate"):
+                    Locale.runUpdateTranslation(self._job, self._classesObj, self._libraries, self._translations)
+                if takeout(jobTriggers, "pretty-print"):
+                    self._codeGenerator.runPrettyPrinting(self._classesObj)
+                if takeout(jobTriggers, "provider"):
+                    script = Script()
+                    script.classesObj = self._classesObj.values()
+                    environData = getVariants("environment")
+                    variantSets = util.computeCombinations(environData)
+                    script.variants = variantSets[0]
+                    script.optimize = config.get("compile-options/code/optimize", [])
+                    script.libraries = self._libraries
+                    script.namespace = self.getAppName()
+                    script.locales = config.get("compile-options/code/locales", [])
+                    CodeProvider.runProvider(script, self)
+
+            if jobTriggers:
+
+                # -- Process job triggers that require the full tool chain
+
+                # Processing all combinations of variants
+                environData = getVariants("environment")   # e.g. {'qx.debug':false, 'qx.aspects':[true,false]}
+                variantSets = util.computeCombinations(environData) # e.g. [{'qx.debug':'on','qx.aspects':'on'},...]
+                classListMemo = []  # [(variant keys, relevant variants, class list, shared)], see sharedClassList()
+                jobs = ProcessPool.numJobs(config.get("compile-options/code/jobs", 0))
+                for variantSetNum, variantset in enumerate(variantSets):
+                    # once the first class list is known, compute those of the
+                    # other variant sets that cannot share it in parallel
+                    if (variantSetNum == 1 and jobs > 1 and ProcessPool.canFork() and not excludeWithDepsHard
+                        and not config.get("compile-options/incremental", False)):
+                        computeClassListsParallel(variantSets[1:], jobs, includeWithDeps, excludeWithDeps, includeNoDeps)
+
+                    # some console output
+                    printVariantInfo(variantSetNum, variantset, variantSets, environData)
+
+                    script = newScript(variantset, jobTriggers)
+
+                    # incremental build: compare with the manifest of the last run
+                    if "compile" in jobTriggers and config.get("compile-options/incremental", False):
+                        if "statics" in script.optimize:
+                            self._console.warn("Incremental builds don't support 'statics' optimization; building everything")
+                        else:
+                            script.manifest = BuildManifest(self._cache, self._console, self._job, script)
+                            script.manifest.checkClasses(self._classesObj)
+
+                    # get current class list
+                    script.classes, shared = sharedClassList(script)
+                    if script.classes is not None:
+                        self._console.info("Re-using the class list of a previous variant set")
+                        script.shared = shared
+                        if script.manifest:
+                            script.manifest.recordClassList(script.classes, self._classesObj, script.variants, self._job)
+                    elif script.manifest:
+                        script.classes = script.manifest.reusableClassList(self._classesObj, script.variants, self._job)
+                    if script.classes is None:
+                        script.classes = computeClassList(includeWithDeps, excludeWithDeps,
+                                           includeNoDeps, excludeWithDepsHard, script, verifyDeps=True)
+                        if script.manifest:
+                            script.manifest.recordClassList(script.classes, self._classesObj, script.variants, self._job)
+                    # keep the list of class objects in sync
+                    script.classesObj = [self._classesObj[id] for id in script.classes]
+                    if shared is None:
+                        recordClassList(script, excludeWithDeps, excludeWithDepsHard)
+
+                    if "statics" in script.optimize:
+                        featureMap = self._depLoader.registerDependeeFeatures(script.classesObj, script.variants, script.buildType)
+                        script._featureMap = featureMap
+                    else:
+                        script._featureMap = {}
+
+                    # set the complete exclude list for classes
+                    excludes = set(excludeWithDeps[:])
+                    excludes.update(self._depLoader.expand_hard_excludes(excludeWithDepsHard, script))
+                    script.excludes = list(excludes)
+
+                    # prepare 'script' object
+                    if set(("compile", "log")).intersection(jobTriggers):
+                        partsConfigFromClassList(includeWithDeps, excludeWithDeps, script)
+
+                    # Execute real tasks
+                    if "api" in jobTriggers:
+                        ApiLoader.runApiData(self._job, self._config, script, self._docs)
+                    if "copy-resources" in jobTriggers:
+                        FileSystem.runResources(self._config, script)
+                    if "compile" in jobTriggers:
+                        self._codeGenerator.runCompiled(script)
+                    if "log" in jobTriggers:
+                        Logging.runLogDependencies(self._job, script)
+                        Logging.runPrivateDebug(self._job)
+                        Logging.runStaticsOptimizedDebug(self._job)
+                        #Logging.runClassOrderingDebug(self._job, script)
+                        Logging.runLogUnusedClasses(self._job, script)
+                        Logging.runLogResources(self._job, script)
+        finally:
+            SharedMap.flushAll(self._cache)  # global privates etc., see SharedMap
+
+        self._cache.logMemoryStats()
+        optimizerPipeline.logStats(self._console)
         elapsedsecs = time.time() - starttime
         self._console.info("Done (%dm%05.2f)" % (int(elapsedsecs/60), elapsedsecs % 60))
 
@@ -659,7 +773,7 @@ class Generator(object):
             # need re-scan?
             if not checkObj or cacheTime < fsTime:
                 self._console.debug("Re-scanning lib %s" % libObj.path)
-                libObj.scan(cacheTime)
+                libObj.scan(cacheTime, checkObj)  # re-using what hasn't changed
                 self._cache.write(cacheId, libObj, memory=True)
             else:
                 libObj = checkObj  # continue with cached obj
@@ -684,5 +798,52 @@ class Generator(object):
         return (namespaces, classes, docs, translations, libraries)
 
 
+    ##
+    # Parse the classes selected by the 'cache/warm-up' key whose syntax tree
+    # cache entry is out of date, using a pool of worker processes
+    # ('compile-options/code/jobs'). The trees end up in the cache, so the
+    # (serial) dependency analysis finds them there.
+    def warmUpTreeCache(self, classesObj):
+
+        def parseClass(classId):
+            clazz = classesObj[classId]
+            start = time.clock()  # cpu time, to estimate the cost of serial parsing
+            try:
+                clazz.tree()
+            except Exception:
+                return None  # leave the reporting to the regular processing
+            return time.clock() - start
+
+        warmUp = self._job.get("cache/warm-up", False)
+        if not warmUp:
+            return
+        jobs = ProcessPool.numJobs(self._job.get("compile-options/code/jobs", 0))
+        if jobs < 2 or not ProcessPool.canFork():
+            return
+
+        if isinstance(warmUp, types.ListType):
+            classMatch = ClassMatchList(warmUp)
+            classIds = [x for x in classesObj if classMatch.match(x)]
+        else:
+            classIds = classesObj.keys()
+
+        staleIds = [x for x in sorted(classIds)
+                    if not self._cache.isValid(classesObj[x].treeCacheId(), classesObj[x].path)]
+        if not staleIds:
+            return
+
+        self._console.info("Warming up cache     ", feed=False)
+        starttime = time.time()
+        parseTimes = ProcessPool.forkMap(parseClass, staleIds, jobs, progress=self._console.dot)
+        elapsedsecs = time.time() - starttime
+        self._console.dotclear()
+
+        parsed = [x for x in parseTimes if x is not None]
+        savedsecs = max(sum(parsed) - elapsedsecs, 0)
+        self._console.indent()
+        self._console.info("Parsed %d files with %d jobs (%.2fs saved)" % (len(parsed), jobs, savedsecs))
+        self._console.outdent()
+
+
 
 
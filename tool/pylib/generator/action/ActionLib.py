@@ -21,7 +21,7 @@
 
 import re, os, sys, types, glob, time, string, platform
 
-from misc import filetool, textutil
+from misc import filetool, filewatch, textutil
 from generator import Context
 from generator.runtime.ShellCmd import ShellCmd
 
@@ -53,8 +53,6 @@ class ActionLib(object):
 
     def watch(self, jobconf, confObj):
         console = Context.console
-        since = time.time()
-        watcher = Watcher(jobconf, confObj)
         interval = jobconf.get("watch-files/check-interval", 2)
         paths = jobconf.get("watch-files/paths", [])
         if not paths:
@@ -66,19 +64,16 @@ class ActionLib(object):
         per_file = jobconf.get("watch-files/command/per-file", False)
         exit_on_retcode = jobconf.get("watch-files/command/exit-on-retcode", False)
         exec_on_startup = jobconf.get("watch-files/command/exec-on-startup", False)
+        watcher = Watcher(jobconf, confObj)
         if exec_on_startup:
-            # simply set check-time to start of epoch
-            since = 1.0  # (since=0 would disable time span checking)
+            flist = sorted(watcher.files())
+        else:
+            flist = []
         console.info("Watching changes of '%s'..." % paths)
         console.info("Press Ctrl-C to terminate.")
         while True:
-            osince = since
-            since = time.time()
-            ylist = watcher.check(osince)
-            if ylist:     # ylist =[(fpath,fstamp)]
-                flist = [f[0] for f in ylist]
+            if flist:
                 cmd_args = {'FILELIST': ' '.join(flist)}
-                console.debug("found changed files: %s" % flist)
                 try:
                     if not per_file:
                         cmd = command_tmpl.safe_substitute(cmd_args)
@@ -97,7 +92,7 @@ class ActionLib(object):
                         raise
                     else:
                         pass
-            time.sleep(interval)
+            flist = watcher.wait(interval)
         return
 
     def runShellCommands(self, jobconf):
@@ -148,6 +143,8 @@ class CommandLineTemplate(string.Template):
 ##
 # Exposes a .check() method to check for changes in the configured paths.
 # - Only concerned with the file checking, no timing, no actions.
+# - Keeps a snapshot of the watched trees (see misc.filewatch), which is
+#   updated from file system events where possible.
 #
 class Watcher(object):
 
@@ -159,6 +156,9 @@ class Watcher(object):
         self.with_dirs = jobconf.get("watch-files/include-dirs", False)
         self.pattern = self._watch_pattern(jobconf.get("watch-files/include", []))
         self.console = Context.console
+        self._watcher = filewatch.createWatcher(self.paths, self.pattern, self.with_dirs,
+            jobconf.get("watch-files/backend", "auto"))
+        self.console.debug("watching with %s" % self._watcher.__class__.__name__)
 
     def _watch_pattern(self, include):
         pattern = u''
@@ -169,13 +169,23 @@ class Watcher(object):
         pattern = '|'.join(a)
         return pattern
 
+    ##
+    # [(path, mtime)] of the watched files modified since <since>
     def check(self, since):
-        ylist = []
-        for path in self.paths:
-            self.console.debug("checking path '%s'" % path)
-            part_list = filetool.findYoungest(path, pattern=self.pattern,
-                includedirs=self.with_dirs, since=since)
-            ylist.extend(part_list)
-        return ylist
+        self._watcher.update()
+        return self._watcher.changedSince(since)
+
+    ##
+    # Wait up to <timeout> secs for changes; returns the changed files
+    def wait(self, timeout):
+        changed, _ = self._watcher.update(timeout)
+        if changed:
+            self.console.debug("found changed files: %s" % changed)
+        return changed
+
+    ##
+    # All watched files
+    def files(self):
+        return self._watcher.snapshot.keys()
 
 
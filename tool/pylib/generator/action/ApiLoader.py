@@ -69,7 +69,7 @@ class ApiLoader(object):
             self._console.error("Error in API data of class: %s" % fileId)
             data = None
 
-        self._cache.write(cacheId, (data, attachMap))
+        self._cache.write(cacheId, (data, attachMap), dependsOn=filePath)
         return data, attachMap
 
 
@@ -34,6 +34,9 @@ def runResources(confObj, script):
         return
     console = Context.console
 
+    if script.shared.get("resources-copied"):
+        console.info("Copying resources... (same as for a previous variant set)")
+        return
     console.info("Copying resources...")
     classList     = script.classesObj
     resTargetRoot = jobconf.get("copy-resources/target", "build")
@@ -41,7 +44,9 @@ def runResources(confObj, script):
     #generator.approot  = resTargetRoot  # doesn't seem necessary anymore
 
     # map resources to class.resources
-    classList = Class.mapResourcesToClasses(script.libraries, classList, jobconf.get("asset-let", {}))
+    if not script.shared.get("resources-mapped"):
+        classList = Class.mapResourcesToClasses(script.libraries, classList, jobconf.get("asset-let", {}))
+        script.shared["resources-mapped"] = True
 
     console.indent()
     # make resources to copy unique
@@ -53,6 +58,7 @@ def runResources(confObj, script):
         resTarget = os.path.join(resTargetRoot, 'resource', res.id)
         # Copy
         _copyResources(res.path, os.path.dirname(resTarget))
+    script.shared["resources-copied"] = True
 
     console.outdent()
 
@@ -21,37 +21,25 @@
 
 import os, sys, re, collections
 import time, datetime
-import cPickle as pickle
 
 from polib import polib
 from ecmascript.frontend import treeutil, tree
 from misc import cldr, util, filetool, util, textutil
 from generator.resource.Library import Library
 from generator.code import Class
+from generator.runtime import ProcessPool
 from generator import Context
 
 ##
-# creates an up-to-date index of the msgid's in the POFile
-# - as this is not updated automatically on POFile changes, make sure you run
-#   this after modifications and before using .indexFind()
+# Compile the entries of a polib.POFile into a catalog, {msgid: (msgstr,
+# ((pos, msgstr), ...))}, with the plural forms by their positions. Like a
+# lookup in the POFile, the last entry of a msgid wins.
 
-def pofileGetIdIndex(self):
-    idIndex = {}
-    for entry in self:
-        idIndex[entry.msgid] = entry
-    self.idIndex = idIndex
-    return idIndex
-
-##
-# looks up a msgid in the POFile, using the .idIndex index generated by .getIdIndex()
-
-def pofileIndexFind(self, msgid):
-    return self.idIndex.get(msgid, None)
-
-# Attach the new methods to the POFile class
-
-polib.POFile.getIdIndex = pofileGetIdIndex
-polib.POFile.indexFind  = pofileIndexFind
+def compileCatalog(po):
+    catalog = {}
+    for entry in po:
+        catalog[entry.msgid] = (entry.msgstr, tuple(sorted(entry.msgstr_plural.items())))
+    return catalog
 
 class Locale(object):
     def __init__(self, context, classesObj, translation, cache, console):
@@ -60,6 +48,8 @@ class Locale(object):
         self._translation = translation
         self._cache = cache
         self._console = console
+        self._cldrData = {}  # {locale: CLDR data}
+        self._cldrBundle = None
 
 
 
@@ -91,26 +81,50 @@ class Locale(object):
                 self._console.warn("Base locale %s not specified, trying to add it." % topLevelLocale)
                 newlocales[:0] = [topLevelLocale]
 
+        toParse = []  # [(locale, locFile)]
         for entry in newlocales:
             if entry == "C":
                 locale = "en"
             else:
                 locale = entry
+            if locale in self._cldrData or locale in [x[0] for x in toParse]:
+                continue
             locFile = os.path.join(root, "%s.xml" % locale)
             cacheId = "locale-%s-%s" % (root, locale)
 
-            locDat, _ = self._cache.read(cacheId, locFile)
+            locDat = self.cldrBundle(root).get(locale, locFile)
             if locDat == None:
-                self._console.debug("Processing locale: %s" % locale)
-                locDat = cldr.parseCldrFile(locFile)
-                self._cache.write(cacheId, locDat)
+                locDat, _ = self._cache.read(cacheId, locFile)
+            if locDat == None:
+                toParse.append((locale, locFile))
+            else:
+                self._cldrData[locale] = locDat
 
-            data[entry] = locDat
+        # parse the XML files of the remaining locales in parallel
+        if toParse:
+            self._console.debug("Processing locales: %s" % ", ".join(x[0] for x in toParse))
+            jobs = ProcessPool.numJobs(self._context["jobconf"].get("compile-options/code/jobs", 0))
+            locDats = ProcessPool.forkMap(cldr.parseCldrFile, [x[1] for x in toParse], jobs)
+            for (locale, locFile), locDat in zip(toParse, locDats):
+                self._cache.write("locale-%s-%s" % (root, locale), locDat, dependsOn=locFile)
+                self._cldrData[locale] = locDat
+
+        for entry in newlocales:
+            data[entry] = dict(self._cldrData["en" if entry == "C" else entry])
 
         self._console.outdent()
         return data
 
 
+    ##
+    # The bundle of extracted CLDR data shipped next to <root>, the folder of
+    # the CLDR XML files (see misc.cldr.Bundle)
+    def cldrBundle(self, root):
+        if self._cldrBundle is None:
+            self._cldrBundle = cldr.Bundle(os.path.join(root, os.pardir, cldr.BUNDLE_NAME))
+        return self._cldrBundle
+
+
 
     def getPotFile(self, content, variants={}):
         pot = self.createPoFile()
@@ -284,34 +298,44 @@ class Locale(object):
             return LocalesToPofiles
 
         ##
-        # Adding translation entries from <pofiles> to <pot>
+        # The translations for the entries of <pot> from the catalogs of
+        # <pofiles>, [[msgstr, {pos: msgstr}]] in the order of <pot>; later
+        # files override earlier ones
         def translationsFromPofiles(pofiles, pot, statsObj=None):
+            translations = [["", dict(plural)] for _, _, plural in pot]
             for path in pofiles:
                 self._console.debug("Reading file: %s" % path)
+                catalog = self.getCatalog(path)
+                for (msgid, _, _), translation in zip(pot, translations):
+                    if msgid in catalog:
+                        msgstr, plural = catalog[msgid]
+                        translation[0] = msgstr
+                        translation[1].update(plural)
+                        if statsObj and not translated(translation):
+                            statsObj['untranslated'][msgid] = path
+            return translations
 
-                # .po files are only read-accessed
-                cacheId = "pofile-%s" % path
-                po, _ = self._cache.read(cacheId, path, memory=True)
-                if po == None:
-                    po = polib.pofile(path)
-                    self._cache.write(cacheId, po, memory=True)
-                extractTranslations(pot, po, statsObj)
-            return pot
-
-        def extractTranslations(pot, po, statsObj=None):
-            po.getIdIndex()
-            for potentry in pot:
-                #otherentry = po.find(potentry.msgid)   # this is slower on average than my own functions (bec. 'getattr')
-                otherentry = po.indexFind(potentry.msgid)
-                if otherentry:
-                    potentry.msgstr = otherentry.msgstr
-                    #potentry.msgid_plural remains
-                    if otherentry.msgstr_plural:
-                        for pos in otherentry.msgstr_plural:
-                            potentry.msgstr_plural[pos] = otherentry.msgstr_plural[pos]
-                    if statsObj and not potentry.translated():
-                        statsObj['untranslated'][potentry.msgid] = po.fpath
-            return
+        ##
+        # Like polib.POEntry.translated()
+        def translated(translation):
+            msgstr, plural = translation
+            if msgstr != '':
+                return True
+            if plural:
+                return '' not in plural.values()
+            return False
+
+        ##
+        # Like entriesToDict(), for [((msgid, msgid_plural, _), translation)]
+        def translationsToDict(entries):
+            all_ = {}
+            for (msgid, msgid_plural, _), (msgstr, plural) in entries:
+                if '0' in plural and '1' in plural:
+                    all_[msgid]        = plural['0']
+                    all_[msgid_plural] = plural['1']
+                else:
+                    all_[msgid] = msgstr
+            return all_
 
         def reportUntranslated(locale, cnt_untranslated, cnt_total):
             if cnt_total > 0:
@@ -331,27 +355,24 @@ class Locale(object):
         #    return langToTranslationMap
         libnames = namespacesFromClasses(clazzList) # Find all influenced namespaces
         LocalesToPofiles = localesToPofiles(libnames, targetLocales)  # Create a map of locale => [pofiles]
-        mainpotS = pickle.dumps(mainpot)  # create a string-backup of mainpot
+        # (msgid, msgid_plural, msgstr_plural) of its entries, in their order
+        pot = [(x.msgid, x.msgid_plural, x.msgstr_plural.items()) for x in mainpot]
 
         # Load po files and process their content
         for locale in LocalesToPofiles:
-            # Generate POT file to filter PO files
-            self._console.debug("Compiling filter...")
-            pot = pickle.loads(mainpotS)  # need a fresh pot, as it will be modified
-                                          # copy.deepcopy(mainpot) chokes on overridden Array.append
             self._console.debug("Processing translation: %s" % locale)
             self._console.indent()
 
             if statsObj:
                statsObj.update(locale, 0, 0)
             # Get relevant entries from po files for this locale, and convert to dict
-            pot = translationsFromPofiles(LocalesToPofiles[locale], pot,
-                statsObj.stats[locale] if statsObj else statsObj) # loop through .po files, updating pot
-            poentries = pot.translated_entries()
+            translations = translationsFromPofiles(LocalesToPofiles[locale], pot,
+                statsObj.stats[locale] if statsObj else statsObj) # loop through .po files
+            potentries = zip(pot, translations)
+            entries = [x for x in potentries if translated(x[1])]
             if addUntranslatedEntries:
-                poentries.extend(pot.untranslated_entries())
-            transdict = self.entriesToDict(poentries)
-            langToTranslationMap[locale] = transdict
+                entries.extend(x for x in potentries if not translated(x[1]))
+            langToTranslationMap[locale] = translationsToDict(entries)
             if statsObj:
                 statsObj.stats[locale]['total'] = len(pot)
 
@@ -363,6 +384,18 @@ class Locale(object):
 
 
 
+    ##
+    # The catalog of the .po file <path> (see compileCatalog()), which is kept
+    # in the cache
+    def getCatalog(self, path):
+        cacheId = "pocatalog-%s" % path
+        catalog, _ = self._cache.read(cacheId, path, memory=True)
+        if catalog == None:
+            catalog = compileCatalog(polib.pofile(path))
+            self._cache.write(cacheId, catalog, memory=True, dependsOn=path)
+        return catalog
+
+
     def entriesToDict(self, entries):
         all_ = {}
 
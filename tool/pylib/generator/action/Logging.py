@@ -25,7 +25,8 @@
 import os, sys, re, types, string
 import graph
 from generator         import Context
-from misc              import filetool, textutil, json, util
+from generator.runtime import SharedMap
+from misc              import filetool, textutil, json, util, toposort
 from misc.ExtMap       import ExtMap
 from ecmascript.transform.optimizer import privateoptimizer
 from ecmascript.transform.optimizer import featureoptimizer
@@ -114,8 +115,7 @@ def runPrivateDebug(jobconf):
     console = Context.console
     cache   = Context.cache
 
-    cacheId = privateoptimizer.privatesCacheId
-    privates, _ = cache.read(cacheId)
+    privates = SharedMap.get(cache, privateoptimizer.privatesCacheId, counter=True).map()
 
     console.info("Privates debugging...")
     privateoptimizer.debug(privates)
@@ -127,7 +127,7 @@ def runStaticsOptimizedDebug(jobconf):
     console = Context.console
     cache   = Context.cache
 
-    features, _ = cache.read(featureoptimizer.cacheId)
+    features = SharedMap.get(cache, featureoptimizer.cacheId, overwrite=True).map()
 
     console.info("Optimized statics as JSON...")
     featureoptimizer.debug(features)
@@ -626,6 +626,26 @@ def runLogDependencies(jobconf, script):
         return
 
 
+    ##
+    # Pass on the relations of <classDepsIter>, collecting the load deps in
+    # <loadDeps> {classId: [depId]}
+    def collectLoadDeps(classDepsIter, type, loadDeps):
+        for rel in classDepsIter:
+            (packageId, classId, depId, loadOrRun) = rel
+            if loadOrRun == 'load' and depId is not None:
+                if type == "using":
+                    loadDeps.setdefault(classId, []).append(depId)
+                else:  # classId is used by depId
+                    loadDeps.setdefault(depId, []).append(classId)
+            yield rel
+
+
+    def reportLoadCycles(loadDeps):
+        depsGraph = toposort.DepsGraph(sorted(loadDeps), lambda x: loadDeps[x])
+        for chain in depsGraph.cycles():
+            console.warn("Circular load dependencies: %s" % " -> ".join(chain))
+
+
     def logDeps(depsLogConf, type):
 
         mainformat = depsLogConf.get('format', None)
@@ -641,6 +661,8 @@ def runLogDependencies(jobconf, script):
             classDepsIter = lookupUsingDeps(packages, includeTransitives, forceFreshDeps)
         else:
             classDepsIter = lookupUsedByDeps(packages, includeTransitives, forceFreshDeps)
+        loadDeps = {}
+        classDepsIter = collectLoadDeps(classDepsIter, type, loadDeps)
 
         if mainformat == 'dot':
             depsToDotFile(classDepsIter, depsLogConf)
@@ -655,6 +677,7 @@ def runLogDependencies(jobconf, script):
         else:
             depsToConsole(classDepsIter, type)
 
+        reportLoadCycles(loadDeps)
         return
 
     # -- Main (runLogDependencies) ------------------
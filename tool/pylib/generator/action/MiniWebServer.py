@@ -141,6 +141,8 @@ class RequestHandler(CGIHTTPServer.CGIHTTPRequestHandler):
                 line1 = line1.replace("{{check_url}}", str(live_reload.lreload_check_url))
             out.write(line1)
 
+    # the watcher's snapshot is brought up to date from pending change events
+    # (or a re-scan with the polling backend), so checks are cheap
     def check_reload(self, since):
         last_since = since
         ylist = live_reload.lreload_watcher.check(last_since)
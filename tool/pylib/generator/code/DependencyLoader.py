@@ -38,15 +38,19 @@
 ##
 
 import sys, re, os, types, time
+from collections import namedtuple
 from operator import attrgetter
-import graph
 
+from misc                       import util, toposort
 from misc.ExtMap                import ExtMap
 from ecmascript.frontend        import lang
 from ecmascript.transform.check import global_symbols as gs
 from generator.code.Class       import DependencyError
 from generator.code.DependencyItem  import DependencyItem
 from generator.action           import CodeMaintenance
+from generator.runtime          import ProcessPool
+
+ClassDeps = namedtuple("ClassDeps", "load run warn ignoreNames skipNames cached")
 
 class DependencyLoader(object):
 
@@ -59,6 +63,7 @@ class DependencyLoader(object):
         self._require = require
         self._use     = use
         self.counter  = 0
+        self._depsMemo = {}  # {(class id, variants key): ClassDeps}, s. _classDeps()
 
 
     def expand_hard_excludes(self, excludeWithDepsHard, script, verifyDeps=False):
@@ -130,123 +135,116 @@ class DependencyLoader(object):
 
 
 
+    ##
+    # Compute the list of classes needed by <includeWithDeps>, i.e. the closure
+    # of their load and run dependencies, without <excludeWithDeps>. The list
+    # is partially sorted: each class follows its load dependencies.
+    #
+    # The closure is walked depth-first with an explicit stack, so deep
+    # dependency chains don't hit the recursion limit. The dependencies of
+    # each class are memoized per variant set, for the other includes, parts
+    # and jobs using the same loader. With compile-options/code/jobs > 1,
+    # the dependencies of classes that are not in the cache are computed in
+    # worker processes up-front (s. _prefetchDeps()).
     def classlistFromInclude(self, includeWithDeps, excludeWithDeps, variants,
                              verifyDeps=False, script=None, allowBlockLoaddeps=True):
 
-        def classlistFromClassRecursive(depsItem, excludeWithDeps, variants, result, warn_deps, loadDepsChain, allowBlockLoaddeps=True):
+        ##
+        # Start visiting <depsItem>, required by <requestor> with the load
+        # dependency chain <loadDepsChain> (a list of class ids and a set of
+        # the same, for the cycle checks); returns the stack frame for the
+        # walk, or None if the class needs no visit
+        def visit(depsItem, requestor, loadDepsChain):
             # support blocking
             if depsItem.name in excludeWithDeps:
                 if depsItem.isLoadDep and not allowBlockLoaddeps:
+                    if requestor:
+                        raise ValueError("Attempt to block load-time dependency of class %s to %s" % (requestor, depsItem.name))
                     raise DependencyError()
-                return
+                return None
 
             # check if already in
-            if depsItem.name in resultNames:  # string compares are perceivably faster than object compares (as DependencyItem defines __eq__)
-                return
+            if depsItem.name in resultNames:
+                return None
 
             # Reading dependencies
-
-            self._console.debug("Gathering dependencies: %s" % depsItem.name)
-            self._console.indent()
-            classObj = self._classesObj[depsItem.name] # get class from depsItem - throws KeyError
-            deps, cached = classObj.getCombinedDeps(self._classesObj, variants, self._jobconf)
+            if logDebug:
+                self._console.debug("Gathering dependencies: %s" % depsItem.name)
+                self._console.indent()
+            try:
+                deps = self._classDeps(depsItem.name, variants, variantsKey)
+            except KeyError, detail:
+                if requestor:
+                    raise NameError("Could not resolve dependencies of class '%s': %s" % (requestor, detail))
+                raise
+            if logDebug:
+                self._console.outdent()
+            classObj = self._classesObj[depsItem.name]
             # lint-check - sans globals check (s.further)
             if lint_check and is_app_code(classObj): # opt: and not cached
                 warns = classObj.lint_warnings(lint_opts)
                 for warn in warns:
                     self._console.warn("%s (%d, %d): %s" % (classObj.id, warn.line, warn.column,
                         warn.msg % tuple(warn.args)))
-            self._console.outdent()
-            if logInfos: self._console.dot("%s" % "." if cached else "*")
-
-            # And evaluate them
+            if logInfos: self._console.dot("%s" % "." if deps.cached else "*")
 
             # check for unknown globals
-            deps["warn"] = self._checkDepsAreKnown(deps)  # add 'warn' key to deps
-            ignore_names = [x.name for x in deps["ignore"]]
             if verifyDeps:
-                for dep in deps["warn"]:
-                    if dep.name not in ignore_names:
+                for dep in deps.warn:
+                    if dep.name not in deps.ignoreNames:
                         warn_deps.append(dep) # add it to warnings accumulator
 
-            # process lists
-            try:
-                skipNames = [x.name for x in deps["warn"] + deps["ignore"]]
-
-                # cycle detection
-                assert depsItem.name not in loadDepsChain
-                loadDepsChain.append(depsItem.name)
-
-                for subitem in deps["load"]:
-                    # cycle check
-                    if subitem.name in loadDepsChain:
-                        self._console.warn("Detected circular dependency between: %s and %s" % (depsItem.name, subitem.name))
-                        self._console.indent()
-                        self._console.debug("currently explored dependency path: %r" % loadDepsChain)
-                        self._console.outdent()
-                        raise RuntimeError("Circular class dependencies")
-                    if subitem.name not in resultNames and subitem.name not in skipNames:
-                        classlistFromClassRecursive(subitem, excludeWithDeps, variants, result, warn_deps, loadDepsChain, allowBlockLoaddeps)
-
-                ##
-                # putting this here allows expanding and partially sorting of the class
-                # list in one go
-                if depsItem.name not in resultNames:
-                    result.append(depsItem)
-                    resultNames.append(depsItem.name)
-
-                # cycle check
-                loadDepsChain.remove(depsItem.name)
-
-                for subitem in deps["run"]:
-                    if subitem.name not in resultNames and subitem.name not in skipNames:
-                        classlistFromClassRecursive(subitem, excludeWithDeps, variants, result, warn_deps, [], allowBlockLoaddeps)
-
-            except DependencyError, detail:
-                raise ValueError("Attempt to block load-time dependency of class %s to %s" % (depsItem.name, subitem.name))
-
-            except KeyError, detail:
-                raise NameError("Could not resolve dependencies of class '%s': %s" % (depsItem.name, detail))
-
-            return
-
-
-        def classlistFromClassIterative(depsItem, excludeWithDeps, variants, result, warn_deps, loadDepsChain, allowBlockLoaddeps=True):
+            # cycle detection
+            assert depsItem.name not in loadDepsChain[1]
+            loadDepsChain[0].append(depsItem.name)
+            loadDepsChain[1].add(depsItem.name)
+            # item, deps, chain, remaining load deps, remaining run deps, load deps done
+            return [depsItem, deps, loadDepsChain, iter(deps.load), iter(deps.run), False]
 
-            def processNode(depsItem):
-                if depsItem.name in resultNames:
-                    node = None
-                else:
-                    result.append(depsItem)
-                    resultNames.append(depsItem.name)
-                    node = depsItem
-                return node
-
-            def getNodeChildren(depsItem):
-                deps, cached = self._classesObj[depsItem.name].getCombinedDeps(self._classesObj, variants, self._jobconf)
-
-                # and evaluate them
-                deps["warn"] = self._checkDepsAreKnown(deps)  # add 'warn' key to deps
-                ignore_names = [x.name for x in deps["ignore"]]
-                if verifyDeps:
-                    for dep in deps["warn"]:
-                        if dep.name not in ignore_names:
-                            warn_deps.append(dep)
-
-                skipNames = [x.name for x in deps["warn"] + deps["ignore"]]
-                result = []
-                for dep in deps['load'] + deps['run']:
-                    if dep.name in skipNames or dep.name in resultNames:
+        ##
+        # Add the closure of <depsItem> to result; classes are appended after
+        # their load deps, and their run deps are walked afterwards, with a
+        # new load deps chain
+        def walk(depsItem):
+            frame = visit(depsItem, None, ([], set()))
+            stack = [frame] if frame else []
+            while stack:
+                item, deps, loadDepsChain, loadDeps, runDeps, loadDone = frame = stack[-1]
+                child = None
+                if not loadDone:
+                    for subitem in loadDeps:
+                        # cycle check
+                        if subitem.name in loadDepsChain[1]:
+                            self._console.warn("Detected circular dependency between: %s and %s" % (item.name, subitem.name))
+                            self._console.indent()
+                            self._console.debug("currently explored dependency path: %r" % loadDepsChain[0])
+                            self._console.outdent()
+                            raise RuntimeError("Circular class dependencies")
+                        if subitem.name not in resultNames and subitem.name not in deps.skipNames:
+                            child = visit(subitem, item.name, loadDepsChain)
+                            if child:
+                                break
+                    if child:
+                        stack.append(child)
                         continue
-                    result.append(dep)
-
-                return result  # returns *all* deps (load, run, ...)
-
-            # ---------------------------------------------------------------------
-
-            self.agendaSearch([depsItem], processNode, getNodeChildren, mode="bf")
-
-            return
+                    frame[5] = True
+                    ##
+                    # putting this here allows expanding and partially sorting of the class
+                    # list in one go
+                    if item.name not in resultNames:
+                        result.append(item.name)
+                        resultNames.add(item.name)
+                    loadDepsChain[1].remove(loadDepsChain[0].pop())
+
+                for subitem in runDeps:
+                    if subitem.name not in resultNames and subitem.name not in deps.skipNames:
+                        child = visit(subitem, item.name, ([], set()))
+                        if child:
+                            break
+                if child:
+                    stack.append(child)
+                    continue
+                stack.pop()
 
         def is_app_code(classObj):
             return classObj.library.namespace == app_namespace
@@ -255,6 +253,7 @@ class DependencyLoader(object):
         result = []
         warn_deps = []
         logInfos = self._console.getLevel() == "info"
+        logDebug = self._console.getLevel() == "debug"
         app_namespace = self._jobconf.get("let/APPLICATION", u'')
 
         # Lint stuff
@@ -277,18 +276,20 @@ class DependencyLoader(object):
         # Calculate dependencies
         else:
             result = []  # reset any previous results for this iteration
-            resultNames = []
+            resultNames = set()
+            excludeWithDeps = set(excludeWithDeps)
+            variantsKey = util.toString(variants)
+
+            jobs = ProcessPool.numJobs(self._jobconf.get("compile-options/code/jobs", 0))
+            if jobs > 1 and ProcessPool.canFork():
+                self._prefetchDeps(includeWithDeps, excludeWithDeps, variants, variantsKey, jobs)
 
-            # calculate class list recursively
+            # calculate class list
             for item in includeWithDeps:
-                depsItem = DependencyItem(item, '', '|config|')
-                classlistFromClassRecursive(depsItem, excludeWithDeps, variants, result, warn_deps, [], allowBlockLoaddeps)
+                walk(DependencyItem(item, '', '|config|'))
 
             self._console.dotclear()
 
-            # extract names of depsItems
-            result = [x.name for x in result]
-
         # Unknown globals warnings
         # - late, because adding the list of name spaces of the selected classes
         known_namespaces = set()
@@ -328,120 +329,90 @@ class DependencyLoader(object):
         return False
 
 
-    def agendaSearch(self, agenda, processNode, getNodeChildren, mode="df"):
-        while agenda:
-            node = agenda.pop(0)
-            node = processNode(node)
-            if node:
-                children = getNodeChildren(node)
-                if mode == "df":
-                    agenda[0:0] = children  # prepend
-                else:
-                    agenda.extend(children) # append
-        return
-
-
-    def agendaSearchMP(self, agenda, processNode, getNodeChildren, mode="df"):
-        while agenda:
-            node = agenda.pop(0)
-            node = processNode(node)
-            if node:
-                children = getNodeChildren(node)
-                if mode == "df":
-                    agenda[0:0] = children  # prepend
-                else:
-                    agenda.extend(children) # append
-        return
-
-
-
-
-    ######################################################################
-    #  CLASS SORT SUPPORT
-    ######################################################################
-
     ##
-    # Method chooser
-    def sortClasses(self, *args, **kwargs):
-        #if  self._jobconf.get("dependencies/sort-topological", False):
-        return self.sortClassesRec(*args, **kwargs)
-        #return self.sortClassesTopological(*args, **kwargs)
-
+    # The names of the load dependencies of class <classId> for <variants>,
+    # from the memo of _classDeps()
+    def getLoadDeps(self, classId, variants, variantsKey=None):
+        if variantsKey is None:
+            variantsKey = util.toString(variants)
+        return [x.name for x in self._classDeps(classId, variants, variantsKey).load]
 
-    def sortClassesRec(self, classList, variants, buildType=""):
-
-        def sortClassesRecurser(classId, classListSorted, path):
-            if classId in classListSorted:
-                return
-
-            # reading dependencies
+    ##
+    # The dependencies of class <classId> for <variants>, as needed for
+    # computing class lists: the "load" and "run" deps from getCombinedDeps(),
+    # the deps to unknown classes ("warn"), and the names of the deps not to
+    # follow ("skipNames"). Memoized per <variantsKey>.
+    #
+    # The "load" and "run" deps are sorted by class id: getCombinedDeps()
+    # returns them in set order, which depends on whether they were computed
+    # or read from the cache, and the class lists must not.
+    def _classDeps(self, classId, variants, variantsKey):
+        memoKey = (classId, variantsKey)
+        if memoKey not in self._depsMemo:
             deps, cached = self._classesObj[classId].getCombinedDeps(self._classesObj, variants, self._jobconf)
+            self._depsMemo[memoKey] = self._classDepsRecord(deps, cached)
+        return self._depsMemo[memoKey]
 
-            if self._console.getLevel() is "info":
-                self._console.dot("%s" % "." if cached else "*")
-
-            # path is needed for recursion detection
-            if not classId in path:
-                path.append(classId)
-
-            # process loadtime requirements
-            for dep in deps["load"]:
-                dep_name = dep.name
-                if dep_name in classList and not dep_name in classListSorted:
-                    if dep_name in path:
-                        self._console.warn("Detected circular dependency between: %s and %s" % (classId, dep_name))
-                        self._console.indent()
-                        self._console.debug("currently explored dependency path: %r" % path)
-                        self._console.outdent()
-                        raise RuntimeError("Circular class dependencies")
-                    else:
-                        sortClassesRecurser(dep_name, classListSorted, path)
-
-            if not classId in classListSorted:
-                # remove element from path
-                path.remove(classId)
-
-                # print "Add: %s" % classId
-                classListSorted.append(classId)
+    def _classDepsRecord(self, deps, cached):
+        warn = self._checkDepsAreKnown(deps)
+        ignoreNames = set(x.name for x in deps["ignore"])
+        skipNames = set(x.name for x in warn).union(ignoreNames)
+        byName = attrgetter("name")
+        return ClassDeps(sorted(deps["load"], key=byName), sorted(deps["run"], key=byName),
+                         warn, ignoreNames, skipNames, cached)
 
-            return
 
-        # ---------------------------------
-
-        classListSorted = []
-        path   = []
-
-        for classId in classList:
-            sortClassesRecurser(classId, classListSorted, path)
-
-        return classListSorted
-
-
-    def sortClassesTopological(self, classList, variants, buildType=''):
-
-        # create graph object
-        gr = graph.digraph()
-
-        # add classes as nodes
-        gr.add_nodes(classList)
-
-        # for each load dependency add a directed edge
-        for classId in classList:
-            deps, _ = self._classesObj[classId].getCombinedDeps(variants, self._jobconf)
-            for dep in deps["load"]:
-                depClassId = dep.name
-                if depClassId in classList:
-                    gr.add_edge(depClassId, classId)
+    ##
+    # Compute the dependencies of the classes in the closure of <classIds>
+    # which are not in the cache, with a pool of <jobs> worker processes.
+    # Proceeds breadth-first, one level of the dependency graph at a time,
+    # reading the deps of cached classes in this process.
+    def _prefetchDeps(self, classIds, excludeWithDeps, variants, variantsKey, jobs):
+
+        def computeDeps(classId):
+            sys.stdout = open(os.devnull, "w")  # progress output would interleave; warnings go to stderr
+            deps, cached = self._classesObj[classId].getCombinedDeps(self._classesObj, variants, self._jobconf)
+            return self._classDepsRecord(deps, cached)
+
+        seen  = set(classIds)
+        level = [x for x in classIds if x in self._classesObj and x not in excludeWithDeps]
+        while level:
+            stale = [x for x in level if (x, variantsKey) not in self._depsMemo
+                     and not self._classesObj[x].dependenciesCached(variants)]
+            if len(stale) > 1:
+                for classId, deps in zip(stale, ProcessPool.forkMap(computeDeps, stale, jobs)):
+                    self._depsMemo[(classId, variantsKey)] = deps
+            nextLevel = []
+            for classId in level:
+                deps = self._classDeps(classId, variants, variantsKey)
+                for dep in deps.load + deps.run:
+                    if (dep.name not in seen and dep.name not in deps.skipNames
+                        and dep.name not in excludeWithDeps and dep.name in self._classesObj):
+                        seen.add(dep.name)
+                        nextLevel.append(dep.name)
+            level = nextLevel
 
-        # cycle check?
-        cycle_nodes = gr.find_cycle()
-        if cycle_nodes:
-            #raise RuntimeError("Detected circular dependencies between nodes: %r" % cycle_nodes)
-            pass
 
-        classList = gr.topological_sorting()
+    ######################################################################
+    #  CLASS SORT SUPPORT
+    ######################################################################
 
-        return classList
+    ##
+    # Sort <classList>, so that each class follows its load dependencies (in
+    # <classList>); otherwise, the order of <classList> is kept. The load deps
+    # come from the memo of classlistFromInclude(), so the dependency graph is
+    # only computed once per variant set, for the class list and all packages.
+    def sortClasses(self, classList, variants, buildType=""):
+        variantsKey = util.toString(variants)
+
+        def loadDeps(classId):
+            return self.getLoadDeps(classId, variants, variantsKey)
+
+        try:
+            return toposort.DepsGraph(classList, loadDeps).sort()
+        except toposort.CycleError, e:
+            self._console.warn("Detected circular load dependencies: %s" % " -> ".join(e.chain))
+            raise
 
 
     ######################################################################
@@ -32,8 +32,9 @@ from ecmascript.transform.check     import scopes, load_time, lint, jshints
 from ecmascript.transform.optimizer import variantoptimizer, variableoptimizer, commentoptimizer
 from ecmascript.transform.optimizer import stringoptimizer, basecalloptimizer, privateoptimizer
 from ecmascript.transform.optimizer import featureoptimizer
-from ecmascript.transform.optimizer import globalsoptimizer
+from ecmascript.transform.optimizer import globalsoptimizer, pipeline
 from generator import Context
+from generator.runtime import SharedMap
 from generator.action               import CodeMaintenance
 from misc import util, filetool
 
@@ -55,12 +56,14 @@ class MClassCode(object):
 
         cache = self.context['cache']
         console = self.context['console']
-        tradeSpaceForSpeed = False  # Caution: setting this to True seems to make builds slower, at least on some platforms!?
-        cacheId = "tree%s-%s-%s" % (treegen.tag, self.path, util.toString({}))
+        # keeping trees in memory only pays off (and is only affordable) with a
+        # bounded memory cache; they are kept frozen, as callers modify them
+        tradeSpaceForSpeed = cache.memoryLimited()
+        cacheId = self.treeCacheId(treegen)
         self.treeId = cacheId
 
         # Lookup for unoptimized tree
-        tree, _ = cache.read(cacheId, self.path, memory=tradeSpaceForSpeed)
+        tree, _ = cache.read(cacheId, self.path, memory=tradeSpaceForSpeed, frozen=True)
 
         # Tree still undefined?, create it!
         if tree == None or force:
@@ -109,13 +112,20 @@ class MClassCode(object):
                 tree = jshints.create_hints_tree(tree)
 
             # Store unoptimized tree
-            cache.write(cacheId, tree, memory=tradeSpaceForSpeed)
+            cache.write(cacheId, tree, memory=tradeSpaceForSpeed, dependsOn=self.path, frozen=True)
 
             console.outdent()
 
         return tree
 
 
+    ##
+    # Cache id of the unoptimized syntax tree
+    #
+    def treeCacheId(self, treegen=treegenerator):
+        return "tree%s-%s-%s" % (treegen.tag, self.path, util.toString({}))
+
+
     ##
     # Raises in case of inconsistencies, otherwise returns None
     #
@@ -225,7 +235,7 @@ class MClassCode(object):
     ##
     # Interface method: selects the right code version to return
     # Checking the cache for the appropriate code, and pot. invoking ecmascript.backend
-    def getCode(self, compOptions, treegen=treegenerator, featuremap={}):
+    def getCode(self, compOptions, treegen=treegenerator, featuremap={}, privatesMap=None):
 
         # source versions
         if not compOptions.optimize:
@@ -238,25 +248,30 @@ class MClassCode(object):
             optimize  = compOptions.optimize
             variants  = compOptions.variantset
             format_   = compOptions.format
-            classVariants     = self.classVariants()
-            # relevantVariants is the intersection between the variant set of this job
-            # and the variant keys actually used in the class
-            relevantVariants  = self.projectClassVariantsToCurrent(classVariants, variants)
-            variantsId        = util.toString(relevantVariants)
-            optimizeId        = self._optimizeId(optimize)
-            cache             = self.context["cache"]
-
-            cacheId = "compiled-%s-%s-%s-%s" % (self.path, variantsId, optimizeId, format_)
+            cache     = self.context["cache"]
+
+            cacheId = self.compiledCacheId(compOptions)
             compiled, _ = cache.read(cacheId, self.path)
 
             if compiled == None:
-                tree = self.optimize(None, optimize, variants, featuremap)
+                tree = self.optimize(None, optimize, variants, featuremap, privatesMap)
                 compiled = self.serializeTree(tree, optimize, format_)
                 if not "statics" in optimize:
-                    cache.write(cacheId, compiled)
+                    cache.write(cacheId, compiled, dependsOn=self.path)
 
         return compiled
 
+    ##
+    # Cache id of the compiled code for the given compile options
+    def compiledCacheId(self, compOptions):
+        classVariants     = self.classVariants()
+        # relevantVariants is the intersection between the variant set of this job
+        # and the variant keys actually used in the class
+        relevantVariants  = self.projectClassVariantsToCurrent(classVariants, compOptions.variantset)
+        variantsId        = util.toString(relevantVariants)
+        optimizeId        = self._optimizeId(compOptions.optimize)
+        return "compiled-%s-%s-%s-%s" % (self.path, variantsId, optimizeId, compOptions.format)
+
     def serializeTree(self, tree, optimize, format_=False):
         if not "whitespace" in optimize:
             compiled = self.serializeFormatted(tree)
@@ -289,29 +304,18 @@ class MClassCode(object):
     ##
     # Optimize class tree.
     #
-    def optimize(self, p_tree=None, p_optimize=[], variantSet={}, featureMap={}):
+    # @param privatesMap {Map} global privates map to use for the "privates"
+    #   optimization; if not given, the one of the cache (see SharedMap)
+    #
+    def optimize(self, p_tree=None, p_optimize=[], variantSet={}, featureMap={}, privatesMap=None):
 
         def load_privates():
-            cacheId = privateoptimizer.privatesCacheId
-            privates, _ = cache.read(cacheId, keepLock=True)
-            if privates == None:
-                privates = {}
-            return privates
-
-        def write_privates(globalprivs):
-            cacheId  = privateoptimizer.privatesCacheId
-            cache.write(cacheId, globalprivs)  # removes lock by default
+            if privatesMap is not None:
+                return privatesMap
+            return SharedMap.get(cache, privateoptimizer.privatesCacheId, counter=True).map()
 
         def load_features():
-            cacheId = featureoptimizer.cacheId
-            features, _ = cache.read(cacheId, keepLock=True)
-            if features == None:
-                features = {}
-            return features
-
-        def write_features(globalfeatures):
-            cacheId  = featureoptimizer.cacheId
-            cache.write(cacheId, globalfeatures)  # removes lock by default
+            return SharedMap.get(cache, featureoptimizer.cacheId, overwrite=True).map()
 
         def getTreeCacheId(optimize=[], variantSet={}):
             classVariants = self.classVariants()
@@ -320,47 +324,53 @@ class MClassCode(object):
                 treegenerator.tag, # TODO: hard-coded treegen.tag
                 self.path, self._optimizeId(optimize), util.toString(relevantVariants))
 
+        def optimizeStatics(tree):
+            if not featureMap:
+                console.warn("Empty feature map passed to static methods optimization; skipping")
+            elif self.type == 'static' and self.id in featureMap:
+                optimzed_features = featureoptimizer.patch(tree, self, featureMap)
+                if optimzed_features:
+                    load_features().update(optimzed_features)
+            return tree
+
+        def optimizeVariables(tree):
+            variableoptimizer.search(tree)
+            return tree
+
+        # the optimizations are run in one pipeline, which combines those that
+        # can share a walk over the tree
         def optimizeTree(tree):
+            passes = pipeline.Pipeline()
 
             if "comments" in optimize:
-                commentoptimizer.patch(tree)
+                passes.add(*commentoptimizer.passes())
 
             # "variants" prunes parts of the tree, so all subsequent optimizations benefit
             if "variants" in optimize:
-                variantoptimizer.search(tree, variantSet, self.id)
+                passes.add(*variantoptimizer.passes(variantSet, self.id))
 
             # 'statics' has to come before 'privates', as it needs the original key names in tree
             # if features should be removed recursively, this has to be controlled on the calling
             # level.
             if "statics" in optimize:
-                if not featureMap:
-                    console.warn("Empty feature map passed to static methods optimization; skipping")
-                elif self.type == 'static' and self.id in featureMap:
-                    optimzed_features = featureoptimizer.patch(tree, self, featureMap)
-                    if optimzed_features:
-                        optimized_statics_overall = load_features()
-                        copy = optimized_statics_overall.copy()
-                        copy.update(optimzed_features)
-                        write_features(copy)
+                passes.add(pipeline.Step("statics", optimizeStatics))
 
             if "basecalls" in optimize:
-                basecalloptimizer.patch(tree)
+                passes.add(*basecalloptimizer.passes())
 
             if "privates" in optimize:
-                privatesMap = load_privates()
-                privateoptimizer.patch(tree, id, privatesMap)
-                write_privates(privatesMap)
+                passes.add(*privateoptimizer.passes(id, load_privates()))
 
             if "globals" in optimize:
-                tree = globalsoptimizer.process(tree) # need to re-assign as this optimizer might change the root node
+                passes.add(pipeline.Step("globals", globalsoptimizer.process)) # this optimizer might change the root node
 
             if "strings" in optimize:
-                tree = stringoptimizer.process(tree, self.id)
+                passes.add(pipeline.Step("strings", lambda tree: stringoptimizer.process(tree, self.id)))
 
             if "variables" in optimize:
-                variableoptimizer.search(tree)
+                passes.add(pipeline.Step("variables", optimizeVariables))
 
-            return tree
+            return passes.run(tree)
 
         ##
         # Return the tree that is (pot.) closest to the optimization we want to apply
@@ -397,11 +407,42 @@ class MClassCode(object):
                 result = getBestMatchingTree()
                 result = optimizeTree(result)
                 if not "statics" in optimize:  # can't cache static optimized trees
-                    cache.write(cacheId, result)
+                    cache.write(cacheId, result, dependsOn=self.path)
 
         return result
 
 
+    ##
+    # Return the names of the privates the "privates" optimization would
+    # register for this class, in registration order, without touching the
+    # global privates map. This allows to fill the map ahead of compiling
+    # classes concurrently (see registerPrivates()).
+    #
+    # Caution: A passed-in <p_tree> is modified like with optimize().
+    #
+    def collectPrivates(self, p_tree=None, p_optimize=[], variantSet={}):
+        # the optimizations that run before "privates" in optimize()
+        optimize = [x for x in p_optimize if x in ("comments", "variants", "basecalls")]
+        tree = p_tree
+        if not tree:
+            # start from the same (cached) tree optimize() would pick
+            if "variants" in optimize:
+                tree = self.optimize(None, ["variants"], variantSet)
+                optimize.remove("variants")
+            else:
+                tree = self.tree()
+        if optimize:
+            tree = self.optimize(tree, optimize, variantSet)
+        return privateoptimizer.collect(tree)
+
+    ##
+    # Register privates from collectPrivates() in <privatesMap>, as optimize()
+    # would do
+    #
+    def registerPrivates(self, names, privatesMap):
+        privateoptimizer.register(id, names, privatesMap)  # same key as privateoptimizer.patch() above
+
+
     ##
     # Create an id from the optimize list
     #
@@ -34,6 +34,7 @@ from misc import util
 from misc.util import inverse, bind, pipeline
 
 ClassesAll = None # {'cid':generator.code.Class}
+MethodDepsRecords = 8  # variant records kept per class#method in the methoddeps cache
 
 GlobalSymbolsCombinedPatt = re.compile('|'.join(r'^%s\b' % re.escape(x) for x in lang.GLOBALS + lang.QXGLOBALS))
 
@@ -134,10 +135,21 @@ class MClassDependencies(object):
         ##
         # Check wether load dependencies are fresh which are included following
         # a depsItem.needsRecursion of the current class
+        #
+        # @param cacheModTime  time the deps were cached, or a map of the content
+        #   digests of the recursively included classes (with "content" cache
+        #   invalidation, see depsStamp())
         def transitiveDepsAreFresh(depsStruct, cacheModTime):
             result = True
             if cacheModTime is None:  # TODO: this can currently only occur with a Cache.memcache result
                 result = False
+            elif isinstance(cacheModTime, dict):
+                for dep in depsStruct["load"]:
+                    if dep.requestor != self.id and dep.name in ClassesAll:
+                        if cacheModTime.get(dep.name) != cache.digest(ClassesAll[dep.name].path):
+                            console.debug("Invalidating dep cache for %s, as %s has changed" % (self.id, dep.name))
+                            result = False
+                            break
             else:
                 for dep in depsStruct["load"]:
                     if dep.requestor != self.id: # this was included through a recursive traversal
@@ -159,16 +171,26 @@ class MClassDependencies(object):
 
             return result
 
+        ##
+        # Stamp to cache the deps with, for transitiveDepsAreFresh()
+        def depsStamp(depsStruct):
+            if not cache.byContent():
+                return time.time()
+            stamp = {}
+            for dep in depsStruct["load"]:
+                if dep.requestor != self.id and dep.name in ClassesAll:
+                    stamp[dep.name] = cache.digest(ClassesAll[dep.name].path)
+            return stamp
+
         # -- Main ---------------------------------------------------------
 
         # handles cache and invokes worker function
 
         console = self.context['console']
+        cache   = self.context['cache']
 
-        classVariants = self.classVariants()
-        relevantVariants = self.projectClassVariantsToCurrent(classVariants, variantSet)
         statics_optim = 'statics' in Context.jobconf.get("compile-options/code/optimize",[])
-        cacheId = "deps-%s-%s-%s" % (self.path, util.toString(relevantVariants), int(statics_optim))
+        cacheId = self._depsCacheId(variantSet)
         cached = True
 
         # try compile cache
@@ -195,7 +217,7 @@ class MClassDependencies(object):
             deps = buildShallowDeps(tree)
             deps = buildTransitiveDeps(deps)
             if not tree: # don't cache for a passed-in tree
-                classInfo[cacheId] = (deps, time.time())
+                classInfo[cacheId] = (deps, depsStamp(deps))
                 self._writeClassCache(classInfo)
 
         return deps, cached
@@ -203,6 +225,19 @@ class MClassDependencies(object):
         # end:dependencies()
 
 
+    def _depsCacheId(self, variantSet):
+        relevantVariants = self.projectClassVariantsToCurrent(self.classVariants(), variantSet)
+        statics_optim = 'statics' in Context.jobconf.get("compile-options/code/optimize",[])
+        return "deps-%s-%s-%s" % (self.path, util.toString(relevantVariants), int(statics_optim))
+
+    ##
+    # Whether the dependencies for <variantSet> are in the class cache (they
+    # might still be out of date)
+    def dependenciesCached(self, variantSet):
+        classInfo, _ = self._getClassCache()
+        return self._depsCacheId(variantSet) in classInfo
+
+
     def getCombinedDeps(self, classesAll_, variants, config, stripSelfReferences=True, projectClassNames=True, force=False, tree=None):
 
         # init lists
@@ -582,8 +617,11 @@ class MClassDependencies(object):
     #
     # @out <string> class that defines method
     # @out <tree>   tree node value of methodId in the class map
+    #
+    # @param touched {Set} if given, the ids of the classes whose class maps
+    #   have been inspected are added to it
 
-    def findClassForFeature(self, featureId, variants, classMaps):
+    def findClassForFeature(self, featureId, variants, classMaps, touched=None):
 
         # get the method name
         clazzId = self.id
@@ -615,6 +653,8 @@ class MClassDependencies(object):
                 return None, None
 
         # now try this class
+        if touched is not None:
+            touched.add(self.id)
         if self.id in classMaps:
             classMap = classMaps[self.id]
         else:
@@ -641,7 +681,7 @@ class MClassDependencies(object):
             if featureId == "base":
                 classId = parents[0]  # first entry must be super-class
                 if classId in ClassesAll:
-                    return ClassesAll[classId].findClassForFeature('construct', variants, classMaps)
+                    return ClassesAll[classId].findClassForFeature('construct', variants, classMaps, touched)
                 else:
                     return None, None
         includeVal = classMap.get('include', None)
@@ -672,7 +712,7 @@ class MClassDependencies(object):
             if parClass not in ClassesAll:
                 continue
             parClassObj = ClassesAll[parClass]
-            rclass, keyval = parClassObj.findClassForFeature(featureId, variants, classMaps)
+            rclass, keyval = parClassObj.findClassForFeature(featureId, variants, classMaps, touched)
             if rclass:
                 return rclass, keyval
         return None, None
@@ -736,38 +776,48 @@ class MClassDependencies(object):
     #   - recurse on dependencies of defining class#method, adding them to the
     #     current dependencies
     #
+    # The results are cached persistently, per class#method, as a list of
+    # records (keys, projected variants, deps, classes, stamp): <classes> are
+    # the classes whose code was inspected to compute <deps>, including those
+    # of the recursive deps, and <keys> the environment keys used in these
+    # classes. A record is valid for every variant set that agrees on <keys>,
+    # as long as none of <classes> has changed since <stamp>.
+    #
     # currently only a thin wrapper around its recursive sibling, getTransitiveDepsR
+    #
+    # Dependencies already in <checkSet> (those of the callers) are not
+    # followed again, which breaks cycles; a result that lacks the deps of
+    # such an item is partial, and is not cached.
+    #
+    # @param touched {Set} if given, the ids of the classes inspected for the
+    #   result are added to it
+    # @param pruned {Set} if given, the items of <checkSet> whose deps were
+    #   not followed are added to it
 
-    def getTransitiveDeps(self, depsItem, variants, classMaps, checkSet=None, force=False):
+    def getTransitiveDeps(self, depsItem, variants, classMaps, checkSet=None, force=False, touched=None, pruned=None):
 
         ##
         # find dependencies of a method <methodId> that has been referenced from
         # <classId>. recurse on the immediate dependencies in the method code.
         #
         # @param deps accumulator variable set((c1,m1), (c2,m2),...)
+        # @param touched accumulator of the inspected classes
+        # @param pruned accumulator of the items skipped as deps of a caller
 
-        def getTransitiveDepsR(dependencyItem, variantString, totalDeps):
+        def getTransitiveDepsR(dependencyItem, totalDeps, touched, pruned):
 
             # We don't add the in-param to the global result
             classId  = dependencyItem.name
             methodId = dependencyItem.attribute
             function_pruned = False
 
-            cacheId = "methoddeps-%r-%r-%r" % (classId, methodId, variantString)
-                # The bad thing here is that 'variantString' contains environment setting
-                # that normally have no influence on the dependencies (like
-                # 'qx.Application'). So cached deps are rejected for no reason (ex.
-                # building the demos of Demobrowser). But I cannot easily apply
-                # variant-projection here, as it only proves that the current class is
-                # independent of a specific environement key; but its recursive deps could
-                # well be. Fix: Get the shallow deps of the current method from cache, and then get the
-                # trans. deps of those items. They then could appy the same reasoning.
+            cacheId = "methoddeps-%r-%r" % (classId, methodId)
             if not force:
                 # Check cache
-                cachedDeps, _ = cache.read(cacheId)  # no use to put this into a file, due to transitive dependencies to other files
+                cachedDeps, cachedClasses = readRecord(cacheId)
                 if cachedDeps != None:
                     console.debug("using cached result")
-                    #print "\nusing cached result for", classId, methodId
+                    touched.update(cachedClasses)
                     return cachedDeps
 
             # Need to calculate deps
@@ -782,11 +832,13 @@ class MClassDependencies(object):
             # Check other class
             elif classId != self.id:
                 classObj = ClassesAll[classId]
-                otherdeps = classObj.getTransitiveDeps(dependencyItem, variants, classMaps, totalDeps, force)
+                otherdeps = classObj.getTransitiveDeps(dependencyItem, variants, classMaps, totalDeps, force, touched, pruned)
                 return otherdeps
 
             # Check own hierarchy
-            defClassId, attribNode = self.findClassForFeature(methodId, variants, classMaps)
+            myTouched = set([classId])
+            defClassId, attribNode = self.findClassForFeature(methodId, variants, classMaps, myTouched)
+            touched.update(myTouched)
 
             # lookup error
             if not defClassId or defClassId not in ClassesAll:
@@ -798,12 +850,13 @@ class MClassDependencies(object):
             if dependencyItem.isCall:
                 defDepsItem.isCall = True  # if the dep is an inherited method being called, pursue the parent method as call
             localDeps   = set()
+            myPruned    = set()
 
             # inherited feature
             if defClassId != classId:
                 self.resultAdd(defDepsItem, localDeps)
                 defClass = ClassesAll[defClassId]
-                otherdeps = defClass.getTransitiveDeps(defDepsItem, variants, classMaps, totalDeps, force)
+                otherdeps = defClass.getTransitiveDeps(defDepsItem, variants, classMaps, totalDeps, force, touched, pruned)
                 localDeps.update(otherdeps)
                 return localDeps
 
@@ -833,32 +886,85 @@ class MClassDependencies(object):
 
                     for depsItem in depslist:
                         if depsItem in totalDeps:
+                            myPruned.add(depsItem)
                             continue
                         if depsItem.name in my_ignores:
                             continue
                         if self.resultAdd(depsItem, localDeps):
                             totalDeps = totalDeps.union(localDeps)
                             # Recurse dependencies
-                            downstreamDeps = getTransitiveDepsR(depsItem, variants, totalDeps)
+                            downstreamDeps = getTransitiveDepsR(depsItem, totalDeps, myTouched, myPruned)
                             localDeps.update(downstreamDeps)
+            touched.update(myTouched)
+            # skipped items that are not in the result make it partial
+            myPruned.difference_update(localDeps)
+            pruned.update(myPruned)
 
             # Cache update
             # ---   i cannot cache currently, if the deps of a function are pruned
             #       when the function is passed as a ref, rather than called (s. above
-            #       around 'attribNode.getChild("function",...)')
-            if not function_pruned:
-                cache.write(cacheId, localDeps, memory=True, writeToFile=False)
+            #       around 'attribNode.getChild("function",...)'), nor if the
+            #       result is partial, as it depends on the callers
+            if not function_pruned and not myPruned:
+                writeRecord(cacheId, localDeps, myTouched)
 
             console.outdent()
             return localDeps
 
+        ##
+        # The projection of the current variants onto <keys>
+        def projectVariants(keys):
+            return util.toString(self.projectClassVariantsToCurrent(keys, variants))
+
+        ##
+        # Return (deps, classes) of the first record of <cacheId> that is
+        # valid for the current variants, or (None, None)
+        def readRecord(cacheId):
+            records, _ = cache.read(cacheId, memory=True)
+            for keys, projected, deps, classes, stamp in records or ():
+                if projected == projectVariants(keys) and classesUnchanged(classes, stamp):
+                    return deps, classes
+            return None, None
+
+        def writeRecord(cacheId, deps, classes):
+            keys = set()
+            for classId in classes:
+                keys.update(ClassesAll[classId].classVariants())
+            keys = sorted(keys)
+            if cache.byContent():
+                stamp = dict((x, cache.digest(ClassesAll[x].path)) for x in classes)
+            else:
+                stamp = time.time()
+            projected = projectVariants(keys)
+            records, _ = cache.read(cacheId, memory=True)
+            records = [(keys, projected, deps, tuple(classes), stamp)] + [
+                x for x in records or () if x[:2] != (keys, projected)][:MethodDepsRecords - 1]
+            cache.write(cacheId, records, memory=True)
+
+        ##
+        # Whether none of <classes> has changed since they were stamped with
+        # <stamp> (a time, or a map of content digests, like in dependencies())
+        def classesUnchanged(classes, stamp):
+            for classId in classes:
+                if classId not in ClassesAll:
+                    return False
+                if isinstance(stamp, dict):
+                    if stamp.get(classId) != cache.digest(ClassesAll[classId].path):
+                        return False
+                elif stamp < ClassesAll[classId].m_time():
+                    return False
+            return True
+
         # -- getTransitiveDeps -------------------------------------------------
 
         cache = self.context['cache']
         console = self.context['console']
         checkset = checkSet or set()
-        variantString = util.toString(variants)
-        deps = getTransitiveDepsR(depsItem, variantString, checkset) # checkset is currently not used, leaving it for now
+        if touched is None:
+            touched = set()
+        if pruned is None:
+            pruned = set()
+        deps = getTransitiveDepsR(depsItem, checkset, touched, pruned)
 
         return deps
 
@@ -27,6 +27,7 @@ from generator.resource.AssetHint   import AssetHint
 from generator.resource.CombinedImage    import CombinedImage
 from generator import Context
 from misc import util
+from misc.Trie import Trie
 from misc.securehash import sha_construct
 
 
@@ -101,13 +102,16 @@ class MClassResources(object):
         return result
 
 
+    # (key, index), s. _indexResources()
+    _resourceIndex = (None, None)
+
     ##
-    # Map resources to classes.
-    # Takes a list of Library's and a list of Class'es, and modifies the
-    # classes' .resources member to hold suitable resources from the Libs.
+    # The resources of <libs>, and an index of them (a Trie of the resource
+    # ids, and of the ids of the images embedded in combined images, with
+    # (id, position in resources) values). The index is re-used while the
+    # ids stay the same, e.g. for all variant sets and jobs of a run.
     @staticmethod
-    def mapResourcesToClasses(libs, classes, assetMacros={}):
-        
+    def _indexResources(libs):
         # Resource list
         resources = []
         for libObj in libs:
@@ -115,7 +119,32 @@ class MClassResources(object):
         # remove unwanted files
         exclpatt = re.compile("\.(?:meta|py)$", re.I)
         resources = [res for res in resources if not exclpatt.search(res.id)]
-        
+
+        key = [(res.id, tuple(x.id for x in res.embeds)) if isinstance(res, CombinedImage) else res.id
+               for res in resources]
+        if key == MClassResources._resourceIndex[0]:
+            return resources, MClassResources._resourceIndex[1]
+
+        index = Trie("/")
+        for pos, res in enumerate(resources):
+            index.add(res.id, (res.id, pos))
+            if isinstance(res, CombinedImage):
+                for embed in res.embeds:
+                    index.add(embed.id, (embed.id, pos))
+
+        MClassResources._resourceIndex = (key, index)
+        return resources, index
+
+
+    ##
+    # Map resources to classes.
+    # Takes a list of Library's and a list of Class'es, and modifies the
+    # classes' .resources member to hold suitable resources from the Libs.
+    @staticmethod
+    def mapResourcesToClasses(libs, classes, assetMacros={}):
+
+        resources, index = MClassResources._indexResources(libs)
+
         # Asset pattern list  -- this is basically an optimization, to condense
         # asset patterns
         #assetMacros = self._genobj._job.get('asset-let',{})
@@ -124,19 +153,19 @@ class MClassResources(object):
             assetHints.extend(clazz.getAssets(assetMacros))
             clazz.resources = set() #TODO: they might be filled by previous jobs, with different libs
 
-        # Go through resources and asset patterns
-        for res in resources:
-            for hint in assetHints:
-                # add direct matches
-                if hint.regex.match(res.id):
+        # Go through asset patterns, and the resources under their literal
+        # prefix (direct matches, and matches of embedded images)
+        matches = {}  # {clazz: set(position in resources)}
+        for hint in assetHints:
+            prefixParts = hint.literalPrefix().split("/")[:-1]  # complete path segments
+            for resId, pos in index.values(prefixParts):
+                if hint.regex.match(resId):
                     hint.seen = True
-                    hint.clazz.resources.add(res)
-                # add matches of embedded images
-                if isinstance(res, CombinedImage):
-                    for embed in res.embeds:
-                        if hint.regex.match(embed.id):
-                            hint.seen = True
-                            hint.clazz.resources.add(res)
+                    matches.setdefault(hint.clazz, set()).add(pos)
+
+        # add in resource order, so the first of resources with the same id wins
+        for clazz, positions in matches.iteritems():
+            clazz.resources.update(resources[x] for x in sorted(positions))
 
         # Now that the resource mapping is done, check if we have unfullfilled hints
         for hint in assetHints:
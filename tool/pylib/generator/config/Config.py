@@ -364,9 +364,11 @@ class Config(object):
     # external config are kept in a member of the current config, all their jobs
     # are available in their original form for later perusal (e.g. reference
     # lookup).
-    def resolveIncludes(self, includeTree=graph.digraph()):
+    def resolveIncludes(self, includeTree=None):
 
         console.debug("including %s" % (self._fname or "<unknown>",))
+        if includeTree is None:
+            includeTree = graph.digraph()
         config  = self._data
         jobsmap = self.getJobsMap({})
 
@@ -422,6 +424,16 @@ class Config(object):
                 self._includedConfigs.append(econfig)  # save external config for later reference
 
 
+    ##
+    # Return the paths of the files this config has been read from, including
+    # the ones of included configs
+    def getConfigFiles(self):
+        files = [self._fname] if self._fname else []
+        for econfig in self._includedConfigs:
+            files.extend(econfig.getConfigFiles())
+        return files
+
+
     ##
     # Jobs of external config are spliced into current job list
     def _integrateExternalConfig(self, extConfig, namespace, impJobsList=None, 
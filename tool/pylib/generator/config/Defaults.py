@@ -57,20 +57,25 @@ def getGenOpts():
 
 class Defaults(object):
 
-    let = {
-        ##
-        # GENERATOR_OPTS
-        # You can use the generator options string returned here for the invocation
-        # of child generator (or other, of course) processes. Putting this macro
-        # first you can override options subsequently, like
-        # "generate.py ${GENERATOR_OPTS} -c otherconfig.json -m FOO:baz"
-        # will insert all options passed to this generator invocation, but
-        # overriding the config file and the FOO macro.
-        u"GENERATOR_OPTS"  : getGenOpts(),
-        u"HOME"            : getUserHome("."),
-        u"PYTHON_CMD"      : '"' + sys.executable + '"',
-        u"TMPDIR"          : tempfile.gettempdir(),
-        u"QOOXDOO_VERSION" : getQooxdooVersion(),
-        u"QOOXDOO_REVISION": getQooxdooRevision(),
-        u"USERNAME"        : os.getenv("USERNAME"),
-    }
+    ##
+    # The default let macros. They are computed for each run, as the command
+    # line and the environment can differ between the runs in daemon mode.
+    @staticmethod
+    def getLet():
+        return {
+            ##
+            # GENERATOR_OPTS
+            # You can use the generator options string returned here for the invocation
+            # of child generator (or other, of course) processes. Putting this macro
+            # first you can override options subsequently, like
+            # "generate.py ${GENERATOR_OPTS} -c otherconfig.json -m FOO:baz"
+            # will insert all options passed to this generator invocation, but
+            # overriding the config file and the FOO macro.
+            u"GENERATOR_OPTS"  : getGenOpts(),
+            u"HOME"            : getUserHome("."),
+            u"PYTHON_CMD"      : '"' + sys.executable + '"',
+            u"TMPDIR"          : tempfile.gettempdir(),
+            u"QOOXDOO_VERSION" : getQooxdooVersion(),
+            u"QOOXDOO_REVISION": getQooxdooRevision(),
+            u"USERNAME"        : os.getenv("USERNAME"),
+        }
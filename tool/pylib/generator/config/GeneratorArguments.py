@@ -49,6 +49,9 @@ Arguments:
         self.add_option("-m", "--macro", dest="letmacros", metavar="KEY:VAL", action="map", type="string", default={}, help="define/overwrite a global 'let' macro KEY with value VAL")
         self.add_option("-I", "--no-progress-indicator", dest="show_progress_indicator", action="store_false", default=True, help="suppress animated progress indication")
 
+        # Daemon mode
+        self.add_option("--daemon", action="store_true", dest="daemon", default=False, help="serve the runs of generator-client.py, keeping the generator's data in memory between runs")
+
         # Grunt compat
         self.add_option("--list-jobs", action="store_true", dest="listjobs", default=False, help=optparse.SUPPRESS_HELP)
 
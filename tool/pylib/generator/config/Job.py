@@ -291,7 +291,7 @@ class Job(object):
         from generator.config.Defaults import Defaults  # late import, so Defaults is not evaluated when importing Job
 
         # add default let macros
-        defaultLet = Defaults.let
+        defaultLet = Defaults.getLet()
         if defaultLet:
             mylet = self.getFeature(Key.LET_KEY, {})
             mylet = self.mergeValues(defaultLet, mylet) # existing values in mylet will take precedence
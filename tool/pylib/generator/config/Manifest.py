@@ -34,9 +34,7 @@ class Manifest(object):
     def __init__(self, path):
         self.path = path
         try:
-            mf = codecs.open(path, "r", "utf-8")
-            manifest = json.loads(mf.read())
-            mf.close()
+            manifest = json.load(path)
         except Exception, e:
             msg = "Reading of manifest file failed: '%s'" % path + (
                 "\n%s" % e.args[0] if e.args else "")
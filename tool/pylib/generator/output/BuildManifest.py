@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# BuildManifest -- record of the last run of a compile job, for incremental
+#                  rebuilds ("compile-options/incremental")
+#
+# The manifest of a job (one per variant set) holds
+#   - a fingerprint of the job config
+#   - the stamps (mtime or content digest) of all classes of the libraries
+#   - the class list, and fingerprints of the dependencies of its classes
+#   - the parts and packages (as class ids)
+#   - the hashes of the written files
+# and, in a separate cache entry, the code of the compiled packages.
+#
+# On the next run, the class list and the packages are re-used if the
+# changed classes still have the same dependencies, only the packages with
+# changed classes are compiled again, and files are only written if their
+# content has changed.
+##
+
+import os
+
+from misc                       import json, securehash as sha
+from generator.output.Part      import Part
+from generator.output.Package   import Package
+
+VERSION = 1
+
+
+def getHash(data):
+    if isinstance(data, unicode):
+        data = data.encode("utf-8")
+    return sha.getHash(data)
+
+
+class BuildManifest(object):
+
+    def __init__(self, cache, console, job, script):
+        self._cache   = cache
+        self._console = console
+        variantKey = json.dumps(script.variants, sort_keys=True)
+        self._cacheId = "manifest-%s" % getHash("%s|%s|%s" % (job.name, script.buildType, variantKey))
+        self._old, _ = cache.read(self._cacheId)
+        if self._old and self._old.get("version") != VERSION:
+            self._old = None
+        self._new = {
+            "version"  : VERSION,
+            "config"   : getHash(json.dumps([job.getData(), variantKey], sort_keys=True, default=repr)),
+            "stamps"   : {},  # {classId: stamp}
+            "classes"  : [],  # class list
+            "deps"     : {},  # {classId: deps fingerprint}, for the class list
+            "parts"    : None,
+            "packages" : {},  # {packageId: [classId]}
+            "files"    : {},  # {path: (content hash, size, mtime)}
+        }
+        self.changed = None   # ids of changed classes, if comparable to the last run
+        self.reason  = None   # why everything is built, if so
+        self.rebuilt = {}     # {packageId: reason}
+        self._oldOutputs = None  # {output key: code}, read on demand
+        self._newOutputs = {}
+
+    ##
+    # Compare the classes of the libraries with those of the last run. Must
+    # be called before the other methods.
+    def checkClasses(self, classesObj):
+        stamps = self._new["stamps"]
+        byContent = self._cache.byContent()
+        for classId, clazz in classesObj.iteritems():
+            if byContent:
+                stamps[classId] = self._cache.digest(clazz.path)
+            else:
+                st = os.stat(clazz.path)
+                stamps[classId] = (st.st_mtime, st.st_size)
+
+        old = self._old
+        if old is None:
+            self.reason = "no build manifest"
+        elif old["config"] != self._new["config"]:
+            self.reason = "configuration changed"
+        elif set(old["stamps"]) != set(stamps):
+            self.reason = "classes added or removed"
+        else:
+            self.changed = set(x for x in stamps if stamps[x] != old["stamps"][x])
+
+    ##
+    # Return the class list of the last run if it is still valid, None otherwise
+    def reusableClassList(self, classesObj, variants, jobconf):
+        if self.changed is None:
+            self._console.info("Computing class list (%s)" % self.reason)
+            return None
+        old = self._old
+        for classId in sorted(self.changed.intersection(old["deps"])):
+            if self._depsFingerprint(classesObj[classId], classesObj, variants, jobconf) != old["deps"][classId]:
+                self._console.info("Computing class list (dependencies of %s changed)" % classId)
+                return None
+        self._new["classes"] = old["classes"]
+        self._new["deps"]    = old["deps"]
+        self._console.info("Re-using class list (%d classes changed)" % len(self.changed))
+        return old["classes"][:]
+
+    def recordClassList(self, classList, classesObj, variants, jobconf):
+        self._new["classes"] = classList[:]
+        deps = self._new["deps"]
+        for classId in classList:
+            deps[classId] = self._depsFingerprint(classesObj[classId], classesObj, variants, jobconf)
+
+    def _depsFingerprint(self, clazz, classesObj, variants, jobconf):
+        deps, _ = clazz.getCombinedDeps(classesObj, variants, jobconf)
+        return getHash(repr([[(x.name, x.attribute, x.isLoadDep, x.needsRecursion) for x in deps[key]]
+                             for key in ("load", "run", "ignore")]))
+
+    ##
+    # Restore script.boot, .parts and .packages from the last run, if the
+    # class list has been re-used. Returns whether that was possible.
+    def restoreParts(self, script):
+        old = self._old
+        if not old or not old["parts"] or self._new["classes"] is not old["classes"]:
+            return False
+        boot, partsData, packagesData = old["parts"]
+        packages = {}
+        for packageId, part_mask, classIds, _ in packagesData:
+            package = packages[packageId] = Package(packageId)
+            package.part_mask = part_mask
+            package.classes = [script.classesAll[x] for x in classIds]
+        for packageId, _, _, depIds in packagesData:
+            packages[packageId].packageDeps = set(packages[x] for x in depIds)
+        script.boot = boot
+        script.packages = [packages[x[0]] for x in packagesData]
+        script.parts = {}
+        for name, bit_mask, initial_deps, deps, packageIds, no_merge, is_ignored in partsData:
+            part = script.parts[name] = Part(name)
+            part.bit_mask = bit_mask
+            part.initial_deps = initial_deps
+            part.deps = deps
+            part.packages = [packages[x] for x in packageIds]
+            part.no_merge_private_package = no_merge
+            part.is_ignored = is_ignored
+        self._new["parts"] = old["parts"]
+        self._console.info("Re-using parts and packages")
+        return True
+
+    def recordParts(self, script):
+        parts = [(p.name, p.bit_mask, p.initial_deps, p.deps, [x.id for x in p.packages],
+                  p.no_merge_private_package, p.is_ignored) for p in script.parts.values()]
+        packages = [(p.id, p.part_mask, [x.id for x in p.classes], [x.id for x in p.packageDeps])
+                    for p in script.packages]
+        self._new["parts"] = (script.boot, parts, packages)
+
+    ##
+    # Key of the output of compiling <classes> of a package, with <prefix>
+    # and <wrap> around them
+    def outputKey(self, classes, prefix, wrap):
+        stamps = self._new["stamps"]
+        return getHash(repr((self._new["config"], getHash(prefix), wrap,
+                             [(x.id, stamps.get(x.id)) for x in classes])))
+
+    ##
+    # Return the code of a compiled package output of the last run, or None
+    def readOutput(self, key):
+        if self._oldOutputs is None:
+            self._oldOutputs = {}
+            if self._old:
+                self._oldOutputs, _ = self._cache.read(self._cacheId + "-outputs")
+                self._oldOutputs = self._oldOutputs or {}
+        code = self._oldOutputs.get(key)
+        if code is not None:
+            self._newOutputs[key] = code
+        return code
+
+    def writeOutput(self, key, code):
+        self._newOutputs[key] = code
+
+    ##
+    # Record that <package> is compiled again, and why
+    def packageRebuilt(self, package):
+        if package.id in self.rebuilt:
+            return
+        classIds = [x.id for x in package.classes]
+        oldClassIds = self._old["packages"].get(package.id) if self._old else None
+        if self.reason:
+            reason = self.reason
+        elif oldClassIds is None:
+            reason = "new package"
+        elif oldClassIds != classIds:
+            reason = "package classes changed"
+        elif self.changed.intersection(classIds):
+            reason = "changed classes: %s" % ", ".join(sorted(self.changed.intersection(classIds)))
+        else:
+            reason = "package data changed"
+        self.rebuilt[package.id] = reason
+
+    def recordPackages(self, packages):
+        for package in packages:
+            self._new["packages"][package.id] = [x.id for x in package.classes]
+
+    ##
+    # Whether file <path> still is as written in the last run, with <content>
+    def fileUnchanged(self, path, content):
+        hash_ = self._new["files"][path] = getHash(content)
+        if not self._old or path not in self._old["files"]:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return self._old["files"][path] == (hash_, st.st_size, st.st_mtime)
+
+    def logRebuilds(self, script):
+        for name in sorted(script.parts):
+            if script.parts[name].is_ignored:
+                continue
+            reasons = ["#%s (%s)" % (x.id, self.rebuilt[x.id])
+                       for x in script.parts[name].packages if x.id in self.rebuilt]
+            if reasons:
+                self._console.info("Part '%s' rebuilt: %s" % (name, "; ".join(reasons)))
+            else:
+                self._console.info("Part '%s' is up to date" % name)
+
+    def save(self):
+        files = self._new["files"]
+        for path, hash_ in files.items():
+            try:
+                st = os.stat(path)
+            except OSError:  # e.g. inlined boot package
+                del files[path]
+            else:
+                files[path] = (hash_, st.st_size, st.st_mtime)
+        if self._oldOutputs is None or set(self._oldOutputs) != set(self._newOutputs):
+            self._cache.write(self._cacheId + "-outputs", self._newOutputs)
+        self._cache.write(self._cacheId, self._new)
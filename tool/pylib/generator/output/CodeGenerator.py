@@ -30,13 +30,14 @@ from generator.output.Package   import Package
 from generator.code.Class       import Class, ClassMatchList, CompileOptions
 from generator.code.ClassList   import ClassList
 from generator.output.Script      import Script
+from generator.runtime          import ProcessPool, SharedMap
 from generator.action           import Locale
 from generator.action           import CodeMaintenance as codeMaintenance
 import generator.resource.Library # just need the .Library type
 from ecmascript.frontend        import tokenizer, treegenerator, treegenerator_3
 from ecmascript.backend         import formatter_3
 from ecmascript.backend.Packer  import Packer
-from ecmascript.transform.optimizer    import privateoptimizer
+from ecmascript.transform.optimizer    import privateoptimizer, pipeline as optimizerPipeline
 #from ecmascript.transform.optimizer    import globalsoptimizer
 from misc                       import filetool, json, Path, securehash as sha, util
 from misc.util                  import pipeline, bind
@@ -57,6 +58,7 @@ class CodeGenerator(object):
         self._settings     = settings
         self._locale     = locale
         self._classes = classes
+        self._packageCodes = {}  # {key: code} of compiled packages, shared between variant sets
 
         console = console_
         cache   = cache_
@@ -633,7 +635,6 @@ class CodeGenerator(object):
 
 
         def compileClasses(classList, compConf, log_progress=lambda:None):
-            result = []
             # warn qx.allowUrlSettings - variants optim. conflict (bug#6141)
             if "variants" in compConf.optimize:
                 warn_if_qxAllowUrlSettings(self._job, compConf)
@@ -645,20 +646,95 @@ class CodeGenerator(object):
                 if "variants" in tmp_optimize:
                     tmp_optimize.remove("variants") # has been done in optimizeDeadCode
                 # do the rest
-                for clazz in classList:
-                    tree = clazz.optimize(clazz._tmp_tree, tmp_optimize)
-                    code = clazz.serializeTree(tree, tmp_optimize, compConf.format)
-                    result.append(code)
-                    log_progress()
-                result = u''.join(result)
+                def compileClass(clazz, privatesMap=None):
+                    tree = clazz.optimize(clazz._tmp_tree, tmp_optimize, privatesMap=privatesMap)
+                    return clazz.serializeTree(tree, tmp_optimize, compConf.format)
+
+                def cachedCode(clazz):
+                    return None  # statics optimized code is never cached
+
+                def collectPrivates(clazz):
+                    return clazz.collectPrivates(clazz._tmp_tree, tmp_optimize)
 
             # no 'statics' optimization
             else:
+                def compileClass(clazz, privatesMap=None):
+                    return clazz.getCode(compConf, treegen=treegenerator, featuremap=script._featureMap,
+                        privatesMap=privatesMap) # choose parser frontend
+
+                def cachedCode(clazz):
+                    if not compConf.optimize:
+                        return None
+                    code, _ = clazz.context['cache'].read(clazz.compiledCacheId(compConf), clazz.path)
+                    return code
+
+                def collectPrivates(clazz):
+                    return clazz.collectPrivates(None, compConf.optimize, compConf.variantset)
+
+            jobs = ProcessPool.numJobs(self._job.get("compile-options/code/jobs", 0))
+            if jobs < 2 or len(classList) < 2 or not ProcessPool.canFork():
+                result = []
                 for clazz in classList:
-                    code = clazz.getCode(compConf, treegen=treegenerator, featuremap=script._featureMap) # choose parser frontend
-                    result.append(code)
+                    result.append(compileClass(clazz))
                     log_progress()
-                result =  u''.join(result)
+            else:
+                result = compileClassesParallel(classList, compConf, jobs, compileClass,
+                    cachedCode, collectPrivates, log_progress)
+
+            return u''.join(result)
+
+
+        ##
+        # Compile <classList> with a pool of <jobs> worker processes, yielding
+        # the same code (and privates map) as compiling them one by one.
+        #
+        # With "privates" optimization the replacement names depend on the order
+        # in which classes enter the global privates map. So the private names of
+        # all classes that are not in the compile cache are collected first (in
+        # parallel), then registered with the global map in class order, and only
+        # then the classes are compiled (in parallel again), against this
+        # complete map.
+        def compileClassesParallel(classList, compConf, jobs, compileClass, cachedCode,
+                                   collectPrivates, log_progress):
+
+            def collectWorker(pos):
+                clazz = classList[pos]
+                code = cachedCode(clazz)
+                if code is not None:
+                    return code, None
+                return None, collectPrivates(clazz)
+
+            def compileWorker(pos, privatesMap):
+                stats, optimizerPipeline.stats = optimizerPipeline.stats, {}  # the stats of this class
+                try:
+                    code = compileClass(classList[pos], privatesMap)
+                finally:
+                    classStats, optimizerPipeline.stats = optimizerPipeline.stats, stats
+                return code, len(privatesMap) if privatesMap is not None else 0, classStats
+
+            result = [None] * len(classList)
+            todo   = range(len(classList))
+            privatesMap = None
+
+            if "privates" in compConf.optimize:
+                privatesMap = SharedMap.get(self._cache, privateoptimizer.privatesCacheId, counter=True).map()
+                todo = []
+                collected = ProcessPool.forkMap(collectWorker, range(len(classList)), jobs)
+                for pos, (code, names) in enumerate(collected):
+                    if code is not None:
+                        result[pos] = code
+                        log_progress()
+                    else:
+                        classList[pos].registerPrivates(names, privatesMap)
+                        todo.append(pos)
+
+            compiled = ProcessPool.forkMap(compileWorker, todo, jobs, (privatesMap,), log_progress)
+            for pos, (code, numPrivates, classStats) in zip(todo, compiled):
+                optimizerPipeline.mergeStats(classStats)
+                if privatesMap is not None and numPrivates != len(privatesMap):
+                    raise RuntimeError("Privates of class '%s' changed during parallel compile; "
+                        "try again with 'compile-options/code/jobs':1" % classList[pos].id)
+                result[pos] = code
 
             return result
 
@@ -677,11 +753,28 @@ class CodeGenerator(object):
         def compileAndWritePackage(package, compConf, allClassVariants, per_file_prefix):
 
             def compileAndAdd(compiled_classes, package_uris, prelude='', wrap=''):
-                compiled = compileClasses(compiled_classes, compOptions, log_progress)
-                if wrap:
-                    compiled = wrap % compiled
-                if prelude:
-                    compiled = prelude + compiled
+                manifest = script.manifest
+                sharedKey = self._packageCodeKey(compiled_classes, prelude, wrap, compOptions)
+                compiled = self._packageCodes.get(sharedKey)
+                if compiled is not None:
+                    for _ in compiled_classes:
+                        log_progress()
+                if manifest:
+                    key = manifest.outputKey(compiled_classes, prelude, wrap)
+                    if compiled is None:
+                        compiled = manifest.readOutput(key)
+                if compiled is None:
+                    if manifest:
+                        manifest.packageRebuilt(package)
+                    compiled = compileClasses(compiled_classes, compOptions, log_progress)
+                    if wrap:
+                        compiled = wrap % compiled
+                    if prelude:
+                        compiled = prelude + compiled
+                if manifest:
+                    manifest.writeOutput(key, compiled)
+                if sharedKey:
+                    self._packageCodes[sharedKey] = compiled
                 filename = self._computeFilePath(script, sha.getHash(compiled)[:12])
                 self.writePackage(compiled, filename, script)
                 filename = OsPath(os.path.basename(filename))
@@ -823,6 +916,10 @@ class CodeGenerator(object):
         self._console.dotclear()
 
         writeLoader(script, compConf, packages, globalCodes, per_file_prefix)
+        if script.manifest:
+            script.manifest.recordPackages(packages)
+            script.manifest.logRebuilds(script)
+            script.manifest.save()
         self._console.outdent()
 
         return  # runCompiled()
@@ -1231,8 +1328,10 @@ class CodeGenerator(object):
     # sizes, and being part of a combined image.
     @staticmethod
     def packagesResourceInfo(script):
-        _ = Class.mapResourcesToClasses (script.libraries, script.classesObj,
-                                         script.jobconfig.get("asset-let", {}))
+        if not script.shared.get("resources-mapped"):
+            _ = Class.mapResourcesToClasses (script.libraries, script.classesObj,
+                                             script.jobconfig.get("asset-let", {}))
+            script.shared["resources-mapped"] = True
 
         for package in script.packages:
             package_resources = []
@@ -1244,6 +1343,22 @@ class CodeGenerator(object):
         return script
 
 
+    ##
+    # Key of the code of a package of <classes>, with <prelude> and <wrap>
+    # around them, that is the same for all variant sets which agree on the
+    # environment keys used in these classes. None if the code can't be
+    # shared ("statics" optimization depends on the whole class list).
+    def _packageCodeKey(self, classes, prelude, wrap, compOptions):
+        if "statics" in compOptions.optimize:
+            return None
+        variantKeys = set()
+        for clazz in classes:
+            variantKeys.update(clazz.classVariants())
+        relevantVariants = Class.projectClassVariantsToCurrent(variantKeys, compOptions.variantset)
+        return (tuple(x.id for x in classes), util.toString(relevantVariants),
+                tuple(compOptions.optimize), compOptions.format, wrap, prelude)
+
+
     def writePackages(self, packages, script):
 
         for package in packages:
@@ -1255,6 +1370,9 @@ class CodeGenerator(object):
 
 
     def writePackage(self, content, filePath, script, isLoader=0):
+        if script.manifest and script.manifest.fileUnchanged(filePath, content):
+            console.debug("Script file is unchanged: %s" % filePath)
+            return
         console.debug("Writing script file %s" % filePath)
         if script.scriptCompress and not isLoader:
             filetool.gzip(filePath, content)
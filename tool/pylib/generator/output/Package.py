@@ -33,7 +33,7 @@
 
 from generator import Context
 from misc import securehash as sha
-from misc import json, util
+from misc import json, util, toposort
 from misc.NameSpace import NameSpace
 
 console = None
@@ -167,9 +167,23 @@ qx.Part.$$notifyLoad("%s", function() {
         return sorted(packages, cmp=clazz.compareByPartCount, reverse=True)
 
 
+    ##
+    # sort packages so that each follows the packages it depends on, and
+    # otherwise by part_count (descending); this is the order
+    # compareFirstDeps() aims at, as a topological sort
+    #
     @classmethod
     def sort(clazz, packages=[]):
-        return sorted(packages, cmp=clazz.compareFirstDeps, reverse=True)
+        packages = clazz.simpleSort(packages)
+        position = dict((x, i) for i, x in enumerate(packages))
+
+        def packageDeps(package):
+            return sorted(package.packageDeps, key=position.get)
+
+        def onCycle(chain):
+            console.debug("Circular dependencies between packages: %s" % " - ".join("#%d" % x.id for x in chain))
+
+        return toposort.DepsGraph(packages, packageDeps).sort(onCycle)
 
 
     ##
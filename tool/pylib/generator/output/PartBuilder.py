@@ -27,8 +27,8 @@
 # - PartBuilder.getPackages()
 ##
 
+from misc                    import util
 from misc.Collections        import OrderedDict
-from misc.Collections        import DefaultOrderedDict
 from generator.output.Part     import Part
 from generator.output.Package  import Package
 from generator.code.Class    import CompileOptions
@@ -48,6 +48,7 @@ class PartBuilder(object):
         # Get config settings
         jobConfig = jobContext["jobconf"]
         self._jobconf = jobConfig
+        self._classSizes = {}  # {classId: compiled size}, for the variant set of script
         minPackageSize = jobConfig.get("packages/sizes/min-package", 0)
         minPackageSizeForUnshared = jobConfig.get("packages/sizes/min-package-unshared", None)
         partsCfg = jobConfig.get("packages/parts", {})
@@ -148,10 +149,21 @@ class PartBuilder(object):
             else:
                 self._console.warn("! "+msg)
 
+        ##
+        # the (non-ignored) load deps of a class, computed once for all parts
+        def getLoadDeps(clazz):
+            if clazz.id not in loadDepsMap:
+                classDeps, _ = clazz.getCombinedDeps(script.classesAll, script.variants, script.jobconfig)
+                loadDeps = set(x.name for x in classDeps['load'])
+                ignoreDeps = set(x.name for x in classDeps['ignore'])
+                loadDepsMap[clazz.id] = loadDeps.difference(ignoreDeps)
+            return loadDepsMap[clazz.id]
+
         self._console.info("Verifying parts  ", feed=False)
         self._console.indent()
         bomb_on_error = self._jobconf.get("packages/verifier-bombs-on-error", True)
         allpartsclasses = []
+        loadDepsMap = {}  # {classId: set(classId)}
 
         # 5) Check consistency between package.part_mask and part.packages
         self._console.debug("Verifying packages-to-parts relations...")
@@ -174,14 +186,16 @@ class PartBuilder(object):
             # get set of current classes in this part
             classList = []
             classPackage = []
+            classIndex = {}  # {classId: first index in classList}
             for packageIdx, package in enumerate(part.packages): # TODO: not sure this is sorted
                 for pos,classId in enumerate(x.id for x in package.classes):
+                    classIndex.setdefault(classId, len(classList))
                     classList.append(classId)
                     classPackage.append((package.id,pos))
             allpartsclasses.extend(classList)
             # 1) Check the initial part defining classes are included (trivial sanity)
             for classId in part.initial_deps:
-                if classId not in classList:
+                if classId not in classIndex:
                     handleError("Defining class not included in part: '%s'" % (classId,))
 
             # 2) Check individual class deps are fullfilled in part
@@ -191,16 +205,14 @@ class PartBuilder(object):
             for packageIdx, package in enumerate(part.packages):
                 for clazz in package.classes:
                     classIdx   += 1
-                    classDeps, _ = clazz.getCombinedDeps(script.classesAll, script.variants, script.jobconfig)
-                    loadDeps = set(x.name for x in classDeps['load'])
-                    ignoreDeps = set(x.name for x in classDeps['ignore'])
+                    loadDeps = getLoadDeps(clazz)
                     # we cannot enforce runDeps here, as e.g. the 'boot'
                     # part necessarily lacks classes from subsequent parts
                     # (that's the whole point of parts)
-                    for depsId in loadDeps.difference(ignoreDeps):
+                    for depsId in loadDeps:
                         try:
-                            depsIdx = classList.index(depsId)
-                        except ValueError:
+                            depsIdx = classIndex[depsId]
+                        except KeyError:
                             handleError("Unfullfilled dependency of class '%s'[%d,%d]: '%s'" %
                                (clazz.id, package.id, classIdx, depsId))
                             continue
@@ -256,7 +268,8 @@ class PartBuilder(object):
     def _getPartDeps(self, script, smartExclude):
         parts = script.parts
         variants = script.variants
-        globalClassList = [x.id for x in script.classesObj]
+        globalClassList = set(x.id for x in script.classesObj)
+        scriptClasses = set(script.classes)
 
         self._console.debug("")
         self._console.info("Assembling parts")
@@ -291,7 +304,7 @@ class PartBuilder(object):
             # Remove all unknown classes  -- TODO: Can this ever happen here?!
             for classId in partClasses[:]:  # need to work on a copy because of changes in the loop
                 #if not classId in globalClassList:
-                if not classId in script.classes: # check against application class list
+                if not classId in scriptClasses: # check against application class list
                     self._console.warn("Removing unknown class dependency '%s' from config of part #%s" % (classId, part.name))
                     partClasses.remove(classId)
 
@@ -311,15 +324,20 @@ class PartBuilder(object):
         # Collect classes from parts, recording which class is used in which part
         # @returns {Map} { classId : parts_bit_mask }
         def getClassesFromParts(partObjs):
-            allClasses = DefaultOrderedDict(lambda: 0)
+            classMasks = {}
+            classIds = []  # in the order of first use
             for part in partObjs:
                 for classId in part.deps:
-                    allClasses[classId] |= part.bit_mask  # a class used by multiple parts gets multiple bits
-            return allClasses
+                    if classId in classMasks:
+                        classMasks[classId] |= part.bit_mask  # a class used by multiple parts gets multiple bits
+                    else:
+                        classMasks[classId] = part.bit_mask
+                        classIds.append(classId)
+            return OrderedDict((x, classMasks[x]) for x in classIds)
 
         ##
         # Create packages from classes
-        # @returns {Array} [ Package ]
+        # @returns {Array} [ Package ], by package id
         def getPackagesFromClasses(allClasses):
             packages = {}
             for classId in allClasses:
@@ -331,7 +349,7 @@ class PartBuilder(object):
                 # store classId with this package
                 #packages[pkgId].classes.append(classId)
                 packages[pkgId].classes.append(classesObj[classId])
-            return packages.values()
+            return [packages[x] for x in sorted(packages)]
 
         # ---------------------------------------------------------------
 
@@ -353,24 +371,28 @@ class PartBuilder(object):
                     part.packages.append(package)
 
         # Register dependencies between packages
+        classPackages = {}  # {classId: Package}
         for package in packages:
-            # get all direct (load)deps of this package
-            allDeps = set(())
             for clazz in package.classes:
-                classDeps, _ = clazz.getCombinedDeps(script.classesAll, script.variants, script.jobconfig)
-                loadDeps = set(x.name for x in classDeps['load'])
-                allDeps.update(loadDeps)
-
-            # record the other packages in which these classes are contained
-            for classId in allDeps:
-                for otherpackage in packages:
-                    if otherpackage != package and classId in (x.id for x in otherpackage.classes):
+                classPackages[clazz.id] = package
+        # - the load deps come from the dependency loader, which computed them for
+        #   the part class lists already; they are in class id order, whether
+        #   they were computed or read from the cache
+        for package in packages:
+            # record the other packages containing direct (load)deps of this package
+            for clazz in package.classes:
+                for classId in self._depLoader.getLoadDeps(clazz.id, script.variants):
+                    otherpackage = classPackages.get(classId)
+                    if otherpackage is not None and otherpackage != package:
                         package.packageDeps.add(otherpackage)
 
         self._console.outdent()
         return packages
 
 
+    ##
+    # The compiled size of the classes of <package>; the class sizes are
+    # memoized, as packages are sized again after each round of merges
     def _computePackageSize(self, package, variants, script):
         packageSize = 0
         compOptions = CompileOptions()
@@ -380,7 +402,9 @@ class PartBuilder(object):
 
         self._console.indent()
         for clazz in package.classes:
-            packageSize += clazz.getCompiledSize(compOptions, featuremap=script._featureMap)
+            if clazz.id not in self._classSizes:
+                self._classSizes[clazz.id] = clazz.getCompiledSize(compOptions, featuremap=script._featureMap)
+            packageSize += self._classSizes[clazz.id]
         self._console.outdent()
 
         return packageSize
@@ -550,11 +574,17 @@ class PartBuilder(object):
 
             return collapseGroups
 
+        ##
+        # package.part_mask has the bits of the parts having the package in
+        # their .packages (s. _mergePackage())
+        def groupMask(collapse_group):
+            return reduce(lambda mask, part: mask | part.bit_mask, collapse_group, 0)
+
         def isUnique(package, collapse_group):
-            return sum([int(package in part.packages) for part in collapse_group]) == 1
+            return util.countBitsOn(package.part_mask & groupMask(collapse_group)) == 1
 
         def isCommon(package, collapse_group):
-            return sum([int(package in part.packages) for part in collapse_group]) == len(collapse_group)
+            return package.part_mask & groupMask(collapse_group) == groupMask(collapse_group)
 
         def getUniquePackages(part, collapse_group):
             uniques = {}
@@ -639,7 +669,7 @@ class PartBuilder(object):
 
         def updatePartDependencies(part, packageDeps):
             for package in packageDeps:
-                if package not in part.packages:
+                if not package.part_mask & part.bit_mask:  # not in part.packages
                     # add package
                     part.packages.append(package)
                     # update package's part bit mask
@@ -695,11 +725,11 @@ class PartBuilder(object):
         # using toPackage
         for part in script.parts.values():
             # remove the merged package
-            if fromPackage in part.packages:
+            if fromPackage.part_mask & part.bit_mask:
                 # we can simply remove the package, as we know the target package is also there
                 part.packages.remove(fromPackage)
             # check additional dependencies for all parts
-            if toPackage in part.packages:
+            if toPackage.part_mask & part.bit_mask:
                 # this could be a part method
                 # if the toPackage is in part, we might need to add additional packages that toPackage now depends on
                 updatePartDependencies(part, fromPackage.packageDeps)
@@ -742,34 +772,6 @@ class PartBuilder(object):
         return script
 
 
-    ##
-    # <currently not used>
-
-    def _sortPackagesTopological(self, packages): # packages : [Package]
-
-        import graph
-
-        # create graph object
-        gr = graph.digraph()
-
-        # add classes as nodes
-        gr.add_nodes(packages)
-
-        # for each load dependency add a directed edge
-        for package in packages:
-            for dep in package.packageDeps:
-                gr.add_edge(package, dep)
-
-        # cycle check?
-        cycle_nodes = gr.find_cycle()
-        if cycle_nodes:
-            raise RuntimeError("Detected circular dependencies between packages: %r" % cycle_nodes)
-
-        packageList = gr.topological_sorting()
-
-        return packageList
-
-
     def _printPartStats(self, script):
         packages = dict([(x.id,x) for x in script.packages])
         parts = script.parts
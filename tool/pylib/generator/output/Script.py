@@ -52,6 +52,8 @@ class Script(object):
         self.libraries  = []   # involved libraries [generator.code.Library, ...]
         self.namespace  = u""  # the main name space (config macro "APPLICATION")
         self.excludes   = []   # fully expanded list of classes to exclude from the build
+        self.manifest   = None # BuildManifest of an incremental compile run
+        self.shared     = {}   # state shared with the scripts of other variant sets with the same class list
 
         # adding these methods on instance level, so the counters are fresh
         self.getPartBitMask   = util.powersOfTwoSequence().next  # generator for part bitmasks
@@ -18,6 +18,9 @@
 #
 ################################################################################
 
+import re
+
+_metaChars = re.compile(r'[.^$*+?{}\[\]\\|()]')
 
 class AssetHint(object):
     __slots__ = ("source", "expanded", "regex", "clazz", "seen")
@@ -31,3 +34,18 @@ class AssetHint(object):
 
     def __eq__ (self, other):
         return self.expanded == other.expanded
+
+    ##
+    # The leading part of .expanded that every resource id matched by .regex
+    # starts with
+    def literalPrefix(self):
+        expr = self.expanded
+        if "|" in expr or "(?" in expr:  # alternatives, or flags for the whole regex
+            return u""
+        mo = _metaChars.search(expr)
+        if not mo:
+            return expr
+        prefix = expr[:mo.start()]
+        if mo.group() in "*+?{":  # the last char is optional or repeated
+            prefix = prefix[:-1]
+        return prefix
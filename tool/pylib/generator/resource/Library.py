@@ -22,6 +22,7 @@
 import os, re, sys, unicodedata as unidata
 
 from misc                         import filetool, Path, json
+from misc.dirsnapshot             import DirSnapshot
 from ecmascript.frontend          import lang, treeutil
 from generator.code.Class         import Class
 from generator.code.qcEnvClass    import qcEnvClass
@@ -30,6 +31,7 @@ from generator.resource.Image     import Image
 from generator.resource.CombinedImage    import CombinedImage
 from generator.resource.FontMap   import FontMap
 from generator.config.Manifest    import Manifest
+from generator.runtime           import ProcessPool
 from generator                    import Context as context
 
 
@@ -57,6 +59,7 @@ class Library(object):
         self.assets["resources"] = {}
 
         self.__youngest = (None, None) # to memoize youngest file in lib
+        self._snapshots = None  # {category: DirSnapshot}, persisted separately
         self._dependencies = None  # for dependencies.json
 
 
@@ -114,6 +117,7 @@ class Library(object):
         # problems on unpickling
         del d['_console']
         d['_dependencies'] = None  # no need to pickle large Json, better restored with queries
+        d['_snapshots'] = None
         return d
 
 
@@ -151,11 +155,12 @@ class Library(object):
                         mtime = os.stat(pardir).st_mtime
                         youngFiles[mtime] = pardir
             else:
-                catPath = os.path.join(self.path, catsuffix)
                 # find youngest file
-                file_, mtime = filetool.findYoungest(catPath)
+                file_, mtime = self._snapshot(category, update=True).youngest()
                 youngFiles[mtime] = file_
 
+        self._saveSnapshots()
+
         # and return the maximum of those
         youngest = sorted(youngFiles.keys())[-1]
         self.__youngest = (youngFiles[youngest], youngest) # ("filepath", mtime)
@@ -163,6 +168,37 @@ class Library(object):
         return self.__youngest
 
 
+    ##
+    # The DirSnapshot of the tree of <category> ("classes", "resources",
+    # "translations"). The snapshots are kept in the cache, so an update only
+    # lists directories that have changed since the last run, and the scans
+    # use the same snapshot instead of walking the trees again.
+    def _snapshot(self, category, update=False):
+        if self._snapshots is None:
+            cache = getattr(context, "cache", None)
+            if cache:
+                self._snapshots, _ = cache.read(self._snapshotsId(), memory=True)
+            if self._snapshots is None:
+                self._snapshots = {}
+        root = os.path.join(self.path, self.assets[category]['path'])
+        snapshot = self._snapshots.get(category)
+        if snapshot is None or snapshot.root != root:
+            snapshot = self._snapshots[category] = DirSnapshot(root)
+        if update or not snapshot.updated:
+            snapshot.update()
+        return snapshot
+
+    def _snapshotsId(self):
+        return "libsnapshot-%s" % self.manipath
+
+    def _saveSnapshots(self):
+        cache = getattr(context, "cache", None)
+        if self._snapshots and cache and [x for x in self._snapshots.values() if x.modified]:
+            for snapshot in self._snapshots.values():
+                snapshot.modified = False
+            cache.write(self._snapshotsId(), self._snapshots, memory=True)
+
+
     _illegalIdentifierExpr = re.compile(lang.IDENTIFIER_ILLEGAL_CHARS)
     _ignoredDirEntries = re.compile(r'%s' % '|'.join(filetool.VERSIONCONTROL_DIR_PATTS), re.I)
     _docFilename = "__init__.js"
@@ -186,15 +222,24 @@ class Library(object):
     def getResources(self):
         return self.resources
 
-    def scan(self, timeOfLastScan=0):
+    ##
+    # Scan the library. Classes and resources of <previous> (an earlier scan
+    # of this library) whose files are older than <timeOfLastScan> are
+    # re-used.
+    def scan(self, timeOfLastScan=0, previous=None):
         self._console.debug("Scanning %s..." % self.path)
         self._console.indent()
 
+        if previous and ((previous.namespace, previous.classPath, previous.resourcePath)
+                         != (self.namespace, self.classPath, self.resourcePath)):
+            previous = None  # Manifest changed
+        if previous and not self._classes:
+            self._classes = previous.getClasses()
         scanres = self._scanClassPath(timeOfLastScan)
         self._classes = scanres[0]
         self._docs    = scanres[1]
         self._translations = self._scanTranslationPath()
-        self.resources = self._scanResourcePath()
+        self.resources = self._scanResourcePath(timeOfLastScan, previous)
 
         self._console.outdent()
 
@@ -287,7 +332,7 @@ class Library(object):
         return liblist
 
 
-    def _scanResourcePath(self):
+    def _scanResourcePath(self, timeOfLastScan=0, previous=None):
         resources = set()
         if self.resourcePath is None or not os.path.isdir(
                 os.path.join(self.path,self.resourcePath)):
@@ -302,32 +347,43 @@ class Library(object):
         if not path.endswith(os.sep):
             lib_prefix_len += 1
 
-        for root, dirs, files in filetool.walk(path):
-            # filter ignored directories
-            for dir in dirs:
-                if self._ignoredDirEntries.match(dir):
-                    dirs.remove(dir)
-
-            for file in files:
-                if self._ignoredDirEntries.match(file):
-                    continue
-                fpath = os.path.join(root, file)
-                fpath = os.path.normpath(fpath)
-                if Image.isImage(fpath):
-                    if CombinedImage.isCombinedImage(fpath):
-                        res = CombinedImage(fpath)
-                    else:
-                        res = Image(fpath)
-                    res.analyzeImage()
-                elif FontMap.isFontMap(fpath):
-                    res = FontMap(fpath)
+        snapshot = self._snapshot("resources")
+        existResources = {}  # if we scanned before
+        if previous:
+            existResources = dict((x.path, x) for x in previous.getResources())
+
+        images = []  # [(snapshot path, Image, re-used)]
+        for spath in snapshot.iterFiles():
+            fileMTime = snapshot.files[spath][0]
+            fpath = os.path.normpath(spath)
+            # re-use known and fresh resources (combined images also depend on their .meta file)
+            res = existResources.get(fpath)
+            metaStamp = snapshot.files.get(os.path.splitext(spath)[0] + '.meta')
+            if isinstance(res, CombinedImage):
+                fileMTime = max(fileMTime, metaStamp[0] if metaStamp else timeOfLastScan)
+            if res and fileMTime < timeOfLastScan:
+                res.library = self
+                resources.add(res)
+                if isinstance(res, Image):
+                    images.append((spath, res, True))
+                continue
+            if Image.isImage(fpath):
+                if metaStamp:  # like CombinedImage.isCombinedImage(), from the snapshot
+                    res = CombinedImage(fpath)
                 else:
-                    res = Resource(fpath)
+                    res = Image(fpath)
+                images.append((spath, res, False))
+            elif FontMap.isFontMap(fpath):
+                res = FontMap(fpath)
+            else:
+                res = Resource(fpath)
 
-                res.set_id(Path.posifyPath(fpath[lib_prefix_len:]))
-                res.library= self
+            res.set_id(Path.posifyPath(fpath[lib_prefix_len:]))
+            res.library= self
 
-                resources.add(res)
+            resources.add(res)
+
+        self._analyzeImages(path, snapshot, images)
 
         self._console.indent()
         self._console.debug("Found %s resources" % len(resources))
@@ -336,6 +392,44 @@ class Library(object):
 
 
 
+    ##
+    # Set the size and format of the images that are not re-used. The results
+    # are kept in an index in the cache, {path: (stamp, (width, height,
+    # format))}, which outlives the cached library, so an image is only
+    # analyzed again if its (mtime, size) stamp has changed. The others are
+    # analyzed in threads, as reading the headers mostly waits on the disk.
+    def _analyzeImages(self, path, snapshot, images):
+        cache = getattr(context, "cache", None)
+        cacheId = "imginfo-%s" % path
+        index = None
+        if cache:
+            index, _ = cache.read(cacheId, memory=True)
+        if index is None:
+            index = {}
+
+        analyze = []
+        for spath, res, reused in images:
+            if reused:
+                continue
+            entry = index.get(spath)
+            if entry and entry[0] == snapshot.files[spath]:
+                res.width, res.height, res.format = entry[1]
+            else:
+                analyze.append(res)
+
+        if analyze:
+            self._console.debug("Analyzing %s images" % len(analyze))
+            jobconf = context.jobconf or {}
+            jobs = ProcessPool.numJobs(jobconf.get("compile-options/code/jobs", 0))
+            ProcessPool.threadMap(lambda res: res.analyzeImage(), analyze, jobs)
+
+        # re-used images are in the index as well
+        newIndex = dict((spath, (snapshot.files[spath], (res.width, res.height, res.format)))
+                        for spath, res, _ in images)
+        if cache and newIndex != index:
+            cache.write(cacheId, newIndex, memory=True)
+
+
     def _scanClassPath(self, timeOfLastScan=0):
 
         ##
@@ -401,7 +495,9 @@ class Library(object):
                 # check if known and fresh
                 if (p.filePathId in existClassIds
                     and p.fileMTime < timeOfLastScan):
-                    classList.append(existClassIds[filePathId])
+                    clazz = existClassIds[filePathId]
+                    clazz.library = self
+                    classList.append(clazz)
                     continue # re-use known class
 
                 # handle doc files
@@ -448,22 +544,15 @@ class Library(object):
         self._console.debug("Scanning translation folder...")
 
         # Iterate...
-        for root, dirs, files in filetool.walk(path):
-            # Filter ignored directories
-            for ignoredDir in dirs:
-                if self._ignoredDirEntries.match(ignoredDir):
-                    dirs.remove(ignoredDir)
-
-            # Searching for files
-            for fileName in files:
-                # Ignore non-po and dot files
-                if os.path.splitext(fileName)[-1] != ".po" or fileName.startswith("."):
-                    continue
+        for filePath in self._snapshot("translations").iterFiles():
+            fileName = os.path.basename(filePath)
+            # Ignore non-po and dot files
+            if os.path.splitext(fileName)[-1] != ".po" or fileName.startswith("."):
+                continue
 
-                filePath = os.path.join(root, fileName)
-                fileLocale = os.path.splitext(fileName)[0]
+            fileLocale = os.path.splitext(fileName)[0]
 
-                translations[fileLocale] = self.translationEntry(fileLocale, filePath, self.namespace)
+            translations[fileLocale] = self.translationEntry(fileLocale, filePath, self.namespace)
 
         self._console.indent()
         self._console.debug("Found %s translations" % len(translations))
@@ -604,18 +693,10 @@ class Library(object):
         if self.classPath is None:
             return
         classRoot = os.path.join(self.path, self.classPath)
-        for root, dirs, files in filetool.walk(classRoot):
-            # Filter ignored directories
-            for ignoredDir in dirs:
-                if self._ignoredDirEntries.match(ignoredDir):
-                    dirs.remove(ignoredDir)
-
-            # Searching for files
-            for fileName in files:
-                # ignore dot files
-                if fileName.startswith(".") or self._ignoredDirEntries.match(fileName):
-                    continue
-                filePath = os.path.join(root, fileName)
-                filePathId = filePath.replace(classRoot + os.sep, '')
-                yield (filePathId, filePath)
+        for filePath in self._snapshot("classes").iterFiles():
+            # ignore dot files
+            if os.path.basename(filePath).startswith("."):
+                continue
+            filePathId = filePath.replace(classRoot + os.sep, '')
+            yield (filePathId, filePath)
 
@@ -19,14 +19,142 @@
 #
 ################################################################################
 
-import os, sys, time, functools, gc, zlib
+import os, sys, time, functools, gc, zlib, atexit
+from collections import OrderedDict
 import cPickle as pickle
 from misc import filetool
 from misc.securehash import sha_construct
 from generator.runtime.ShellCmd import ShellCmd
 from generator.runtime.Log import Log
+from generator.runtime import CacheStore
+from ecmascript.frontend import tree, treecodec
 
-memcache  = {} # {key: {'content':content, 'time': (time.time()}}
+
+##
+# In-memory tier of the cache: a map {cacheId: {'content':content, 'time':
+# time.time()}}, which evicts the least recently used entries when their
+# total size exceeds a limit (by default there is none).
+#
+# Entry sizes are approximated by the length of their serialization (see
+# dumps()). Entries may be kept 'frozen', i.e. serialized, for values callers
+# modify in place; reading
+# them yields a fresh copy every time. Statistics are kept per namespace,
+# i.e. the cacheId prefix up to the first "-" ("tree", "class", ...).
+
+class MemCache(object):
+
+    def __init__(self, limit=0):
+        self._entries = OrderedDict()  # {key: (item, size)}, least recently used first
+        self._bytes   = 0
+        self._stats   = {}  # {namespace: [hits, misses, evictions]}
+        self.limit    = limit  # bytes; 0 means unlimited
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def size(self):
+        return self._bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    ##
+    # Return the item of <key> (or None), marking it as recently used
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        self._count(key, entry is None and 1 or 0)
+        if entry is None:
+            return None
+        self._entries[key] = entry
+        item = entry[0]
+        if item.get('frozen'):
+            item = {'content': loads(item['content']), 'time': item['time']}
+        return item
+
+    ##
+    # Return the item of <key> (or None), without counting it as a use
+    def peek(self, key):
+        entry = self._entries.get(key)
+        return entry and entry[0]
+
+    ##
+    # Add <content> under <key>.
+    #
+    # @param pickled  the serialization of content, if already at hand
+    # @param frozen   keep the content serialized
+    def put(self, key, content, pickled=None, frozen=False):
+        item = {'content': content, 'time': time.time()}
+        size = 0
+        if frozen or self.limit:
+            if pickled is None:
+                pickled = dumps(content)
+            size = len(pickled)
+        if frozen:
+            item['content'], item['frozen'] = pickled, True
+        self.pop(key)
+        self._entries[key] = (item, size)
+        self._bytes += size
+        if self.limit:
+            self._evict()
+
+    def pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry[1]
+        return entry[0]
+
+    def _evict(self):
+        while self._bytes > self.limit and len(self._entries) > 1:  # spare the latest entry
+            key, (item, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._count(key, 2)
+
+    def _count(self, key, idx):
+        namespace = key.split("-", 1)[0]
+        if namespace not in self._stats:
+            self._stats[namespace] = [0, 0, 0]
+        self._stats[namespace][idx] += 1
+
+    ##
+    # Return {namespace: (hits, misses, evictions)}
+    def stats(self):
+        return dict((ns, tuple(counts)) for ns, counts in self._stats.items())
+
+
+##
+# Serialize a cache entry; syntax trees are stored in the compact format of
+# ecmascript.frontend.treecodec, everything else is pickled.
+
+def dumps(content):
+    if isinstance(content, tree.Node):
+        try:
+            return treecodec.dumps(content)
+        except treecodec.TreeCodecError:
+            pass  # fall back to pickle
+    return pickle.dumps(content, 2)
+
+
+def loads(data):
+    gc.disable()
+    try:
+        if treecodec.isEncoded(data):
+            return treecodec.loads(data)
+        else:
+            return pickle.loads(data)
+    finally:
+        gc.enable()
+
+
+memcache  = MemCache()
+stores    = {} # {path: CacheStore}, one store object per cache path and process
+digests   = {} # {path: (size, mtime, inode, digest)}, memo for "content" invalidation
+digests_dirty  = []  # pids that have added to the digests memo
+digestsCacheId = "digests"
 check_file     = u".cache_check_file"
 CACHE_REVISION = 0x1292407 # set this to a unique value (e.g. commit hash prefix)
                            # when existing caches need clearing
@@ -41,6 +169,10 @@ class Cache(object):
     #  'cache/downloads' : path
     #  'interruptRegistry' : generator.runtime.InterruptRegistry (mandatory)
     #  'cache/invalidate-on-tool-change' : True|False
+    #  'cache/backend' : "files"|"store"
+    #  'cache/invalidation' : "mtime"|"content"
+    #  'cache/memory-limit' : MB (0 for no limit)
+    #  'cache/compression' : zlib level 0-9 (0 for none)
     #
     def __init__(self, path, **kwargs):
         self._cache_revision = CACHE_REVISION
@@ -52,17 +184,141 @@ class Cache(object):
         self._console.debug("Initializing cache...")
         self._console.indent()
         self._check_path(self._path)
+        self._store          = self._open_store(kwargs.get("cache/backend", "files"))
+        self._invalidation   = kwargs.get("cache/invalidation", "mtime")
+        if self._invalidation not in ("mtime", "content"):
+            raise ValueError("Unknown cache invalidation mode: %r" % self._invalidation)
+        self._digests_read   = False
+        self._compression    = int(kwargs.get("cache/compression", 6))
+        if not 0 <= self._compression <= 9:
+            raise ValueError("Illegal cache compression level: %r" % self._compression)
+        memcache.limit       = int(kwargs.get("cache/memory-limit", 0) or 0) * 1024 * 1024
         self._locked_files   = set(())
         self._context['interruptRegistry'].register(self._unlock_files)
         self._assureCacheIsValid()  # checks and pot. clears existing cache
+        if self._num_entries() < CACHE_THRESHOLD: # not even minimal framework classes cached
+            self._console.info("Populating the cache, this may take some time")
         self._console.outdent()
         return
 
 
+    ##
+    # Return the CacheStore for the "store" backend, None for the "files"
+    # backend (one file per cache entry)
+
+    def _open_store(self, backend):
+        if backend == "files":
+            return None
+        elif backend != "store":
+            raise ValueError("Unknown cache backend: %r" % backend)
+        if not CacheStore.isSupported():
+            self._console.warn("Cache backend 'store' is not supported on this platform; using 'files'")
+            return None
+        if self._path not in stores:
+            stores[self._path] = CacheStore.CacheStore(self._path)
+        return stores[self._path]
+
+
+    def _num_entries(self):
+        if self._store is not None:
+            return len(self._store)
+        else:
+            return len(os.listdir(self._path))
+
+
     def __getstate__(self):
         raise pickle.PickleError("Never pickle generator.runtime.Cache.")
 
 
+    ##
+    # Whether entries are invalidated by the content of the files they depend
+    # on, rather than by their modification times
+
+    def byContent(self):
+        return self._invalidation == "content"
+
+
+    def _compress(self, data):
+        if self._compression:
+            return zlib.compress(data, self._compression)
+        return data
+
+
+    ##
+    # Whether the in-memory tier of the cache is bounded, so that keeping big
+    # entries (like syntax trees) in memory is affordable
+
+    def memoryLimited(self):
+        return memcache.limit > 0
+
+
+    ##
+    # Log the statistics of the in-memory tier
+
+    def logMemoryStats(self):
+        stats = memcache.stats()
+        if not stats:
+            return
+        self._console.debug("Memory cache: %d entries, %.1f MB (limit: %s)" % (
+            len(memcache), memcache.size() / 1048576.0,
+            memcache.limit and "%d MB" % (memcache.limit / 1048576) or "none"))
+        self._console.indent()
+        for namespace in sorted(stats):
+            self._console.debug("%-12s hits: %6d, misses: %6d, evictions: %6d" % ((namespace,) + stats[namespace]))
+        self._console.outdent()
+
+
+    ##
+    # Return a digest of the content of file <path>. Digests are memoized by
+    # (size, mtime, inode) of the file, so unchanged files are not re-read;
+    # the memo is kept in the cache across generator runs.
+
+    def digest(self, path):
+        if not self._digests_read:
+            self._read_digests()
+        st = os.stat(path)
+        memo = digests.get(path)
+        if memo and memo[:3] == (st.st_size, st.st_mtime, st.st_ino):
+            return memo[3]
+        fobj = open(path, "rb")
+        try:
+            digest = sha_construct(fobj.read()).hexdigest()
+        finally:
+            fobj.close()
+        digests[path] = (st.st_size, st.st_mtime, st.st_ino, digest)
+        digests_dirty.append(os.getpid())
+        return digest
+
+
+    def _read_digests(self):
+        self._digests_read = True
+        memo, _ = self.read(digestsCacheId)
+        if memo:
+            for path, entry in memo.items():
+                digests.setdefault(path, entry)
+        atexit.register(self._write_digests, os.getpid())
+
+
+    def _write_digests(self, pid):
+        if os.getpid() != pid or pid not in digests_dirty:  # not in forked workers
+            return
+        try:
+            self.write(digestsCacheId, digests)
+        except Exception:
+            pass  # it's only a memo, and we're exiting
+        del digests_dirty[:]
+
+
+    ##
+    # Return the id under which the entry <cacheId> is actually kept; with
+    # "content" invalidation, this includes the digest of <dependsOn>.
+
+    def _cache_key(self, cacheId, dependsOn):
+        if dependsOn and self._invalidation == "content":
+            return "%s-%s" % (cacheId, self.digest(dependsOn))
+        return cacheId
+
+
     def _assureCacheIsValid(self, ):
         self._toolChainIsNewer = self._checkToolsNewer()
         if self._toolChainIsNewer:
@@ -136,9 +392,13 @@ class Cache(object):
         self._check_path(self._path)
         self._console.info("Deleting compile cache")
         for f in os.listdir(self._path):   # currently, just delete the files in the top-level dir
+            if f.startswith(CacheStore.LOCK_FILE):
+                continue  # might be held by other processes
             file = os.path.join(self._path, f)
             if os.path.isfile(file):
                 os.unlink(file)
+        if self._store is not None:
+            self._store.clear()
         self._update_checkfile()
 
 
@@ -167,8 +427,6 @@ class Cache(object):
             # defer read/write access test to the first call of read()/write()
             self._console.debug("Using existing directory")
             pass
-        if len(os.listdir(path)) < CACHE_THRESHOLD: # not even minimal framework classes cached
-            self._console.info("Populating the cache, this may take some time")
         self._console.outdent()
 
     ##
@@ -208,28 +466,66 @@ class Cache(object):
         return "%s-%s" % (baseId, digestId)
 
 
+    ##
+    # Check whether there is an up-to-date cache entry for <cacheId>, without
+    # reading it.
+    #
+    # @param dependsOn  file name to compare cache file against
+    def isValid(self, cacheId, dependsOn=None):
+        if self._invalidation == "content":
+            cacheId, dependsOn = self._cache_key(cacheId, dependsOn), None
+        if dependsOn:
+            dependsModTime = os.stat(dependsOn).st_mtime
+
+        memitem = memcache.peek(cacheId)
+        if memitem:
+            if not dependsOn or dependsModTime < memitem['time']:
+                return True
+
+        if self._store is not None:
+            cacheModTime = self._store.mtime(cacheId.encode('utf-8'))
+            if cacheModTime is None:
+                return False
+        else:
+            cacheFile = os.path.join(self._path, self.filename(cacheId))
+            try:
+                cacheModTime = os.stat(cacheFile).st_mtime
+            except OSError:
+                return False
+
+        return not (dependsOn and dependsModTime > cacheModTime)
+
+
     ##
     # Read an object from cache.
     #
     # @param dependsOn  file name to compare cache file against
     # @param memory     if read from disk keep value also in memory; improves subsequent access
-    def read(self, cacheId, dependsOn=None, memory=False, keepLock=False):
+    # @param frozen     keep the in-memory value pickled, so every read returns a fresh copy
+    def read(self, cacheId, dependsOn=None, memory=False, keepLock=False, frozen=False):
+        if self._invalidation == "content":
+            cacheId, dependsOn = self._cache_key(cacheId, dependsOn), None
         if dependsOn:
             dependsModTime = os.stat(dependsOn).st_mtime
 
         # Mem cache
-        if cacheId in memcache:
-            memitem = memcache[cacheId]
+        memitem = memcache.get(cacheId)
+        if memitem:
             if not dependsOn or dependsModTime < memitem['time']:
                 return memitem['content'], memitem['time']
 
         # File cache
         cacheFile = os.path.join(self._path, self.filename(cacheId))
 
-        try:
-            cacheModTime = os.stat(cacheFile).st_mtime
-        except OSError:
-            return None, None
+        if self._store is not None:
+            fcontent, cacheModTime = self._store.get(cacheId.encode('utf-8'))
+            if fcontent is None:
+                return None, None
+        else:
+            try:
+                cacheModTime = os.stat(cacheFile).st_mtime
+            except OSError:
+                return None, None
 
         # out of date check
         if dependsOn and dependsModTime > cacheModTime:
@@ -237,15 +533,19 @@ class Cache(object):
 
         try:
             try:
-                if not cacheFile in self._locked_files:
+                # store entries don't need read locks, only keepLock does
+                if not cacheFile in self._locked_files and (keepLock or self._store is None):
                     self._locked_files.add(cacheFile)
                     filetool.lock(cacheFile)
 
-                fobj = open(cacheFile, 'rb')
-                fcontent = fobj.read().decode('zlib')
-                fobj.close()
+                if self._store is None:
+                    fobj = open(cacheFile, 'rb')
+                    fcontent = fobj.read()
+                    fobj.close()
+                if fcontent[:1] == 'x':  # zlib header; serialized entries start differently
+                    fcontent = fcontent.decode('zlib')
             finally:
-                if not keepLock:
+                if not keepLock and cacheFile in self._locked_files:
                     filetool.unlock(cacheFile)
                     self._locked_files.remove(cacheFile)
 
@@ -254,19 +554,15 @@ class Cache(object):
             return None, cacheModTime
 
         try:
-            gc.disable()
-            try:
-                content = pickle.loads(fcontent)
-            finally:
-                gc.enable()
+            content = loads(fcontent)
 
             if memory:
-                memcache[cacheId] = {'content':content, 'time': time.time()}
+                memcache.put(cacheId, content, fcontent, frozen)
 
             #print "read cacheId: %s" % cacheId
             return content, cacheModTime
 
-        except (EOFError, pickle.PickleError, pickle.UnpicklingError):
+        except (EOFError, ValueError, pickle.PickleError, pickle.UnpicklingError):
             self._console.warn("Could not unpickle cache object %s" % cacheFile)
             return None, cacheModTime
 
@@ -276,17 +572,36 @@ class Cache(object):
     #
     # @param memory         keep value also in memory; improves subsequent access
     # @param writeToFile    write value to disk
-    def write(self, cacheId, content, memory=False, writeToFile=True, keepLock=False):
+    # @param dependsOn      file name the entry is computed from; only relevant
+    #                       with "content" invalidation
+    # @param frozen         keep the in-memory value pickled, so every read returns a fresh copy
+    def write(self, cacheId, content, memory=False, writeToFile=True, keepLock=False, dependsOn=None, frozen=False):
+        cacheId = self._cache_key(cacheId, dependsOn)
         cacheFile = os.path.join(self._path, self.filename(cacheId))
+        pickled   = None
+
+        if writeToFile and self._store is not None:
+            try:
+                try:
+                    pickled = dumps(content)
+                    self._store.put(cacheId.encode('utf-8'), self._compress(pickled))
+                finally:
+                    if not keepLock and cacheFile in self._locked_files:  # lock from read(keepLock=True)
+                        filetool.unlock(cacheFile)
+                        self._locked_files.remove(cacheFile)
+            except (IOError, OSError, pickle.PickleError, pickle.PicklingError), e:
+                e.args = ("Could not store cache to %s.\n%s" % (self._path, e), )
+                raise e
 
-        if writeToFile:
+        elif writeToFile:
             try:
                 if not cacheFile in self._locked_files:
                     self._locked_files.add(cacheFile)  # this is not atomic with the next one!
                     filetool.lock(cacheFile)
 
+                pickled = dumps(content)
                 fobj = open(cacheFile, 'wb')
-                fobj.write(pickle.dumps(content, 2).encode('zlib'))
+                fobj.write(self._compress(pickled))
                 fobj.close()
 
                 if not keepLock:
@@ -302,14 +617,15 @@ class Cache(object):
                 raise e
 
         if memory:
-            memcache[cacheId] = {'time': time.time(), 'content':content}
+            memcache.put(cacheId, content, pickled, frozen)
 
 
     def remove(self, cacheId, writeToFile=False):
-        if cacheId in memcache:
-           entry = memcache[cacheId]
-           del memcache[cacheId]
-           return entry['content'], entry['time']
+        entry = memcache.pop(cacheId)
+        if entry and not entry.get('frozen'):
+            return entry['content'], entry['time']
+        elif entry:
+            return loads(entry['content']), entry['time']
         else:
             return None, None
 
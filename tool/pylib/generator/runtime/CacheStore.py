@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# CacheStore -- keep all cache entries of a cache directory in a single,
+# append-only data file, with an index in a second file.
+#
+# Layout of the data file (all integers little-endian):
+#
+#   file header : "QXCS", <version:uint32>, <generation:16 bytes>
+#   record      : "QXCR", <keylen:uint32>, <datalen:uint32>, <mtime:double>,
+#                 <crc32(key+data):uint32>, key, data
+#
+# A newer record for a key supersedes older ones. Records are only ever
+# appended, under an exclusive lock, with a single write, and carry a
+# checksum, so a crashed writer can at most leave a torn record at the end of
+# the file, which is detected and cut off by the next writer.
+#
+# The index file holds a snapshot of the key->record mapping, together with
+# the data file's generation and the offset up to which the snapshot is
+# complete. Whatever has been appended behind that offset (e.g. by other
+# processes) is picked up by scanning the record headers, so the index is a
+# mere speed-up and can be lost without harm.
+#
+# Compaction rewrites the live records into a new data file (with a new
+# generation) and renames it over the old one. It is only done when no other
+# process has the store open, which is tracked through a shared lock every
+# user holds on the lock file.
+##
+
+import os, sys, struct, mmap, zlib, time, atexit
+import cPickle as pickle
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DATA_FILE  = "store.dat"
+INDEX_FILE = "store.idx"
+LOCK_FILE  = "store.lock"
+
+FILE_MAGIC   = "QXCS"
+FILE_VERSION = 1
+FILE_HEADER  = struct.Struct("<4sI16s")
+REC_MAGIC    = "QXCR"
+REC_HEADER   = struct.Struct("<4sIIdI")
+
+COMPACT_MIN_SIZE = 16 * 1024 * 1024  # don't bother compacting smaller data files
+COMPACT_RATIO    = 0.5               # compact when more than this share of the data file is garbage
+
+
+class CacheStoreError(IOError): pass
+
+
+##
+# Whether the store can be used on this platform
+def isSupported():
+    return fcntl is not None and hasattr(os, "fork")
+
+
+class CacheStore(object):
+
+    def __init__(self, path):
+        if not isSupported():
+            raise CacheStoreError("The cache store is not supported on this platform")
+        self._path      = path
+        self._dataFile  = os.path.join(path, DATA_FILE)
+        self._indexFile = os.path.join(path, INDEX_FILE)
+        self._lockFile  = os.path.join(path, LOCK_FILE)
+        self._pid       = os.getpid()
+        self._mutex     = None  # per-process fd for the writer lock
+        self._inuse     = os.open(self._lockFile, os.O_CREAT|os.O_RDWR, 0666)
+        fcntl.flock(self._inuse, fcntl.LOCK_SH)  # announce usage, to prevent foreign compaction
+        self._fd        = None
+        self._map       = None
+        self._open()
+        atexit.register(self.close)
+
+
+    def __getstate__(self):
+        raise pickle.PickleError("Never pickle generator.runtime.CacheStore.")
+
+
+    # -- Public interface -----------------------------------------------------
+
+    ##
+    # Return (data, mtime) of the entry <key>, or (None, None)
+    def get(self, key):
+        entry = self._lookup(key)
+        if entry is None:
+            return None, None
+        offset, length, mtime = entry
+        return self._map[offset:offset+length], mtime
+
+
+    ##
+    # Return the mtime of the entry <key>, or None
+    def mtime(self, key):
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        return entry[2]
+
+
+    ##
+    # Store <data> (a string) under <key>; returns the entry's mtime
+    def put(self, key, data):
+        mtime  = time.time()
+        record = "".join((REC_HEADER.pack(REC_MAGIC, len(key), len(data), mtime,
+                                          zlib.crc32(data, zlib.crc32(key)) & 0xffffffff),
+                          key, data))
+        self._lock()
+        try:
+            self._catchUp()
+            size = os.fstat(self._fd).st_size
+            if size > self._end:  # torn record of a crashed writer
+                os.ftruncate(self._fd, self._end)
+            written = 0
+            while written < len(record):
+                written += os.write(self._fd, record[written:])
+            self._register(key, self._end + REC_HEADER.size + len(key), len(data), mtime)
+            self._end += len(record)
+        finally:
+            self._unlock()
+        return mtime
+
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+
+    def __len__(self):
+        self._catchUp()
+        return len(self._index)
+
+
+    ##
+    # Drop all entries
+    def clear(self):
+        self._lock()
+        try:
+            self._create()
+            self._open(locked=True)
+        finally:
+            self._unlock()
+        if os.path.exists(self._indexFile):
+            os.unlink(self._indexFile)
+
+
+    ##
+    # Rewrite the data file with the live records only. Returns False if the
+    # store is in use by other processes.
+    def compact(self):
+        if not self._tryExclusive():
+            return False
+        try:
+            self._catchUp()
+            tmpFile = self._dataFile + ".%d.tmp" % os.getpid()
+            fobj = open(tmpFile, "wb")
+            try:
+                fobj.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, os.urandom(16)))
+                for key in sorted(self._index, key=lambda k: self._index[k][0]):
+                    start, length, mtime = self._index[key]
+                    fobj.write(self._map[start - REC_HEADER.size - len(key):start+length])
+                fobj.flush()
+                os.fsync(fobj.fileno())
+            finally:
+                fobj.close()
+            os.rename(tmpFile, self._dataFile)
+            self._open(locked=True)
+            self._writeIndex()
+        finally:
+            fcntl.flock(self._inuse, fcntl.LOCK_SH)
+        return True
+
+
+    ##
+    # Save the index, and compact the data file if worthwhile. Called
+    # automatically at exit.
+    def close(self):
+        if self._fd is None or os.getpid() != self._pid:
+            return
+        size = self._end
+        if size > COMPACT_MIN_SIZE and self._live < size * (1 - COMPACT_RATIO):
+            if self.compact():
+                self._closeFiles()
+                return
+        self._lock()
+        try:
+            self._catchUp()
+            self._writeIndex()
+        finally:
+            self._unlock()
+        self._closeFiles()
+
+
+    # -- Internals ------------------------------------------------------------
+
+    def _open(self, locked=False):
+        if not os.path.exists(self._dataFile):
+            if locked:
+                self._create()
+            else:
+                self._lock()
+                try:
+                    if not os.path.exists(self._dataFile):
+                        self._create()
+                finally:
+                    self._unlock()
+        self._closeFiles()
+        self._fd  = os.open(self._dataFile, os.O_RDWR|os.O_APPEND)
+        self._ino = os.fstat(self._fd).st_ino
+        header = os.read(self._fd, FILE_HEADER.size)
+        try:
+            magic, version, generation = FILE_HEADER.unpack(header)
+        except struct.error:
+            magic = version = generation = None
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise CacheStoreError("Not a cache store file (or unsupported version): %s" % self._dataFile)
+        self._generation = generation
+        self._map   = None
+        self._mapsize = 0
+        self._index = {}  # {key: (data offset, data length, mtime)}
+        self._end   = FILE_HEADER.size  # offset up to which records have been indexed
+        self._live  = 0  # bytes of live records
+        self._readIndex()
+        self._catchUp()
+
+
+    def _create(self):
+        tmpFile = self._dataFile + ".%d.tmp" % os.getpid()
+        fobj = open(tmpFile, "wb")
+        fobj.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, os.urandom(16)))
+        fobj.close()
+        os.rename(tmpFile, self._dataFile)
+
+
+    def _closeFiles(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+    def _readIndex(self):
+        try:
+            fobj = open(self._indexFile, "rb")
+            try:
+                generation, end, live, index = pickle.loads(fobj.read().decode('zlib'))
+            finally:
+                fobj.close()
+        except (IOError, EOFError, ValueError, zlib.error, pickle.UnpicklingError):
+            return
+        if generation == self._generation and end <= os.fstat(self._fd).st_size:
+            self._index, self._end, self._live = index, end, live
+
+
+    def _writeIndex(self):
+        tmpFile = self._indexFile + ".%d.tmp" % os.getpid()
+        fobj = open(tmpFile, "wb")
+        try:
+            fobj.write(pickle.dumps((self._generation, self._end, self._live, self._index), 2).encode('zlib'))
+        finally:
+            fobj.close()
+        os.rename(tmpFile, self._indexFile)
+
+
+    def _lookup(self, key):
+        entry = self._index.get(key)
+        self._catchUp()  # pick up newer records of other processes
+        return self._index.get(key, entry)
+
+
+    def _register(self, key, offset, length, mtime):
+        if key in self._index:
+            self._live -= REC_HEADER.size + len(key) + self._index[key][1]
+        self._index[key] = (offset, length, mtime)
+        self._live += REC_HEADER.size + len(key) + length
+
+
+    ##
+    # Index the complete records that have been appended since the last call
+    def _catchUp(self):
+        size = os.fstat(self._fd).st_size
+        if size > self._mapsize:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+            self._mapsize = size
+        data = self._map
+        offset = self._end
+        while offset + REC_HEADER.size <= size:
+            magic, keylen, datalen, mtime, crc = REC_HEADER.unpack_from(data, offset)
+            keystart = offset + REC_HEADER.size
+            datastart = keystart + keylen
+            recend = datastart + datalen
+            if magic != REC_MAGIC or recend > size:
+                break
+            key = data[keystart:datastart]
+            if zlib.crc32(data[datastart:recend], zlib.crc32(key)) & 0xffffffff != crc:
+                break
+            self._register(key, datastart, datalen, mtime)
+            offset = recend
+        self._end = offset
+
+
+    def _lock(self):
+        if self._mutex is None or os.getpid() != self._pid:
+            # locks of forked processes must not share the parent's open file
+            self._pid = os.getpid()
+            self._mutex = os.open(self._lockFile + ".w", os.O_CREAT|os.O_RDWR, 0666)
+        fcntl.flock(self._mutex, fcntl.LOCK_EX)
+        if self._fd is not None:
+            try:
+                replaced = os.stat(self._dataFile).st_ino != self._ino
+            except OSError:
+                replaced = True
+            if replaced:  # data file has been cleared or removed
+                self._open(locked=True)
+
+
+    def _unlock(self):
+        fcntl.flock(self._mutex, fcntl.LOCK_UN)
+
+
+    def _tryExclusive(self):
+        try:
+            fcntl.flock(self._inuse, fcntl.LOCK_EX|fcntl.LOCK_NB)
+        except IOError:
+            fcntl.flock(self._inuse, fcntl.LOCK_SH)  # conversion is not atomic, so re-acquire
+            return False
+        return True
@@ -22,112 +22,241 @@
 # Generatord  -- Generator Daemon Module
 #
 #   Allows to run generator.py in daemon mode.
+#
+# The daemon ("generator.py --daemon") listens on a Unix socket and runs the
+# generator command lines it receives one after the other, in its own
+# process. So everything the generator keeps in memory (the Library and
+# Class objects, class infos, dependencies, trees, the processed config)
+# survives from one run to the next, and only what has changed on disk is
+# processed again. tool/bin/generator-client.py is the matching client.
+#
+# This module is also imported by the client, so it must stay light-weight.
+#
+# Protocol: every message is a frame of <kind:1 byte><length:uint32><payload>.
+# The client sends a single REQUEST frame with a JSON map ({"argv": [...],
+# "cwd": ..., "env": {...}, "tty": ...}) and receives STDOUT/STDERR frames with
+# the output of the run, and a final EXIT frame with the exit code. "env" has
+# the client's values of the ENVIRON variables, which are set for the run.
+# STOP and STATUS requests are answered with an EXIT frame alone.
+##
+
+import os, sys, socket, struct, json, hashlib, errno, time, traceback, tempfile
+
+REQUEST = "r"
+STOP    = "s"
+STATUS  = "?"
+STDOUT  = "o"
+STDERR  = "e"
+EXIT    = "x"
+
+FRAME_HEADER = struct.Struct(">cI")
+IDLE_TIMEOUT = 3 * 60 * 60  # secs; the daemon exits when not used for this long
+
+# the environment variables the generator reads (s. generator.config)
+ENVIRON = ("HOME", "QOOXDOO_PATH", "TMPDIR")
+
+
+##
+# Path of the socket of the daemon for the tool chain in <toolDir>, so
+# different SDKs don't share a daemon
+def socketPath(toolDir):
+    toolDir = os.path.realpath(toolDir)
+    name = "generatord-%s.sock" % hashlib.sha1(toolDir).hexdigest()[:12]
+    return os.path.join(os.path.expanduser(os.path.join("~", ".qooxdoo")), name)
+
+
+def sendFrame(sock, kind, payload=""):
+    if isinstance(payload, unicode):
+        payload = payload.encode("utf-8")
+    sock.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+##
+# Return (kind, payload) of the next frame, or (None, None) at the end of
+# the connection
+def recvFrame(sock):
+    header = _recvAll(sock, FRAME_HEADER.size)
+    if not header:
+        return None, None
+    kind, length = FRAME_HEADER.unpack(header)
+    payload = _recvAll(sock, length)
+    if payload is None:
+        return None, None
+    return kind, payload
+
+
+##
+# The values of the ENVIRON variables, to send with a request
+def getEnviron():
+    return dict((x, os.environ[x]) for x in ENVIRON if x in os.environ)
+
+
+##
+# Set the ENVIRON variables to the values in <env>, and unset those not in it
+def setEnviron(env):
+    for name in ENVIRON:
+        if name in env:
+            value = env[name]
+            os.environ[name] = value.encode("utf-8") if isinstance(value, unicode) else value
+        elif name in os.environ:
+            del os.environ[name]
+    tempfile.tempdir = None  # gettempdir() caches its result
+
+
+def _recvAll(sock, length):
+    chunks = []
+    while length:
+        chunk = sock.recv(min(length, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        length -= len(chunk)
+    return "".join(chunks)
+
+
+##
+# Connect to the daemon at <path>; returns the socket, or None if no daemon
+# is listening there
+def connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error, e:
+        sock.close()
+        if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+            return None
+        raise
+    return sock
+
+
 ##
+# File-like object that sends what is written to it as frames of <kind>, to
+# stand in for sys.stdout/sys.stderr during a run
+class FrameWriter(object):
+
+    encoding = "utf-8"
 
-import sys, os, re, string, types, copy
+    def __init__(self, sock, kind, tty=False):
+        self._sock = sock
+        self._kind = kind
+        self._tty  = tty
 
-from generator import Context
-from generator.Generator import Generator
-from generator.code.Class import Class
-from generator.runtime.Cache import Cache
+    def write(self, data):
+        if data:
+            sendFrame(self._sock, self._kind, data)
 
-# -- BaseHTTPServer stuff ----
-import BaseHTTPServer, cgi
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
 
-# -- Pyro stuff ----
-import Pyro.core, Pyro.naming
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return self._tty
 
-generator_context = None
 
 class Generatord(object):
 
-    def __init__(self, context, num=0):
-        global generator_context
-        generator_context = context
-        self.num = num
-        generator_context['cache'] = Cache("/tmp/qx1.5/cache", **generator_context) # TODO: cache path
-        #self.servAddr = ('',8008)
-        #self.serv = BaseHTTPServer.HTTPServer(self.servAddr, httpServerHandler)
-        generator_context['interruptRegistry'].register(self.shut_down)
+    ##
+    # @param path     {String} path of the socket to listen on
+    # @param runFunc  {Function} runFunc(argv) runs a generator command line
+    #   (without the program name) in the current process, and returns the
+    #   exit code
+    #
+    def __init__(self, path, runFunc):
+        self._path    = path
+        self._runFunc = runFunc
+        self._sock    = None
 
     def serve(self):
-        #self.serv.serve_forever()
-        daemon = Pyro.core.Daemon()
-        self.daemon = daemon
-        ns = Pyro.naming.NameServerLocator().getNS()
-        daemon.useNameServer(ns)
-        uri = daemon.connect(GeneratordWorker(self.num), "genworker"+str(self.num))
-        daemon.requestLoop()
-
-    def shut_down(self):
-        self.daemon.shutdown(True)
-
-
-# This is adopted from the standard Pyro example
-class GeneratordWorker(Pyro.core.ObjBase):
-
-    def __init__(self, num):
-        Pyro.core.ObjBase.__init__(self)
-        self.num = num
-        self.job = generator_context['jobconf']
-        self.classList = self._scanLibs(self.job)
-
-    def _scanLibs(self, job):
-        genobj = Generator(generator_context)
-        (ns,classes,d,tr,lib) = genobj.scanLibrary(job.get("library", []))
-        return classes
-
-
-    def joke(self,name):
-        return "sorry "+name+", I don't know any jokes!"
-
-    def tree(self, classId, classPath, variantSet):
-        c = Class(classId, classPath, None, generator_context, {})
-        t = c.tree()
-        return t
-
-    def dependencies(self, classId, classPath, variantSet, force=False):
-        print "\nrunning on Pyro server", str(self.num)
-        c = Class(classId, classPath, None, generator_context, self.classList)
-        d, cached = c.dependencies(variantSet, force)
-        return d, cached
-        
-    def run(self, jobname):
-        print "\nrunning on Pyro server", str(self.num), ":", jobname
-        config = generator_context['config']
-        console = generator_context['console']
-        expjobs = config.resolveExtendsAndRuns([jobname])
-        config.includeSystemDefaults(expjobs)
-        config.resolveMacros(expjobs)
-        config.resolveLibs(expjobs)
-        config.checkSchema(expjobs, checkJobTypes=True)
-        config.cleanUpJobs(expjobs)
-        console.resetFilter()
-        for jobn in expjobs:
-            console.head("Executing: %s" % jobn, True)
-            job = generator_context['config'].getJob(jobn)
-            assert job is not None
-            job_context = copy.copy(generator_context)
-            job_context.update({'jobconf':job})
-            genobj = Generator(job_context)
-            genobj.run()
-        
-
-# This is from B.Dayley's "Python Phrasebook"
-class httpServerHandler(BaseHTTPServer.BaseHTTPRequestHandler):
-    
-    def do_POST(self):
-        self.query_string = self.rfile.read(int(self.headers['Content-Length']))
-        self.args = dict(cgi.parse_qsl(self.query_string))
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.end_headers()
-        sys.stdout = self.wfile
-        self.wfile.write("<h2>Handling Post</h2><p>")
-        self.wfile.write("<li>Location: <b>%s</b>" % (self.path,))
-        self.wfile.write("<li>Arguments: <b>%s</b><hr>" % (self.args,))
-        #execfile(self.path, self.args)
+        sockDir = os.path.dirname(self._path)
+        if not os.path.isdir(sockDir):
+            os.makedirs(sockDir)
+        running = connect(self._path)
+        if running:
+            running.close()
+            raise RuntimeError("A generator daemon is already listening on %s" % self._path)
+        if os.path.exists(self._path):
+            os.unlink(self._path)  # stale socket of a crashed daemon
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self._path)
+        os.chmod(self._path, 0600)
+        self._sock.listen(5)
+        self._sock.settimeout(IDLE_TIMEOUT)
+        try:
+            while True:
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    break
+                conn.settimeout(None)
+                try:
+                    if not self._handle(conn):
+                        break
+                finally:
+                    conn.close()
+        finally:
+            self._sock.close()
+            if os.path.exists(self._path):
+                os.unlink(self._path)
 
+    ##
+    # Serve one connection; returns False if the daemon should stop
+    def _handle(self, conn):
+        kind, payload = recvFrame(conn)
+        if kind == STOP:
+            sendFrame(conn, EXIT, "0")
+            return False
+        elif kind == STATUS:
+            sendFrame(conn, EXIT, "0")
+            return True
+        elif kind != REQUEST:
+            return True
 
+        request = json.loads(payload)
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = FrameWriter(conn, STDOUT, request.get("tty", False))
+        sys.stderr = FrameWriter(conn, STDERR, request.get("tty", False))
+        cwd  = os.getcwd()
+        argv = sys.argv
+        env  = getEnviron()
+        code = 1
+        try:
+            try:
+                setEnviron(request.get("env", {}))
+                os.chdir(request["cwd"])
+                sys.argv = argv[:1] + [a.encode("utf-8") for a in request["argv"]]
+                code = self._runFunc(sys.argv[1:])
+            except SystemExit, e:
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except socket.error:
+                pass  # client has gone
+            except Exception:
+                try:
+                    traceback.print_exc()
+                except socket.error:
+                    pass
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+            sys.argv = argv
+            setEnviron(env)
+            os.chdir(cwd)
+        try:
+            sendFrame(conn, EXIT, str(code))
+        except socket.error:
+            pass
+        return True
 
 
+##
+# Wait up to <timeout> secs for a daemon to listen on <path>; returns the
+# connected socket or None
+def waitForDaemon(path, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        sock = connect(path)
+        if sock:
+            return sock
+        time.sleep(0.05)
+    return None
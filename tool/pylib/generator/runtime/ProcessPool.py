@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# ProcessPool -- map a function over a list of items using forked worker
+# processes.
+#
+# The function and its extra arguments are not pickled, but inherited by the
+# workers through fork(), so closures and objects holding a Cache or a Log are
+# fine as long as the items and the results are picklable. On platforms
+# without fork() (or with jobs < 2) everything runs serially in the current
+# process, so callers don't have to special-case that.
+#
+# threadMap() is the counterpart for work that mostly waits on I/O, like
+# reading file headers, where forking would cost more than it saves.
+##
+
+import os, sys, signal
+
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+
+WAIT_TIMEOUT = 0xFFFFFF  # secs; a finite timeout keeps the parent receptive to Ctrl-C
+
+_work = None  # (fn, args) of the running forkMap() call, inherited by the workers
+
+
+##
+# Number of CPUs available to this process, 1 if it cannot be determined
+def cpuCount():
+    try:
+        count = multiprocessing.cpu_count()
+    except (AttributeError, NotImplementedError):
+        return 1
+    # honor the CPU affinity of the process (Linux), like nproc(1)
+    try:
+        for line in open("/proc/self/status"):
+            if line.startswith("Cpus_allowed_list:"):
+                allowed = 0
+                for cpus in line.split(":", 1)[1].strip().split(","):
+                    first, _, last = cpus.partition("-")
+                    allowed += int(last or first) - int(first) + 1
+                return max(1, min(count, allowed))
+    except (IOError, ValueError):
+        pass
+    return count
+
+
+##
+# Whether forkMap() can actually run items in parallel (not within a worker
+# process, as these cannot have children of their own)
+def canFork():
+    return (multiprocessing is not None and hasattr(os, "fork")
+            and not multiprocessing.current_process().daemon)
+
+
+##
+# Normalize a "jobs" config value: 0, None or a negative number mean "one job
+# per CPU".
+def numJobs(jobs=None):
+    try:
+        jobs = int(jobs or 0)
+    except (TypeError, ValueError):
+        raise ValueError("Illegal number of jobs: %r" % (jobs,))
+    if jobs < 1:
+        jobs = cpuCount()
+    return jobs
+
+
+def _initWorker():
+    # leave Ctrl-C handling to the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _runItem(item):
+    fn, args = _work
+    return fn(item, *args)
+
+
+##
+# Apply fn(item, *args) to every element of items, using up to <jobs> worker
+# processes. Returns the list of results, in the order of items.
+#
+# @param progress  {Function} called in the parent after each finished item
+#
+def forkMap(fn, items, jobs=1, args=(), progress=None):
+    global _work
+    items = list(items)
+    jobs  = min(jobs, len(items))
+
+    if jobs < 2 or not canFork():
+        result = []
+        for item in items:
+            result.append(fn(item, *args))
+            if progress:
+                progress()
+        return result
+
+    _work = (fn, args)
+    pool = multiprocessing.Pool(jobs, _initWorker)
+    try:
+        try:
+            result = []
+            resultIter = pool.imap(_runItem, items)  # chunksize 1, so next() takes a timeout
+            for _ in items:
+                result.append(resultIter.next(WAIT_TIMEOUT))
+                if progress:
+                    progress()
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+    finally:
+        pool.join()
+        _work = None
+
+    return result
+
+
+##
+# Apply fn(item) to every element of items, using up to <jobs> threads.
+# Returns the list of results, in the order of items; the first exception
+# raised by fn is re-raised.
+def threadMap(fn, items, jobs=1):
+    items = list(items)
+    jobs  = min(jobs, len(items))
+
+    if jobs < 2 or multiprocessing is None:
+        return [fn(item) for item in items]
+
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(jobs)
+    try:
+        try:
+            result = pool.map_async(fn, items).get(WAIT_TIMEOUT)
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+    finally:
+        pool.join()
+
+    return result
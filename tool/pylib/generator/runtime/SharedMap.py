@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# SharedMap -- a map in the cache that is shared by all the builds using the
+# cache, like the global privates map of the "privates" optimization.
+#
+# The map is read from the cache when it is first used in a job, and written
+# back once with flushAll() at the end of the job, instead of a read and a
+# write of the whole map for every class. Other processes may have flushed
+# the map in the meantime, so the flush merges: under the cache lock, it
+# reads the map again and adds the entries this process has added or changed
+# (keeping those of the cache for keys both have, unless <overwrite>).
+#
+# With <counter>, the map hands out indexes with allocate() (for the names of
+# privates), which are unique across processes: they are taken from blocks
+# that are reserved in a separate cache entry (<cacheId>-next), so processes
+# that compile at the same time never use the same index, and a job that
+# fails before its flush leaves no index behind that could be used again. A
+# block is given back at the flush if no other process has reserved one since.
+##
+
+BLOCK_SIZE = 1024
+
+_maps = {}  # {(id(cache), cacheId): SharedMap}
+
+
+##
+# The SharedMap <cacheId> of <cache>, for this job
+def get(cache, cacheId, overwrite=False, counter=False):
+    key = (id(cache), cacheId)
+    if key not in _maps:
+        _maps[key] = SharedMap(cache, cacheId, overwrite, counter)
+    return _maps[key]
+
+
+##
+# Write the SharedMaps of <cache> back to it, and forget them; the next use
+# reads them again. They are forgotten first, so none is kept if a flush
+# fails.
+def flushAll(cache):
+    maps = [_maps.pop(x) for x in _maps.keys() if x[0] == id(cache)]
+    for map_ in maps:
+        map_.flush()
+
+
+class IndexedMap(dict):
+    def __init__(self, data, allocate):
+        dict.__init__(self, data)
+        self.allocate = allocate
+
+
+class SharedMap(object):
+
+    def __init__(self, cache, cacheId, overwrite=False, counter=False):
+        self.cacheId   = cacheId
+        self._cache    = cache
+        self._overwrite = overwrite
+        self._counter  = counter
+        self._data     = None  # the map, as used in this process
+        self._base     = None  # copy of the map as read
+        self._next     = None  # next index of the reserved block
+        self._end      = None  # end of the reserved block
+
+    ##
+    # The map, read from the cache on first use
+    def map(self):
+        if self._data is None:
+            data, _ = self._cache.read(self.cacheId)
+            data = data or {}
+            self._base = data.copy()
+            if self._counter:
+                self._data = IndexedMap(data, self.allocate)
+            else:
+                self._data = data
+        return self._data
+
+    ##
+    # A new index, unique among all processes using the cache
+    def allocate(self):
+        if self._next == self._end:
+            self._reserve()
+        index = self._next
+        self._next += 1
+        return index
+
+    def _counterId(self):
+        return "%s-next" % self.cacheId
+
+    def _reserve(self):
+        counterId = self._counterId()
+        next_, _ = self._cache.read(counterId, keepLock=True)
+        if next_ is None:
+            # no block reserved yet; continue after the indexes in use
+            stored, _ = self._cache.read(self.cacheId)
+            next_ = max(len(stored or {}), len(self._base or {}))
+        self._next, self._end = next_, next_ + BLOCK_SIZE
+        self._cache.write(counterId, self._end)  # removes lock
+
+    ##
+    # Merge the changes to the map into the cache
+    def flush(self):
+        if self._data is None:
+            return
+        base = self._base
+        changes = [(k, v) for k, v in self._data.iteritems() if k not in base or base[k] != v]
+        if changes:
+            stored, _ = self._cache.read(self.cacheId, keepLock=True)
+            stored = stored or {}
+            for key, val in changes:
+                if self._overwrite or key not in stored:
+                    stored[key] = val
+            self._cache.write(self.cacheId, stored)  # removes lock
+
+        # give back the rest of the block, if it is the last one reserved
+        if self._end is not None and self._next < self._end:
+            counterId = self._counterId()
+            next_, _ = self._cache.read(counterId, keepLock=True)
+            if next_ == self._end:
+                next_ = self._next
+            self._cache.write(counterId, next_)  # removes lock
+        self._data = self._base = self._next = self._end = None
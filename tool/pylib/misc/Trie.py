@@ -23,6 +23,8 @@
 # strings (like class names)
 ##
 
+_VALUES = None  # key of the values of a name in its node (parts are strings)
+
 ##
 # Naive implementation using dicts
 class Trie(object):
@@ -30,13 +32,36 @@ class Trie(object):
         self._data = {}
         self._sep  = sep
 
-    def add(self, name):
+    ##
+    # Add <name>; <values>, if given, are recorded with it (s. values())
+    def add(self, name, *values):
         nameparts = name.split(self._sep)
         p = self._data
         for part in nameparts:
             if part not in p:
                 p[part] = {}
             p = p[part]
+        if values:
+            p.setdefault(_VALUES, []).extend(values)
+
+    ##
+    # Iterate over the values recorded with the names that start with the
+    # parts <prefixParts>, i.e. within the subtree of the prefix
+    def values(self, prefixParts=()):
+        p = self._data
+        for part in prefixParts:
+            if part not in p:
+                return
+            p = p[part]
+        stack = [p]
+        while stack:
+            p = stack.pop()
+            for part, subtree in p.iteritems():
+                if part is _VALUES:
+                    for value in subtree:
+                        yield value
+                else:
+                    stack.append(subtree)
 
     def data(self):
         return self._data
@@ -62,6 +87,8 @@ class Trie(object):
 
     def _traverse(self, prefix, data):
         for part in data:
+            if part is _VALUES:
+                continue
             if len(prefix):
                 curr = self._sep.join((prefix,part))
             else:
@@ -19,7 +19,16 @@
 #
 ################################################################################
 
+##
+# Extraction of the locale data qooxdoo uses from the CLDR XML files, and the
+# bundle of the extracted data that can be shipped instead
+##
+
+import os, zipfile
+
 from elementtree import ElementTree
+from misc import json
+from misc import securehash as sha
 
 def getLocale(calendarElement):
     locale = calendarElement.find("identity/language").attrib["type"]
@@ -179,4 +188,76 @@ def parseCldrFile(filename, outputDirectory=None):
     data.update(extractNumber(tree))
 
     return data
-    
+
+
+##
+# The bundle of extracted CLDR data: a zip archive with the data of each
+# locale (<locale>.json), so a locale can be read without the others, and an
+# index.json with the bundle version and the content digests of the XML files
+# the data was extracted from. The data of a locale is only taken from the
+# bundle if its XML file has still the same content (a checkout doesn't keep
+# the file times); bump BUNDLE_VERSION when the extraction above changes.
+
+BUNDLE_VERSION = 2
+BUNDLE_NAME    = "bundle.zip"  # in the directory of the CLDR "main" folder
+
+class Bundle(object):
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = None
+        self._sources = {}  # {locale: digest of the XML file}
+        if not os.path.isfile(path):
+            return
+        try:
+            zipFile = zipfile.ZipFile(path)
+            index = json.loads(zipFile.read("index.json"))
+        except (IOError, KeyError, ValueError, zipfile.BadZipfile):
+            return
+        if index.get("version") == BUNDLE_VERSION:
+            self._zip = zipFile
+            self._sources = index["sources"]
+
+    ##
+    # The data of <locale> extracted from <filename>, None if the bundle
+    # doesn't have it
+    def get(self, locale, filename):
+        digest = self._sources.get(locale)
+        if digest is None or not os.path.isfile(filename) or sourceDigest(filename) != digest:
+            return None
+        return json.loads(self._zip.read("%s.json" % locale))
+
+
+##
+# The digest of the XML file <filename>, for the bundle index
+def sourceDigest(filename):
+    fobj = open(filename, "rb")
+    try:
+        return sha.getHash(fobj.read())
+    finally:
+        fobj.close()
+
+
+##
+# Extract the data of all the XML files in <cldrMain> and write it to the
+# bundle <path>. <mapFn> is used to apply parseCldrFile() to the files, so
+# the caller can run them in parallel.
+def writeBundle(cldrMain, path, mapFn=map):
+    locales = sorted(os.path.splitext(x)[0] for x in os.listdir(cldrMain) if x.endswith(".xml"))
+    files = [os.path.join(cldrMain, "%s.xml" % x) for x in locales]
+    datas = mapFn(parseCldrFile, files)
+
+    tmpPath = path + ".tmp"
+    zipFile = zipfile.ZipFile(tmpPath, "w", zipfile.ZIP_DEFLATED)
+    try:
+        index = {"version" : BUNDLE_VERSION, "sources" : {}}
+        for locale, filename, data in zip(locales, files, datas):
+            zipFile.writestr("%s.json" % locale, json.dumps(data, sort_keys=True))
+            index["sources"][locale] = sourceDigest(filename)
+        zipFile.writestr("index.json", json.dumps(index, sort_keys=True))
+    finally:
+        zipFile.close()
+    if os.path.exists(path):
+        os.remove(path)  # for Windows
+    os.rename(tmpPath, path)
+    return len(locales)
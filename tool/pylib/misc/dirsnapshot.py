@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# dirsnapshot -- a persistable record of a directory tree
+#
+# A DirSnapshot holds the listing and mtime of each directory of a tree, and
+# the (mtime, size) of each file. update() re-walks the tree, but re-uses the
+# listing of every directory whose mtime hasn't changed, so an unchanged tree
+# costs one stat() per entry (instead of the listdir() and the stat()'s for
+# telling files from directories, as with os.walk()).
+#
+# The mtime of a directory only changes with its entries, not with the
+# contents of its files, so the files are still stat'ed.
+##
+
+import os, re, math, time
+
+from misc import filetool
+
+_skipPatt = re.compile(r'%s' % '|'.join(filetool.VERSIONCONTROL_DIR_PATTS), re.I)
+
+
+class DirSnapshot(object):
+
+    def __init__(self, root):
+        self.root    = root
+        self.dirs    = {}  # {dir path: (mtime, [subdir name], [file name])}
+        self.files   = {}  # {file path: (mtime, size)}
+        self.taken   = 0   # time of the last update
+        self.changed = set()  # new or modified files of the last update
+        self.removed = set()  # files removed in the last update
+        self.modified = False # whether the last update changed anything
+        self.updated = False  # whether updated in this process
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d['changed'], d['removed'], d['updated'] = set(), set(), False
+        return d
+
+    def update(self):
+        now = time.time()
+        dirs, files = {}, {}
+        listed = 0
+        # (path, (dev, inode) of the directories above it), so a symlink is
+        # only skipped if it leads back into its own path, not if it leads to
+        # a directory that is also reachable elsewhere
+        stack = [(self.root, frozenset())]
+        while stack:
+            path, above = stack.pop()
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = (st.st_dev, st.st_ino)
+            if key in above:
+                continue
+            above = above.union((key,))
+            old = self.dirs.get(path)
+            # BUG #7306: a listing taken within the same second as a change might miss it
+            if old and old[0] == st.st_mtime and math.floor(st.st_mtime) < math.floor(self.taken):
+                subdirs, names = old[1], old[2]
+            else:
+                subdirs, names = self._list(path)
+                listed += 1
+            dirs[path] = (st.st_mtime, subdirs, names)
+            for name in names:
+                fpath = os.path.join(path, name)
+                try:
+                    fst = os.stat(fpath)
+                except OSError:
+                    continue
+                files[fpath] = (fst.st_mtime, fst.st_size)
+            stack.extend((os.path.join(path, x), above) for x in reversed(subdirs))
+
+        old = self.files
+        self.changed = set(p for p, s in files.iteritems() if old.get(p) != s)
+        self.removed = set(old).difference(files)
+        self.modified = bool(listed or self.changed or self.removed or set(dirs) != set(self.dirs))
+        self.dirs, self.files, self.taken = dirs, files, now
+        self.updated = True
+
+    def _list(self, path):
+        subdirs, names = [], []
+        try:
+            entries = sorted(os.listdir(path))
+        except OSError:
+            return subdirs, names
+        for name in entries:
+            if _skipPatt.search(name):
+                continue
+            if os.path.isdir(os.path.join(path, name)):
+                subdirs.append(name)
+            else:
+                names.append(name)
+        return subdirs, names
+
+    ##
+    # Iterate over the paths of the files, directory by directory (top-down)
+    def iterFiles(self):
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            entry = self.dirs.get(path)
+            if entry is None:
+                continue
+            for name in entry[2]:
+                fpath = os.path.join(path, name)
+                if fpath in self.files:
+                    yield fpath
+            stack.extend(os.path.join(path, x) for x in reversed(entry[1]))
+
+    ##
+    # (path, mtime) of the most recently changed file or directory
+    def youngest(self):
+        result = (self.root, 0)
+        for path, entry in self.dirs.iteritems():
+            if entry[0] > result[1]:
+                result = (path, entry[0])
+        for path, stamp in self.files.iteritems():
+            if stamp[0] > result[1]:
+                result = (path, stamp[0])
+        return result
@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# filewatch -- keep track of changes to the files under a set of paths
+#
+# A watcher keeps an in-memory snapshot {path: mtime} of its root paths and
+# the entries beneath them (selected like with filetool.find()). update()
+# brings the snapshot up to date and returns the changes since the last
+# update; changedSince() only looks at the snapshot.
+#
+# InotifyWatcher (Linux) walks the trees once, and then updates the snapshot
+# from inotify events, so only changed entries are stat'ed again, and a burst
+# of changes (like an editor saving several files) is collected into one
+# update. PollingWatcher re-scans the trees on every update, and serves as
+# the fallback everywhere else.
+##
+
+import os, sys, re, math, time, errno, select, struct, ctypes, ctypes.util
+
+from misc import filetool
+
+COALESCE_DELAY = 0.2  # secs without new events that end a burst of changes
+COALESCE_MAX   = 2.0  # secs a burst is extended at most
+
+_skipPatt = re.compile(r'%s' % '|'.join(filetool.VERSIONCONTROL_DIR_PATTS), re.I)
+
+
+##
+# Return a watcher for <paths>, using <backend> ("auto", "inotify" or
+# "polling"); "auto" uses inotify where available, and polling otherwise.
+def createWatcher(paths, pattern=None, includedirs=False, backend="auto"):
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(paths, pattern, includedirs)
+        except (OSError, NotImplementedError):
+            if backend == "inotify":
+                raise
+    return PollingWatcher(paths, pattern, includedirs)
+
+
+class PollingWatcher(object):
+
+    def __init__(self, paths, pattern=None, includedirs=False):
+        self.paths       = list(paths)
+        self.includedirs = includedirs
+        self._pattern    = pattern
+        self._findPatt   = re.compile(pattern) if pattern else None
+        self.snapshot    = self._scan()  # {path: mtime}
+
+    ##
+    # Bring the snapshot up to date, waiting up to <timeout> secs for
+    # changes; returns ([changed or new path], [removed path])
+    def update(self, timeout=0):
+        if timeout:
+            time.sleep(timeout)
+        old, self.snapshot = self.snapshot, self._scan()
+        changed = [p for p, m in self.snapshot.iteritems() if old.get(p) != m]
+        removed = [p for p in old if p not in self.snapshot]
+        return changed, removed
+
+    ##
+    # [(path, mtime)] of the entries of the snapshot that have been modified
+    # since <since> (secs since the epoch)
+    def changedSince(self, since):
+        # BUG #7306: equate both operands to get more reliable results
+        since = math.floor(since)
+        return [(p, m) for p, m in self.snapshot.iteritems() if math.floor(m) >= since]
+
+    def close(self):
+        pass
+
+    def _scan(self):
+        snapshot = {}
+        for root in self.paths:
+            self._scanTree(root, snapshot)
+        return snapshot
+
+    ##
+    # Add <root> and the selected entries beneath it to <snapshot>; returns
+    # the directories in the tree
+    def _scanTree(self, root, snapshot):
+        dirs = []
+        if not os.path.exists(root):
+            return dirs
+        self._stat(root, snapshot)
+        for path, dirlist, filelist in os.walk(root):
+            dirs.append(path)
+            dirlist[:] = [x for x in dirlist if not _skipPatt.search(x)]
+            for name in (dirlist + filelist if self.includedirs else filelist):
+                if self._selected(name):
+                    self._stat(os.path.join(path, name), snapshot)
+        return dirs
+
+    def _selected(self, name):
+        if _skipPatt.search(name):
+            return False
+        return not self._findPatt or self._findPatt.search(name)
+
+    def _stat(self, path, snapshot):
+        try:
+            snapshot[path] = os.stat(path).st_mtime
+        except OSError:
+            snapshot.pop(path, None)
+            return False
+        return True
+
+
+##
+# inotify(7) through ctypes, so there is no dependency on a binding package.
+_libc = None
+
+def _inotify():
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith("linux"):
+            raise NotImplementedError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise NotImplementedError("libc has no inotify support")
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc = libc
+    return _libc
+
+IN_MODIFY      = 0x00000002
+IN_ATTRIB      = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF   = 0x00000800
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ONLYDIR     = 0x01000000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = 0x00000800  # O_NONBLOCK
+IN_CLOEXEC     = 0x00080000  # O_CLOEXEC
+
+WATCH_MASK  = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+               | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher(PollingWatcher):
+
+    def __init__(self, paths, pattern=None, includedirs=False):
+        self._libc  = _inotify()
+        self._fd    = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            self._raise()
+        self._wds   = {}  # {wd: directory path}
+        self._dirs  = {}  # {directory path: wd}
+        self._roots = set(paths)
+        try:
+            PollingWatcher.__init__(self, paths, pattern, includedirs)
+        except:
+            self.close()
+            raise
+
+    ##
+    # Only waiting for changes (<timeout> > 0) collects bursts of events;
+    # otherwise, just the pending events are processed.
+    def update(self, timeout=0):
+        changed, removed = set(), set()
+        if self._wait(timeout):
+            end   = time.time() + COALESCE_MAX
+            delay = COALESCE_DELAY if timeout else 0
+            while True:
+                self._readEvents(changed, removed)
+                if time.time() >= end or not self._wait(delay):
+                    break
+        changed.intersection_update(self.snapshot)
+        removed.difference_update(self.snapshot)
+        return sorted(changed), sorted(removed)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.close()
+
+    def _scan(self):
+        snapshot = {}
+        for root in self.paths:
+            for path in self._scanTree(root, snapshot):
+                self._addWatch(path)
+            if os.path.isfile(root):
+                self._addWatch(root, WATCH_MASK)
+        return snapshot
+
+    def _addWatch(self, path, mask=WATCH_MASK | IN_ONLYDIR):
+        bpath = path.encode(sys.getfilesystemencoding()) if isinstance(path, unicode) else path
+        wd = self._libc.inotify_add_watch(self._fd, bpath, mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):  # gone in the meantime
+                return
+            self._raise(err)
+        self._wds[wd] = path
+        self._dirs[path] = wd
+
+    def _removeWatches(self, path):
+        prefix = path + os.sep
+        for dirpath in [d for d in self._dirs if d == path or d.startswith(prefix)]:
+            wd = self._dirs.pop(dirpath)
+            del self._wds[wd]
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _wait(self, timeout):
+        try:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+        except select.error, e:
+            if e.args[0] == errno.EINTR:
+                return False
+            raise
+        return bool(readable)
+
+    def _readEvents(self, changed, removed):
+        try:
+            data = os.read(self._fd, 65536)
+        except OSError, e:
+            if e.errno == errno.EAGAIN:
+                return
+            raise
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip("\0")
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                self._rescan(changed, removed)
+                continue
+            dirpath = self._wds.get(wd)
+            if dirpath is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._wds[wd]
+                if self._dirs.get(dirpath) == wd:
+                    del self._dirs[dirpath]
+                if dirpath in self._roots and os.path.isfile(dirpath):  # file root replaced
+                    self._addWatch(dirpath, WATCH_MASK)
+                    if self._stat(dirpath, self.snapshot):
+                        changed.add(dirpath)
+                continue
+            if isinstance(dirpath, unicode):
+                name = name.decode(sys.getfilesystemencoding(), "replace")
+            path = os.path.join(dirpath, name) if name else dirpath
+            self._event(path, mask, changed, removed)
+
+    def _event(self, path, mask, changed, removed):
+        name = os.path.basename(path)
+        if mask & (IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF | IN_MOVE_SELF):
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) and path not in self._roots:
+                return  # reported by the parent directory, too
+            prefix = path + os.sep
+            for p in [p for p in self.snapshot if p == path or p.startswith(prefix)]:
+                del self.snapshot[p]
+                removed.add(p)
+            if mask & IN_ISDIR and mask & IN_MOVED_FROM:
+                self._removeWatches(path)  # they would report the old paths
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) or path in self._roots:
+                return
+        elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            if not _skipPatt.search(name):
+                new = {}
+                for dirpath in self._scanTree(path, new):
+                    self._addWatch(dirpath)
+                if not self.includedirs or not self._selected(name):
+                    new.pop(path, None)
+                self.snapshot.update(new)
+                changed.update(new)
+        elif path in self._roots or self._selected(name) and (self.includedirs or not mask & IN_ISDIR):
+            if self._stat(path, self.snapshot):
+                changed.add(path)
+        # directory mtimes change with their entries
+        parent = os.path.dirname(path)
+        if parent in self.snapshot and mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+            if self._stat(parent, self.snapshot):
+                changed.add(parent)
+
+    def _rescan(self, changed, removed):
+        old = self.snapshot
+        self.snapshot = self._scan()
+        changed.update(p for p, m in self.snapshot.iteritems() if old.get(p) != m)
+        removed.update(p for p in old if p not in self.snapshot)
+
+    def _raise(self, err=None):
+        if err is None:
+            err = ctypes.get_errno()
+        raise OSError(err, "inotify: %s" % os.strerror(err))
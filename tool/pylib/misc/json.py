@@ -20,24 +20,88 @@
 
 ##
 # An abstraction layer over the Json package we're using (e.g. simplejson)
+#
+# Decoding takes a fast path first: comments are removed with a tokenizer
+# that knows about strings, and the text is decoded with the json module of
+# the Python library (which has a C scanner). demjson is only used where that
+# fails, which gives the leniency (trailing commas, unquoted keys, ...) and
+# the error messages we had before. Numbers are decoded like demjson does, so
+# both paths return the same data.
+#
+# The files read with loadStripComments() (the configs) are kept in a cache
+# by the hash of their content, so configs that are included several times,
+# or re-read by a long-running generator, are prepared only once.
 ##
 
+from __future__ import absolute_import
+
 import sys, os, re, string, types, codecs
 import simplejson as sjson
 import demjson as djson
+from misc import securehash as sha
+
+try:
+    import json as fastjson  # the library module, not this one
+except ImportError:
+    fastjson = sjson
 
 dumps = sjson.dumps
 dump = sjson.dump
-#loads = sjson.loads
-loads = djson.decode
-def load(path, **kwargs):
-    s = codecs.open(path, "r", "utf-8").read()
-    return loads(s, **kwargs)
 
 DecodeError = djson.JSONDecodeError
 #DecodeError = ValueError  # for sjson
 EncodeError = TypeError # for sjson
 
+
+##
+# Numbers as demjson decodes them: "-0" is a float, a number with an exponent
+# but without a fraction is an integer, and one with many digits a Decimal
+# (non-integers are rare enough in our files to leave them to demjson)
+
+def _parseInt(s):
+    n = int(s)
+    if n == 0 and s.startswith("-"):
+        return -0.0
+    return n
+
+def _parseFloat(s):
+    return djson.decode(s)
+
+_fastDecoder = fastjson.JSONDecoder(parse_int=_parseInt, parse_float=_parseFloat)
+
+##
+# Empty string values as demjson decodes them: as '', not u'' (in place, so
+# the dicts keep their order)
+def _emptyStrings(data):
+    if isinstance(data, dict):
+        for key, val in data.items():
+            data[key] = _emptyStrings(val)
+    elif isinstance(data, list):
+        data[:] = [_emptyStrings(x) for x in data]
+    elif data == u"" and isinstance(data, unicode):
+        return ""
+    return data
+
+def _fastLoads(s):
+    if isinstance(s, str):
+        s = s.decode("utf-8")
+    data = _fastDecoder.decode(s)
+    if '""' in s:
+        data = _emptyStrings(data)
+    return data
+
+def loads(s, **kwargs):
+    if not kwargs:
+        try:
+            return _fastLoads(s)
+        except ValueError:
+            pass
+    return djson.decode(s, **kwargs)
+
+def load(path, **kwargs):
+    s = codecs.open(path, "r", "utf-8").read()
+    return loads(s, **kwargs)
+
 ##
 # default compact encoding to serialize JS code
 #
@@ -49,18 +113,53 @@ def dumpsPretty(data, **kwargs):
     return dumps(data, ensure_ascii=False, indent=2, separators=(', ', ' : '), **kwargs)
 
 
-_eolComment = re.compile(r'(?<![a-zA-Z]:)//.*$', re.M)
-_mulComment = re.compile(r'/\*.*?\*/', re.S)
+##
+# Tokens of a JSON text with comments: the comments, and the strings (which
+# may contain "//" or "/*"); everything else is left alone. A comment is
+# replaced by a blank, as it separates tokens.
+_commentTokens = re.compile(r'''
+      "(?:[^"\\\n]|\\.)*"      # double-quoted string
+    | '(?:[^'\\\n]|\\.)*'      # single-quoted string (not JSON, but demjson takes it)
+    | (//[^\n]*)                # eol comment
+    | (/\*.*?\*/)               # multi-line comment
+''', re.S | re.X)
+
+def _blankComment(mo):
+    if mo.group(1) or mo.group(2):
+        return " "
+    return mo.group(0)
 
-def loadsStripComments_1(s, **kwargs):
-    b = _eolComment.sub('',s)
-    b = _mulComment.sub('',b)
-    return sjson.loads(b, **kwargs)
+def stripComments(s):
+    if "/" not in s:
+        return s
+    return _commentTokens.sub(_blankComment, s)
 
 def loadsStripComments(s, **kwargs):
+    if not kwargs:
+        try:
+            return _fastLoads(stripComments(s))
+        except ValueError:
+            pass
     return djson.decode(s, **kwargs)
 
+##
+# Files with comments, {content hash: the text without comments}, for those
+# the fast path takes. Stripping the comments is most of the work there, and
+# decoding the text again (rather than copying the data of the first time)
+# gives every caller data of its own, with the dicts in the same order.
+_stripped = {}
+
 def loadStripComments(path, **kwargs):
     s = codecs.open(path, "r", "utf-8").read()
-    return loadsStripComments(s, **kwargs)
-
+    if kwargs:
+        return loadsStripComments(s, **kwargs)
+    key = sha.getHash(s.encode("utf-8"))
+    if key in _stripped:
+        return _fastLoads(_stripped[key])
+    stripped = stripComments(s)
+    try:
+        data = _fastLoads(stripped)
+    except ValueError:
+        return djson.decode(s)
+    _stripped[key] = stripped
+    return data
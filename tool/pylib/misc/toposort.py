@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+##
+# toposort -- ordering of nodes by their dependencies
+#
+# A DepsGraph is built from a list of nodes and a function returning the
+# dependencies of a node, which is called once per node; dependencies that
+# are not in the list are ignored. sort() returns the nodes so that each node
+# follows its dependencies, in O(nodes + edges). The order is stable: the
+# nodes are taken in list order, each preceded by those of its dependencies
+# (in their order) that are not placed yet, so a list that is sorted already
+# comes out unchanged.
+#
+# A cycle is reported with its exact chain of nodes, [a, b, ..., a], where
+# each node depends on the next.
+##
+
+
+class CycleError(RuntimeError):
+
+    def __init__(self, chain):
+        self.chain = chain
+        RuntimeError.__init__(self, "Circular dependencies: %s" % " -> ".join(map(str, chain)))
+
+
+class DepsGraph(object):
+
+    def __init__(self, nodes, depsOf):
+        self.nodes = []  # [node], without duplicates
+        index = {}       # {node: position in self.nodes}
+        for node in nodes:
+            if node not in index:
+                index[node] = len(self.nodes)
+                self.nodes.append(node)
+        self.edges = [[index[x] for x in depsOf(node) if x in index] for node in self.nodes]
+
+    ##
+    # The nodes, each following its dependencies. On a cycle, CycleError is
+    # raised; or, with <onCycle>, onCycle(chain) is called and the closing
+    # dependency is skipped.
+    def sort(self, onCycle=None):
+        nodes, edges = self.nodes, self.edges
+        result = []
+        state  = [0] * len(nodes)  # 0: unvisited, 1: on the path, 2: placed
+        path   = []  # node positions, each depending on the next
+        for root in xrange(len(nodes)):
+            if state[root]:
+                continue
+            state[root] = 1
+            path.append(root)
+            stack = [iter(edges[root])]
+            while stack:
+                for dep in stack[-1]:
+                    if state[dep] == 0:
+                        state[dep] = 1
+                        path.append(dep)
+                        stack.append(iter(edges[dep]))
+                        break
+                    elif state[dep] == 1:
+                        chain = [nodes[x] for x in path[path.index(dep):]] + [nodes[dep]]
+                        if onCycle is None:
+                            raise CycleError(chain)
+                        onCycle(chain)
+                else:
+                    stack.pop()
+                    node = path.pop()
+                    state[node] = 2
+                    result.append(nodes[node])
+        return result
+
+    ##
+    # The chains of the cycles sort() runs into
+    def cycles(self):
+        result = []
+        self.sort(result.append)
+        return result
@@ -119,13 +119,9 @@ def _getSortedCopy(entries):
 # count bits in an int - long seems to work fine too
 
 def countBitsOn(x):
-    b   = 0
-    bit = 1
-    while bit <= x:
-        b += int(x & bit > 0)
-        bit = bit << 1
-
-    return b
+    if x <= 0:
+        return 0
+    return bin(x).count("1")
 
 ##
 # detect powers of 2
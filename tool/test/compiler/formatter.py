@@ -0,0 +1,56 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from ecmascript.frontend import tokenizer, treegenerator_3
+from ecmascript.backend import formatter_3
+
+##
+# <text> as the pretty-print job formats it (s. CodeGenerator.runPrettyPrinting)
+def prettyPrint(text):
+    tree = treegenerator_3.createFileTree(tokenizer.Tokenizer().parseStream(text, "foo.Bar"), "foo.Bar")
+    options = formatter_3.FormatterOptions()
+    formatter_3.defaultOptions(options)
+    return u"".join(formatter_3.formatNode(tree, options, [u""]))
+
+class TestFormatter(unittest.TestCase):
+
+    def testCommentAfterComment(self):
+        # a comment after another one on its line is a trailing comment of that
+        # line, so it is padded like one (the former tokenizer glued them:
+        # "/* a */// b")
+        self.failUnlessEqual(prettyPrint(u"a();\n/* a */ // b\nc();\n"),
+            u"a();\n\n/* a */  // b\nc();\n")
+        self.failUnlessEqual(prettyPrint(u"function f() {\n  a();\n  /* a */ // b\n  c();\n}\n"),
+            u"function f()\n{\n  a();\n\n  /* a */  // b\n  c();\n}\n")
+        self.failUnlessEqual(prettyPrint(u"/* a */ /* b */\nc();\n"),
+            u"/* a */  /* b */\nc();\n")
+
+    def testCommentsAfterCode(self):
+        self.failUnlessEqual(prettyPrint(u"a(); /* a */ // b\nc();\n"),
+            u"a();\n\n/* a */  // b\nc();\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
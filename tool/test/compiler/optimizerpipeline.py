@@ -0,0 +1,106 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from ecmascript.frontend import tokenizer, treegenerator
+from ecmascript.frontend.treegenerator import PackerFlags as pp
+from ecmascript.transform.optimizer import pipeline, commentoptimizer, variantoptimizer
+from ecmascript.transform.optimizer import basecalloptimizer, privateoptimizer
+
+source = u"""
+/* leading comment */
+qx.Class.define("foo.Bar", {
+  extend : qx.core.Object,
+  construct : function () {
+    this.base(arguments, 1); // base call
+    this.__baz = qx.core.Environment.get("qx.debug") ? 1 : 2;
+  },
+  members : {
+    __baz : null,
+    getBaz : function () {
+      var f = function () { return this.base(arguments); };
+      qx.Class.define("foo.Nested", { statics : { a : function () { this.base(arguments); } } });
+      return this.base(arguments) + this.__baz;
+    }
+  },
+  statics : {
+    s : function () { return this.base(arguments); }
+  }
+});
+"""
+
+variants = {"qx.debug" : False}
+
+def parse(text):
+    tokens = tokenizer.Tokenizer().parseStream(text, "foo.Bar")
+    return treegenerator.createFileTree(tokens, "foo.Bar")
+
+class TestOptimizerPipeline(unittest.TestCase):
+
+    def optimizeCombined(self, tree, privatesMap):
+        passes = pipeline.Pipeline()
+        passes.add(*commentoptimizer.passes())
+        passes.add(*variantoptimizer.passes(variants, "foo.Bar"))
+        passes.add(*basecalloptimizer.passes())
+        passes.add(*privateoptimizer.passes("foo.Bar", privatesMap))
+        return passes, passes.run(tree)
+
+    def testSameAsSeparately(self):
+        tree = parse(source)
+        commentoptimizer.patch(tree)
+        variantoptimizer.search(tree, variants, "foo.Bar")
+        basecalloptimizer.patch(tree)
+        privates = {}
+        privateoptimizer.patch(tree, "foo.Bar", privates)
+
+        privatesCombined = {}
+        _, combined = self.optimizeCombined(parse(source), privatesCombined)
+        self.failUnlessEqual(combined.toJS(pp), tree.toJS(pp))
+        self.failUnlessEqual(privatesCombined, privates)
+        self.failUnless("qx.core.Object.prototype.getBaz.call(this)" in combined.toJS(pp))
+
+    def testWalks(self):
+        passes, _ = self.optimizeCombined(parse(source), {})
+        self.failUnlessEqual([[x.name for x in group] for group in passes.groups()],
+            [["comments", "variants"], ["basecalls", "privates"], ["privates-update"]])
+
+        passes = pipeline.Pipeline()
+        passes.add(*commentoptimizer.passes())
+        passes.add(*basecalloptimizer.passes())
+        passes.add(pipeline.Step("step", lambda tree: tree))
+        passes.add(*privateoptimizer.passes("foo.Bar", {}))
+        self.failUnlessEqual([[x.name for x in group] for group in passes.groups()],
+            [["comments", "basecalls"], ["step"], ["privates"], ["privates-update"]])
+
+    def testLeaveOrder(self):
+        order = []
+        passes = pipeline.Pipeline()
+        passes.add(pipeline.Pass("test", enter={None : lambda n: order.append("+" + n.type)},
+            leave={"constant" : lambda n: order.append("-" + n.type)}))
+        passes.run(parse(u"a = 1;"))
+        self.failUnless(order.index("-constant") == order.index("+constant") + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from ecmascript.frontend import tokenizer, treegenerator
+from ecmascript.frontend.SyntaxException import SyntaxException
+
+def tokenize(text):
+    return [x for x in tokenizer.Tokenizer().parseStream(text, "foo.Bar") if x.type != "white"]
+
+class TestTokenizer(unittest.TestCase):
+
+    def testTokens(self):
+        toks = tokenize(u"var s = 'a\\'\nb', x = a.delete / 2;")
+        self.failUnlessEqual([(x.type, x.source, x.detail) for x in toks], [
+            ("reserved", "var", "VAR"), ("name", "s", "public"), ("token", "=", "ASSIGN"),
+            ("string", "a\\'\nb", "singlequotes"), ("token", ",", "COMMA"),
+            ("name", "x", "public"), ("token", "=", "ASSIGN"), ("name", "a", "public"),
+            ("token", ".", "DOT"), ("name", "delete", "public"), ("token", "/", "DIV"),
+            ("number", "2", "int"), ("token", ";", "SEMICOLON"), ("eof", "", "")])
+        # the line count includes the line break in the string
+        self.failUnlessEqual(toks[-1].line, 2)
+
+    def testRegexp(self):
+        toks = tokenize(u"a = (b) / c /* d */ / e; return /* f */ /[/]\\//g.test(x);")
+        self.failUnlessEqual([x.source for x in toks if x.source[:1] == "/"],
+            ["/", "/* d */", "/", "/* f */", "/[/]\\//g"])
+        self.failUnlessEqual(toks[-8].type, "regexp")
+
+    def testComments(self):
+        toks = tokenize(u"a(); // after\n/** before */\nb();")
+        comments = [x for x in toks if x.type == "comment"]
+        self.failUnlessEqual([(x.detail, x.begin, x.end, x.connection, x.multiline) for x in comments],
+            [("inline", False, True, "after", False), ("javadoc", True, True, "before", False)])
+
+    def testDictProtocol(self):
+        toks = tokenize(u"// c\na")
+        self.failUnlessEqual(toks[0]["connection"], "before")
+        self.failUnlessEqual(toks[2].get("begin"), None)
+        self.failUnless("begin" in toks[0] and "begin" not in toks[2])
+        self.assertRaises(KeyError, lambda: toks[2]["begin"])
+        self.failUnlessEqual(toks[2].asDict(), {"type" : "name", "source" : "a", "detail" : "public",
+            "line" : 2, "column" : 1, "id" : "foo.Bar"})
+
+    def testCommentAfterComment(self):
+        # a comment is only 'begin' if nothing but white space precedes it on
+        # its line, other comments included
+        for text, expected in (
+            (u"/*a*//*b*/ c;",    [(True, False, "before"), (False, False, "before")]),
+            (u"/*a*/ /*b*/\nc;",  [(True, False, "before"), (False, True, "after")]),
+            (u"/*a*/ // b\nc;",   [(True, False, "before"), (False, True, "after")])):
+            comments = [x for x in tokenize(text) if x.type == "comment"]
+            self.failUnlessEqual([(x.begin, x.end, x.connection) for x in comments], expected)
+            # both comments still go to the identifier after them
+            tree = treegenerator.createFileTree(tokenizer.Tokenizer().parseStream(text, "foo.Bar"))
+            ident = tree.getAllChildrenOfType("identifier")[0]
+            self.failUnlessEqual([(x.get("connection"), x.get("begin")) for x in ident.comments],
+                [(c, b) for b, _, c in expected])
+
+    def testErrors(self):
+        for text, msg in (
+            (u"a = 'b",     u"Unterminated string: 'b' (foo.Bar:1)"),
+            (u"/* a",       u"Unterminated multi-line comment:\n ' a' (foo.Bar:1)"),
+            (u"a = /b\n/;", u"Unterminated regexp literal: 'b\n' (foo.Bar:1)")):
+            try:
+                tokenize(text)
+            except SyntaxException, e:
+                self.failUnlessEqual(e.args[0], msg)
+            else:
+                self.fail("no SyntaxException for %r" % text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+import cPickle as pickle
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from ecmascript.frontend import tokenizer, treegenerator, treecodec, tree
+from ecmascript.frontend.treegenerator import PackerFlags as pp
+from ecmascript.transform.check import scopes
+
+source = u"""
+/* leading comment */
+qx.Class.define("foo.Bar", {
+  extend : qx.core.Object,
+  members : {
+    baz : function (a, /* in args */ b) {
+      var c = a + b; // trailing
+      return function () { return c * 2; };
+    }
+  }
+});
+"""
+
+def parse(text):
+    tokens = tokenizer.Tokenizer().parseStream(text, "foo.Bar")
+    return scopes.create_scopes(treegenerator.createFileTree(tokens, "foo.Bar"))
+
+def nodes(root):
+    result, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        result.append(node)
+        for key in treecodec.SLOTS:
+            stack.extend(reversed(getattr(node, key, [])))
+    return result
+
+class TestTreeCodec(unittest.TestCase):
+
+    def testRoundTrip(self):
+        orig = parse(source)
+        copy = treecodec.loads(treecodec.dumps(orig))
+        origNodes, copyNodes = nodes(orig), nodes(copy)
+        self.failUnlessEqual(len(origNodes), len(copyNodes))
+        position = dict((id(n), i) for i, n in enumerate(copyNodes))
+        for o, c in zip(origNodes, copyNodes):
+            self.failUnless(o.__class__ is c.__class__)
+            self.failUnlessEqual(o.type, c.type)
+            self.failUnlessEqual(o.attributes, c.attributes)
+            self.failUnlessEqual(sorted(o.__dict__), sorted(c.__dict__))
+            if c.parent is not None:
+                self.failUnless(c in c.parent.children)
+        # annotations refer to the new nodes
+        self.failUnless(id(copy.scope.node) in position)
+
+    def testPlainNodes(self):
+        root = tree.Node("file")
+        child = tree.Node("identifier")
+        child.set("value", u"foo")
+        root.addChild(child)
+        copy = treecodec.loads(treecodec.dumps(root))
+        self.failUnlessEqual(copy.children[0].get("value"), u"foo")
+        self.failUnless(copy.children[0].parent is copy)
+
+    def testSlottedNodes(self):
+        orig = parse(source)
+        leaf = orig.getAllChildrenOfType("constant")[0]
+        self.failUnless(leaf.children is tree.NO_CHILDREN)
+        self.failIf(tree.extraAttributes(leaf))
+        node = tree.Node("identifier")
+        self.failIf(node.hasAttributes())
+        self.failUnless(node._attributes is None)
+        node.addChild(tree.Node("constant"))
+        self.failUnlessEqual(node.children[0].parent, node)
+        for proto in (0, 2):
+            copy = pickle.loads(pickle.dumps(orig, proto))
+            self.failUnlessEqual(copy.toJS(pp), orig.toJS(pp))
+            self.failUnless(copy.scope.node is copy)
+        clone = leaf.clone()
+        clone.set("value", u"other")
+        self.failIfEqual(leaf.get("value"), u"other")
+
+    def testSharedNode(self):
+        root = tree.Node("file")
+        child = tree.Node("identifier")
+        root.children = [child, child]
+        self.assertRaises(treecodec.TreeCodecError, treecodec.dumps, root)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from ecmascript.frontend import tree, treeutil
+
+##
+# A tree of nodes named after their path: "a" has the children "a0", "a1"...
+def build(spec, name="a"):
+    node = tree.Node(name)
+    for i, child in enumerate(spec):
+        node.addChild(build(child, name + str(i)))
+    return node
+
+TREE = [[[], []], [], [[]]]
+
+class TestTreeTraversal(unittest.TestCase):
+
+    def testOrder(self):
+        node = build(TREE)
+        self.failUnlessEqual([x.type for x in tree.preorderIter(node)],
+            ["a", "a0", "a00", "a01", "a1", "a2", "a20"])
+        self.failUnlessEqual([x.type for x in tree.postorderIter(node)],
+            ["a00", "a01", "a0", "a1", "a20", "a2", "a"])
+        self.failUnlessEqual([x.type for x in tree.preorderIter(node, ("a", "a01", "a2"))],
+            ["a", "a01", "a2"])
+        prune = lambda x: x.type == "a0"
+        self.failUnlessEqual([x.type for x in tree.preorderIter(node, prune=prune)],
+            ["a", "a0", "a1", "a2", "a20"])
+        self.failUnlessEqual([x.type for x in tree.postorderIter(node, prune=prune)],
+            ["a0", "a1", "a20", "a2", "a"])
+        self.failUnlessEqual([x.type for x in node.getAllChildrenOfType("a20")], ["a20"])
+
+    def testSafe(self):
+        node = build(TREE)
+        seen = []
+        for x in tree.preorderIter(node, safe=True):
+            seen.append(x.type)
+            if x.type == "a0":
+                node.removeChild(x.parent.getChild("a1"))
+                x.removeAllChildren()
+        # the children of "a" were taken before, those of "a0" after the changes
+        self.failUnlessEqual(seen, ["a", "a0", "a1", "a2", "a20"])
+        self.failUnlessEqual([x.type for x in tree.preorderIter(node)], ["a", "a0", "a2", "a20"])
+
+    def testDeepTree(self):
+        node = top = tree.Node("a")
+        for i in range(sys.getrecursionlimit() * 2):
+            child = tree.Node("a")
+            node.addChild(child)
+            node = child
+        self.failUnlessEqual(len(list(tree.preorderIter(top))), sys.getrecursionlimit() * 2 + 1)
+        self.failUnlessEqual(len(list(tree.postorderIter(top))), sys.getrecursionlimit() * 2 + 1)
+        self.failUnless(top.contains(node))
+
+    def testVisitor(self):
+        class Visitor(treeutil.NodeVisitor):
+            def __init__(self):
+                super(Visitor, self).__init__()
+                self.visited = []
+            def visit_a0(self, node):
+                self.visited.append(node.type)
+            def visit_a20(self, node):
+                self.visited.append(node.type)
+
+        visitor = Visitor()
+        visitor.visit(build(TREE))
+        # no descent below handled nodes
+        self.failUnlessEqual(visitor.visited, ["a0", "a20"])
+        self.failUnless(treeutil.visitorMethod(visitor, "a0") is Visitor.visit_a0.im_func)
+        self.failUnless(treeutil.visitorMethod(visitor, "a1") is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, tempfile, time, pickle
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from misc.dirsnapshot import DirSnapshot
+
+class TestDirSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        os.makedirs(self.path("a/b"))
+        os.mkdir(self.path(".svn"))
+        for name in ("foo.js", "a/bar.js", "a/b/baz.js", ".svn/entries"):
+            self.writeFile(name)
+        self.past = time.time() - 100
+        for dirpath, _, _ in os.walk(self.tempDir):  # so the listings can be trusted
+            os.utime(dirpath, (self.past, self.past))
+        self.snapshot = DirSnapshot(self.tempDir)
+        self.snapshot.update()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def path(self, name):
+        return os.path.join(self.tempDir, name)
+
+    def writeFile(self, name, mtime=None):
+        fobj = open(self.path(name), "w")
+        fobj.write(name)
+        fobj.close()
+        if mtime is not None:
+            os.utime(self.path(name), (mtime, mtime))
+
+    def update(self):
+        self.snapshot = pickle.loads(pickle.dumps(self.snapshot))  # as if from the cache
+        self.snapshot.update()
+        return self.snapshot
+
+
+    def testFiles(self):
+        self.failUnlessEqual(sorted(self.snapshot.iterFiles()),
+            [self.path(x) for x in ("a/b/baz.js", "a/bar.js", "foo.js")])
+        self.failUnlessEqual(self.snapshot.changed, set(self.snapshot.files))
+        snapshot = self.update()
+        self.failIf(snapshot.changed or snapshot.removed or snapshot.modified)
+
+    def testChanges(self):
+        later = time.time() + 100
+        self.writeFile("a/b/baz.js", later)
+        os.unlink(self.path("a/bar.js"))
+        snapshot = self.update()
+        self.failUnlessEqual(snapshot.changed, set([self.path("a/b/baz.js")]))
+        self.failUnlessEqual(snapshot.removed, set([self.path("a/bar.js")]))
+        self.failUnlessEqual(snapshot.youngest(), (self.path("a/b/baz.js"), os.stat(self.path("a/b/baz.js")).st_mtime))
+
+    def testUnchangedListing(self):
+        # the listing of a directory with an unchanged mtime is re-used
+        self.writeFile("a/new.js")
+        os.utime(self.path("a"), (self.past, self.past))
+        self.failIf(self.path("a/new.js") in self.update().files)
+        os.utime(self.path("a"), None)
+        self.failUnless(self.path("a/new.js") in self.update().changed)
+
+    def testSymlinks(self):
+        if not hasattr(os, "symlink"):
+            return
+        os.symlink(self.path("a"), self.path("c"))
+        os.symlink(self.path("a"), self.path("d"))
+        os.symlink(self.tempDir, self.path("a/b/up"))  # a cycle
+        snapshot = self.update()
+        # both links to 'a' are listed, the cycle is not followed
+        for name in ("c", "d"):
+            self.failUnless(self.path(name + "/b/baz.js") in snapshot.files)
+        self.failIf(self.path("a/b/up") in snapshot.dirs)
+        self.failUnlessEqual(len(snapshot.files), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, tempfile, time
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from misc import filewatch
+
+class TestPollingWatcher(unittest.TestCase):
+
+    watcherClass = filewatch.PollingWatcher
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.writeFile("foo.js")
+        self.writeFile("foo.txt")
+        os.mkdir(os.path.join(self.tempDir, ".git"))
+        self.writeFile(".git/HEAD")
+        self.watcher = self.watcherClass([self.tempDir], r'\.js$')
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.tempDir)
+
+    def path(self, name):
+        return os.path.join(self.tempDir, name)
+
+    def writeFile(self, name, mtime=None):
+        fobj = open(self.path(name), "w")
+        fobj.write(name)
+        fobj.close()
+        if mtime is not None:
+            os.utime(self.path(name), (mtime, mtime))
+
+    def update(self):
+        return self.watcher.update(0.1)
+
+
+    def testSnapshot(self):
+        self.failUnlessEqual(sorted(self.watcher.snapshot), [self.tempDir, self.path("foo.js")])
+        self.failUnlessEqual(self.watcher.changedSince(time.time() + 100), [])
+
+    def testChanges(self):
+        later = time.time() + 100
+        self.writeFile("foo.js", later)
+        self.writeFile("foo.txt", later)
+        self.failUnlessEqual(self.update(), ([self.path("foo.js")], []))
+        self.failUnlessEqual(self.watcher.changedSince(later), [(self.path("foo.js"), os.stat(self.path("foo.js")).st_mtime)])
+        self.failUnlessEqual(self.update(), ([], []))
+
+    def testNewDirectory(self):
+        os.mkdir(self.path("sub"))
+        self.writeFile("sub/bar.js")
+        changed, _ = self.update()
+        self.failUnless(self.path("sub/bar.js") in changed)
+        self.writeFile("sub/bar.js", time.time() + 100)
+        self.failUnlessEqual(self.update(), ([self.path("sub/bar.js")], []))
+
+    def testRemoved(self):
+        os.unlink(self.path("foo.js"))
+        _, removed = self.update()
+        self.failUnlessEqual(removed, [self.path("foo.js")])
+        self.failIf(self.path("foo.js") in self.watcher.snapshot)
+
+
+class TestInotifyWatcher(TestPollingWatcher):
+
+    watcherClass = filewatch.InotifyWatcher
+
+    def testNoDiskAccess(self):
+        self.writeFile("foo.js", time.time() + 100)
+        self.update()
+        shutil.rmtree(self.tempDir)  # without events, the snapshot is unchanged
+        os.mkdir(self.tempDir)
+        self.watcher.close()
+        self.failUnless(self.watcher.changedSince(time.time() + 50))
+
+
+if __name__ == '__main__':
+    try:
+        filewatch.InotifyWatcher([])
+    except (OSError, NotImplementedError):
+        del TestInotifyWatcher
+    unittest.main()
@@ -0,0 +1,72 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, codecs, tempfile, shutil
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+import demjson
+from misc import json
+
+CONFIG = u'''{
+  // a comment, with "quotes" and /* a comment start
+  "let" : {
+    "URL" : "http://qooxdoo.org/*", /* not // an eol comment */
+    "EMPTY" : "",
+    "N" : [1, -0, 1e3, 2.5, 12345678901234567890]
+  },
+  "jobs" : { "build" : { "desc" : "\u00fcber" } }
+}
+'''
+
+class TestJson(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempDir, "config.json")
+        codecs.open(self.path, "w", "utf-8").write(CONFIG)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def failUnlessSame(self, a, b):
+        self.failUnlessEqual(repr(a), repr(b))  # types and dict order as well
+
+    def testLikeDemjson(self):
+        data = json.loadsStripComments(CONFIG)
+        self.failUnlessSame(data, demjson.decode(CONFIG))
+        self.failUnlessEqual(data["let"]["URL"], "http://qooxdoo.org/*")
+
+    def testFallback(self):
+        # not JSON, but taken by demjson
+        for text in (u'{"a" : [1, 2,],}', u"{a : 'b'}", u"[0x10]"):
+            self.failUnlessSame(json.loads(text), demjson.decode(text))
+        self.failUnlessRaises(ValueError, json.loads, u'{"a" : }')
+
+    def testCachedFile(self):
+        first = json.loadStripComments(self.path)
+        first["jobs"]["build"]["desc"] = "changed"
+        second = json.loadStripComments(self.path)
+        self.failUnlessSame(second, demjson.decode(CONFIG))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+import random
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from misc.toposort import DepsGraph, CycleError
+
+##
+# The recursive sort DependencyLoader.sortClasses() used before DepsGraph,
+# for comparison
+def sortRec(nodes, deps):
+    result = []
+    path   = []
+    def visit(node):
+        if node in result:
+            return
+        if node not in path:
+            path.append(node)
+        for dep in deps.get(node, []):
+            if dep in nodes and dep not in result:
+                if dep in path:
+                    raise RuntimeError("Circular class dependencies")
+                visit(dep)
+        if node not in result:
+            path.remove(node)
+            result.append(node)
+    for node in nodes:
+        visit(node)
+    return result
+
+class TestDepsGraph(unittest.TestCase):
+
+    def sort(self, nodes, deps, **kwargs):
+        return DepsGraph(nodes, lambda x: deps.get(x, [])).sort(**kwargs)
+
+    def testStable(self):
+        self.failUnlessEqual(self.sort("abcd", {}), list("abcd"))
+        self.failUnlessEqual(self.sort("abcd", {"d" : "a"}), list("abcd"))
+
+    def testDepsFirst(self):
+        deps = {"a" : "dc", "c" : "x"}  # "x" is not a node
+        self.failUnlessEqual(self.sort("abcd", deps), list("dcab"))
+        self.failUnlessEqual(self.sort("aabc", deps), list("cab"))
+
+    def testDeepChain(self):
+        nodes = range(10000)
+        deps  = dict((x, [x + 1]) for x in nodes)
+        self.failUnlessEqual(self.sort(nodes, deps), list(reversed(nodes)))
+
+    def testCycle(self):
+        deps = {"a" : "b", "b" : "cd", "d" : "b"}
+        try:
+            self.sort("abcd", deps)
+        except CycleError, e:
+            self.failUnlessEqual(e.chain, list("bdb"))
+        else:
+            self.fail("no CycleError")
+        chains = []
+        self.failUnlessEqual(self.sort("abcd", deps, onCycle=chains.append), list("cdba"))
+        self.failUnlessEqual(chains, [list("bdb")])
+        self.failUnlessEqual(DepsGraph("abcd", lambda x: deps.get(x, [])).cycles(), chains)
+
+    def testLikeRecursiveSort(self):
+        rand = random.Random(42)
+        nodes = range(12)
+        for i in xrange(500):
+            # graphs of up to 20 edges, which may form cycles; some deps are
+            # not nodes
+            deps = {}
+            for j in xrange(rand.randint(0, 20)):
+                deps.setdefault(rand.choice(nodes), []).append(rand.randint(0, 14))
+            order = nodes[:]
+            rand.shuffle(order)
+            try:
+                expected = sortRec(order, deps)
+            except RuntimeError:
+                self.assertRaises(CycleError, self.sort, order, deps)
+            else:
+                self.failUnlessEqual(self.sort(order, deps), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, tempfile, time
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from generator import Context
+from generator.runtime import Cache as CacheModule
+from generator.runtime.Cache import Cache
+from generator.runtime.InterruptRegistry import InterruptRegistry
+from generator.runtime.Log import Log
+from generator.output.Script import Script
+from generator.output.BuildManifest import BuildManifest
+
+class FakeJob(object):
+    name = "build-script"
+    def __init__(self, data):
+        self.data = data
+    def getData(self):
+        return self.data
+
+class FakeClass(object):
+    def __init__(self, id, path):
+        self.id = id
+        self.path = path
+
+class TestBuildManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        Context.console = Log()
+        self.cache = Cache(os.path.join(self.tempDir, "cache"),
+            **{ 'interruptRegistry' : InterruptRegistry(), 'console' : Context.console })
+        self.classes = {}
+        for classId in ("foo.Bar", "foo.Baz"):
+            path = os.path.join(self.tempDir, classId + ".js")
+            self.writeFile(path, "qx.Class.define('%s', {});" % classId)
+            self.classes[classId] = FakeClass(classId, path)
+        self.script = Script()
+        self.script.buildType = "build"
+
+    def tearDown(self):
+        CacheModule.memcache.clear()
+        shutil.rmtree(self.tempDir)
+
+    def writeFile(self, path, content, mtime=None):
+        fobj = open(path, "w")
+        fobj.write(content)
+        fobj.close()
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def manifest(self, config={"include" : ["foo.*"]}):
+        manifest = BuildManifest(self.cache, Context.console, FakeJob(config), self.script)
+        manifest.checkClasses(self.classes)
+        return manifest
+
+
+    def testChangedClasses(self):
+        manifest = self.manifest()
+        self.failUnlessEqual(manifest.reason, "no build manifest")
+        manifest.save()
+        self.failUnlessEqual(self.manifest().changed, set())
+        path = self.classes["foo.Baz"].path
+        self.writeFile(path, "qx.Class.define('foo.Baz', {});", time.time() + 100)
+        self.failUnlessEqual(self.manifest().changed, set(["foo.Baz"]))
+        self.failUnlessEqual(self.manifest({}).reason, "configuration changed")
+
+    def testFileUnchanged(self):
+        path = os.path.join(self.tempDir, "app.js")
+        manifest = self.manifest()
+        self.failIf(manifest.fileUnchanged(path, u"code"))
+        self.writeFile(path, "code")
+        manifest.save()
+        self.failUnless(self.manifest().fileUnchanged(path, u"code"))
+        self.failIf(self.manifest().fileUnchanged(path, u"other code"))
+        self.writeFile(path, "written by someone else", time.time() + 100)
+        self.failIf(self.manifest().fileUnchanged(path, u"code"))
+
+
+if __name__ == '__main__':
+    unittest.main()
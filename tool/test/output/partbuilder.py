@@ -0,0 +1,107 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime.Log import Log
+from generator.code.DependencyItem import DependencyItem
+from generator.code.DependencyLoader import DependencyLoader
+from generator.output.PartBuilder import PartBuilder
+from generator.output.Script import Script
+
+# {class id: (load deps, run deps)}
+CLASSES = {
+    "app.Application" : (["qx.core.Object", "qx.ui.Widget"], ["app.Boot", "app.Extra"]),
+    "app.Boot"        : (["qx.core.Object", "qx.event.Manager"], ["qx.util.Format"]),
+    "app.Extra"       : (["qx.ui.Widget", "qx.util.Json", "qx.event.Manager"], ["app.ExtraView"]),
+    "app.ExtraView"   : (["qx.ui.Widget", "qx.util.Format"], []),
+    "qx.core.Object"  : (["qx.Bootstrap", "qx.core.Property"], []),
+    "qx.core.Property": (["qx.Bootstrap"], []),
+    "qx.Bootstrap"    : ([], []),
+    "qx.event.Manager": (["qx.core.Object", "qx.util.Format"], []),
+    "qx.ui.Widget"    : (["qx.core.Object", "qx.event.Manager"], ["qx.util.Format"]),
+    "qx.util.Format"  : (["qx.Bootstrap"], []),
+    "qx.util.Json"    : (["qx.Bootstrap", "qx.util.Format"], []),
+}
+
+##
+# Like generator.code.Class, as far as dependencies go: a cold cache computes
+# the deps, a warm one reads them, in a different (set) order
+class FakeClass(object):
+
+    def __init__(self, id, warm):
+        self.id = id
+        self.warm = warm
+
+    def getCombinedDeps(self, classesAll, variants, config, *args, **kwargs):
+        load, run = CLASSES[self.id]
+        load = [DependencyItem(x, "", self.id, 1) for x in load]
+        run  = [DependencyItem(x, "", self.id, 1) for x in run]
+        if self.warm:
+            load.reverse()
+            run.reverse()
+        return {"load" : load, "run" : run, "ignore" : []}, self.warm
+
+    def dependenciesCached(self, variants):
+        return self.warm
+
+    def __repr__(self):
+        return "<FakeClass:%s>" % self.id
+
+
+class TestPartBuilder(unittest.TestCase):
+
+    def setUp(self):
+        Context.console = Log()
+        Context.jobconf = ExtMap({"compile-options" : {"code" : {"lint-check" : False}}})
+
+    def build(self, warm):
+        classesAll = dict((x, FakeClass(x, warm)) for x in CLASSES)
+        context = {"jobconf" : Context.jobconf}
+        depLoader = DependencyLoader(classesAll, None, Context.console, {}, {}, context)
+        script = Script()
+        script.classesAll = classesAll
+        script.jobconfig = Context.jobconf
+        script.classes = depLoader.getClassList(["app.Application"], [], [], [], script)
+        script.classesObj = [classesAll[x] for x in script.classes]
+        partIncludes = {"boot" : ["app.Application", "app.Boot"], "extra" : ["app.Extra"]}
+        jobconf = ExtMap({"packages" : {"parts" : {"boot" : {}, "extra" : {}}}})
+        _, script = PartBuilder(Context.console, depLoader).getPackages(
+            partIncludes, [], {"jobconf" : jobconf}, script)
+        return (script.classes,
+                sorted((x.name, [p.id for p in x.packages]) for x in script.parts.values()),
+                [(x.id, [c.id for c in x.classes]) for x in script.packagesSorted()])
+
+    def testColdAndWarmCache(self):
+        cold = self.build(warm=False)
+        self.failUnlessEqual(self.build(warm=True), cold)
+        classes, parts, packages = cold
+        self.failUnlessEqual(classes[:3], ["qx.Bootstrap", "qx.core.Property", "qx.core.Object"])
+        self.failUnlessEqual(parts, [("boot", [3]), ("extra", [3, 2])])
+        self.failUnlessEqual(packages[1][1], ["qx.util.Json", "app.Extra", "app.ExtraView"])
+
+
+if __name__ == '__main__':
+    unittest.main()
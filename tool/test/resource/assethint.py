@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, re
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from misc.Trie import Trie
+from generator.resource.AssetHint import AssetHint
+
+RESOURCES = [
+    "qx/icon/Tango/16/apps/office-calendar.png",
+    "qx/icon/Tango/32/apps/office-calendar.png",
+    "qx/icon/Oxygen/16/apps/office-calendar.png",
+    "qx/static/blank.gif",
+    "qx/decoration/Modern/arrows/down.png",
+    "app/test.png",
+    "app/tests/data.json",
+]
+
+##
+# An AssetHint for the @asset <source>, as MClassResources.getAssets() makes
+# them
+def assetHint(source):
+    hint = AssetHint(source)
+    hint.expanded = re.sub(r'\*', ".*", source)
+    hint.regex = re.compile(hint.expanded)
+    return hint
+
+##
+# The resource ids matched by <hint>, looked up under its literal prefix in
+# <index>, as MClassResources.mapResourcesToClasses() does
+def lookup(index, hint):
+    prefixParts = hint.literalPrefix().split("/")[:-1]
+    return sorted(x for x in index.values(prefixParts) if hint.regex.match(x))
+
+class TestAssetHint(unittest.TestCase):
+
+    def setUp(self):
+        self.index = Trie("/")
+        for resId in RESOURCES:
+            self.index.add(resId, resId)
+
+    def testLiteralPrefix(self):
+        for source, prefix in (
+            ("qx/static/blank.gif",    "qx/static/blank"),
+            ("qx/icon/Tango/16/*",     "qx/icon/Tango/16/"),
+            ("qx/icon/*/16/apps/*",    "qx/icon/"),
+            ("qx/deco*",               "qx/deco"),
+            ("app/tests?/data.json",   "app/test"),   # the 's' is optional
+            ("app/test[s]/data.json",  "app/test"),
+            ("*",                      ""),
+            ("qx/(?i)static/*",        ""),  # flags for the whole regex
+            ("qx/static|app",          ""),
+           ):
+            self.failUnlessEqual(assetHint(source).literalPrefix(), prefix, source)
+
+    def testTrieValues(self):
+        self.failUnlessEqual(sorted(self.index.values()), sorted(RESOURCES))
+        self.failUnlessEqual(sorted(self.index.values(["qx", "icon", "Tango"])), RESOURCES[:2])
+        self.failUnlessEqual(sorted(self.index.values(["app", "test.png"])), ["app/test.png"])
+        self.failUnlessEqual(list(self.index.values(["qx", "ico"])), [])  # not a complete part
+        self.failUnlessEqual(list(self.index.values(["nowhere"])), [])
+        # names without values, e.g. directories
+        trie = Trie("/")
+        trie.add("a/b")
+        trie.add("a/b/c", 1, 2)
+        self.failUnlessEqual(list(trie.values(["a"])), [1, 2])
+
+    def testLookup(self):
+        for source in ("qx/static/blank.gif", "qx/icon/Tango/16/*", "qx/icon/*/16/apps/*",
+                       "qx/deco*", "app/tests?/*", "app/test[s]/*", "*", "qx/static|app/*",
+                       "nowhere/*", "qx/icon/Tango/64/*"):
+            hint = assetHint(source)
+            self.failUnlessEqual(lookup(self.index, hint),
+                sorted(x for x in RESOURCES if hint.regex.match(x)), source)
+        # a literal prefix that matches no assets
+        self.failUnlessEqual(lookup(self.index, assetHint("qx/icon/Tango/64/*")), [])
+        self.failUnlessEqual(len(lookup(self.index, assetHint("*"))), len(RESOURCES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, struct, tempfile, time
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from misc import json
+from misc.ExtMap import ExtMap
+from generator import Context
+from generator.runtime import Cache as CacheModule
+from generator.runtime.Cache import Cache
+from generator.runtime.InterruptRegistry import InterruptRegistry
+from generator.runtime.Log import Log
+from generator.resource.Library import Library
+from generator.resource.Image import Image
+
+MANIFEST = {
+    "info" : {},
+    "provides" : {
+        "namespace"   : "app",
+        "encoding"    : "utf-8",
+        "class"       : "source/class",
+        "resource"    : "source/resource",
+        "translation" : "source/translation",
+    }
+}
+
+class TestImageIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.resourceDir = os.path.join(self.tempDir, "source", "resource")
+        os.makedirs(os.path.join(self.resourceDir, "app"))
+        json.dump(MANIFEST, open(self.path("Manifest.json"), "w"))
+        self.writeGif("app/a.gif", 10, 20)
+        self.writeGif("app/b.gif", 30, 40)
+        open(os.path.join(self.resourceDir, "app/c.txt"), "w").write("c")
+
+        Context.console = Log()
+        Context.jobconf = ExtMap({})
+        Context.cache = Cache(self.path("cache"),
+            **{'interruptRegistry' : InterruptRegistry(), 'console' : Context.console})
+
+        # record the images that are analyzed
+        self.analyzed = analyzed = []
+        self.analyzeImage = Image.analyzeImage
+        def analyzeImage(image):
+            analyzed.append(image.id)
+            self.analyzeImage(image)
+        Image.analyzeImage = analyzeImage
+
+    def tearDown(self):
+        Image.analyzeImage = self.analyzeImage
+        Context.cache = None
+        CacheModule.memcache.clear()
+        shutil.rmtree(self.tempDir)
+
+    def path(self, name):
+        return os.path.join(self.tempDir, name)
+
+    def writeGif(self, name, width, height, mtime=None):
+        path = os.path.join(self.resourceDir, name)
+        fobj = open(path, "wb")
+        fobj.write("GIF89a" + struct.pack("<HH", width, height) + "\0\0")
+        fobj.close()
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    ##
+    # Scan the resources with a new Library, as in a new run; returns
+    # {resource id: (width, height, format)} of the images
+    def scan(self):
+        CacheModule.memcache.clear()
+        del self.analyzed[:]
+        lib = Library(self.path("Manifest.json"), Context.console)
+        lib._init_from_manifest()
+        result = {}
+        for res in lib._scanResourcePath():
+            if isinstance(res, Image):
+                result[res.id] = (res.width, res.height, res.format)
+        return result
+
+    def index(self):
+        return Context.cache.read("imginfo-%s" % os.path.abspath(self.resourceDir), memory=True)[0]
+
+
+    def testIndexUsed(self):
+        images = {"app/a.gif" : (10, 20, "gif"), "app/b.gif" : (30, 40, "gif")}
+        self.failUnlessEqual(self.scan(), images)
+        self.failUnlessEqual(sorted(self.analyzed), ["app/a.gif", "app/b.gif"])
+        self.failUnlessEqual(sorted(x[1] for x in self.index().values()), sorted(images.values()))
+        # from the index
+        self.failUnlessEqual(self.scan(), images)
+        self.failUnlessEqual(self.analyzed, [])
+
+    def testImageChanged(self):
+        self.scan()
+        self.writeGif("app/a.gif", 50, 60, time.time() + 100)
+        self.writeGif("app/d.gif", 1, 2)
+        os.unlink(os.path.join(self.resourceDir, "app/b.gif"))
+        self.failUnlessEqual(self.scan(), {"app/a.gif" : (50, 60, "gif"), "app/d.gif" : (1, 2, "gif")})
+        self.failUnlessEqual(sorted(self.analyzed), ["app/a.gif", "app/d.gif"])
+        index = self.index()
+        self.failUnlessEqual(sorted(x[1] for x in index.values()), [(1, 2, "gif"), (50, 60, "gif")])
+        self.scan()
+        self.failUnlessEqual(self.analyzed, [])
+
+    def testNoCache(self):
+        Context.cache = None
+        self.scan()
+        self.failUnlessEqual(len(self.scan()), 2)
+        self.failUnlessEqual(len(self.analyzed), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
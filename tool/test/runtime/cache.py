@@ -0,0 +1,117 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, tempfile, time
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from generator.runtime import Cache as CacheModule
+from generator.runtime.Cache import Cache, MemCache
+from generator.runtime.InterruptRegistry import InterruptRegistry
+from generator.runtime.Log import Log
+
+class TestContentInvalidation(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tempDir, "Foo.js")
+        self.writeSource("qx.Class.define('Foo', {});")
+        self.cache = Cache(os.path.join(self.tempDir, "cache"),
+            **{ 'interruptRegistry' : InterruptRegistry(),
+                'console' : Log(),
+                'cache/invalidation' : "content" })
+
+    def tearDown(self):
+        CacheModule.memcache.clear()
+        CacheModule.digests.clear()
+        shutil.rmtree(self.tempDir)
+
+    def writeSource(self, content, mtime=None):
+        fobj = open(self.source, "w")
+        fobj.write(content)
+        fobj.close()
+        if mtime is not None:
+            os.utime(self.source, (mtime, mtime))
+
+
+    def testTouchedFileStaysValid(self):
+        self.cache.write("tree-foo", "tree", dependsOn=self.source)
+        self.writeSource("qx.Class.define('Foo', {});", time.time() + 100)
+        self.failUnless(self.cache.isValid("tree-foo", self.source))
+        self.failUnlessEqual(self.cache.read("tree-foo", self.source)[0], "tree")
+
+    def testChangedFileIsInvalid(self):
+        self.cache.write("tree-foo", "tree", dependsOn=self.source)
+        self.writeSource("qx.Class.define('Foo', {members:{}});", time.time() + 100)
+        self.failIf(self.cache.isValid("tree-foo", self.source))
+        self.failUnlessEqual(self.cache.read("tree-foo", self.source)[0], None)
+
+    def testSwitchBack(self):
+        self.cache.write("tree-foo", "tree1", dependsOn=self.source)
+        self.writeSource("qx.Class.define('Foo', {members:{}});", time.time() + 100)
+        self.cache.write("tree-foo", "tree2", dependsOn=self.source)
+        self.writeSource("qx.Class.define('Foo', {});", time.time() + 200)
+        self.failUnlessEqual(self.cache.read("tree-foo", self.source)[0], "tree1")
+
+    def testDigestMemo(self):
+        digest = self.cache.digest(self.source)
+        self.failUnlessEqual(CacheModule.digests[self.source][3], digest)
+        self.cache._write_digests(os.getpid())
+        CacheModule.digests.clear()
+        self.cache._read_digests()
+        self.failUnlessEqual(CacheModule.digests[self.source][3], digest)
+
+
+class TestMemCache(unittest.TestCase):
+
+    def setUp(self):
+        self.memcache = MemCache(limit=1000)
+
+    def testEvictsLeastRecentlyUsed(self):
+        self.memcache.put("tree-a", "a" * 400)
+        self.memcache.put("tree-b", "b" * 400)
+        self.memcache.get("tree-a")
+        self.memcache.put("class-c", "c" * 400)
+        self.failUnless("tree-a" in self.memcache)
+        self.failIf("tree-b" in self.memcache)
+        self.failUnless("class-c" in self.memcache)
+        self.failUnless(self.memcache.size() <= 1000)
+        self.failUnlessEqual(self.memcache.stats()["tree"], (1, 0, 1))
+
+    def testKeepsOversizedLatestEntry(self):
+        self.memcache.put("tree-a", "a" * 2000)
+        self.failUnlessEqual(self.memcache.get("tree-a")['content'], "a" * 2000)
+
+    def testFrozenEntriesAreCopies(self):
+        self.memcache.put("tree-a", ["x"], frozen=True)
+        first = self.memcache.get("tree-a")['content']
+        first.append("y")
+        self.failUnlessEqual(self.memcache.get("tree-a")['content'], ["x"])
+
+    def testUnlimited(self):
+        memcache = MemCache()
+        for i in range(100):
+            memcache.put("methoddeps-%d" % i, "x" * 1000)
+        self.failUnlessEqual(len(memcache), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
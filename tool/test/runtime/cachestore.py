@@ -0,0 +1,112 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, tempfile
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from generator.runtime.CacheStore import CacheStore, DATA_FILE, INDEX_FILE
+
+class TestCacheStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.store = CacheStore(self.tempDir)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tempDir)
+
+
+    def testPutGet(self):
+        self.store.put("foo", "bar")
+        self.store.put("baz", "x" * 1000)
+        self.failUnlessEqual(self.store.get("foo")[0], "bar")
+        self.failUnlessEqual(self.store.get("baz")[0], "x" * 1000)
+        self.failUnlessEqual(self.store.get("nope"), (None, None))
+        self.failUnlessEqual(len(self.store), 2)
+
+    def testOverwrite(self):
+        mtime1 = self.store.put("foo", "bar")
+        mtime2 = self.store.put("foo", "baz")
+        self.failUnlessEqual(self.store.get("foo"), ("baz", mtime2))
+        self.failUnless(mtime2 >= mtime1)
+
+    def testReopenWithIndex(self):
+        self.store.put("foo", "bar")
+        self.store.close()
+        self.failUnless(os.path.exists(os.path.join(self.tempDir, INDEX_FILE)))
+        self.store = CacheStore(self.tempDir)
+        self.failUnlessEqual(self.store.get("foo")[0], "bar")
+
+    def testReopenWithoutIndex(self):
+        self.store.put("foo", "bar")
+        self.store.put("foo", "baz")
+        self.store.close()
+        os.unlink(os.path.join(self.tempDir, INDEX_FILE))
+        self.store = CacheStore(self.tempDir)
+        self.failUnlessEqual(self.store.get("foo")[0], "baz")
+
+    def testSeesOtherWriters(self):
+        other = CacheStore(self.tempDir)
+        other.put("foo", "bar")
+        self.failUnlessEqual(self.store.get("foo")[0], "bar")
+        self.store.put("foo", "baz")
+        self.failUnlessEqual(other.get("foo")[0], "baz")
+        other.close()
+
+    def testTornRecord(self):
+        self.store.put("foo", "bar")
+        self.store.close()
+        dataFile = os.path.join(self.tempDir, DATA_FILE)
+        fobj = open(dataFile, "ab")
+        fobj.write("QXCR\x03\x00\x00\x00")  # crashed writer
+        fobj.close()
+        os.unlink(os.path.join(self.tempDir, INDEX_FILE))
+        self.store = CacheStore(self.tempDir)
+        self.failUnlessEqual(self.store.get("foo")[0], "bar")
+        self.store.put("baz", "qux")
+        self.failUnlessEqual(self.store.get("baz")[0], "qux")
+        self.store.close()
+        self.store = CacheStore(self.tempDir)
+        self.failUnlessEqual(self.store.get("foo")[0], "bar")
+        self.failUnlessEqual(self.store.get("baz")[0], "qux")
+
+    def testCompact(self):
+        for i in range(10):
+            self.store.put("foo", str(i) * 100)
+        self.store.put("bar", "bar")
+        dataFile = os.path.join(self.tempDir, DATA_FILE)
+        size = os.path.getsize(dataFile)
+        self.failUnless(self.store.compact())
+        self.failUnless(os.path.getsize(dataFile) < size)
+        self.failUnlessEqual(self.store.get("foo")[0], "9" * 100)
+        self.failUnlessEqual(self.store.get("bar")[0], "bar")
+
+    def testClear(self):
+        self.store.put("foo", "bar")
+        self.store.clear()
+        self.failUnlessEqual(self.store.get("foo"), (None, None))
+        self.failUnlessEqual(len(self.store), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+
+################################################################################
+#
+#  qooxdoo - the new era of web development
+#
+#  http://qooxdoo.org
+#
+#  Copyright:
+#    2026 The qooxdoo contributors
+#
+#  License:
+#    MIT: https://opensource.org/licenses/MIT
+#    See the LICENSE file in the project's top-level directory for details.
+#
+#  Authors:
+#    * The qooxdoo contributors
+#
+################################################################################
+
+import unittest
+import sys, os, shutil, tempfile
+
+libDir = os.path.abspath(os.path.join(os.pardir, os.pardir, "pylib"))
+sys.path.append(libDir)
+from generator.runtime import Cache as CacheModule
+from generator.runtime import SharedMap
+from generator.runtime.Cache import Cache
+from generator.runtime.InterruptRegistry import InterruptRegistry
+from generator.runtime.Log import Log
+from ecmascript.transform.optimizer import privateoptimizer
+
+class TestSharedMap(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        # two caches on the same folder, like two generator processes
+        self.cache1 = self.newCache()
+        self.cache2 = self.newCache()
+
+    def tearDown(self):
+        CacheModule.memcache.clear()
+        shutil.rmtree(self.tempDir)
+
+    def newCache(self):
+        return Cache(os.path.join(self.tempDir, "cache"),
+            **{ 'interruptRegistry' : InterruptRegistry(), 'console' : Log() })
+
+
+    def testFlushOnce(self):
+        privates = SharedMap.get(self.cache1, "privates", counter=True).map()
+        self.failUnless(SharedMap.get(self.cache1, "privates").map() is privates)
+        privateoptimizer.crypt("a", "__foo", privates)
+        privateoptimizer.crypt("a", "__bar", privates)
+        self.failUnlessEqual(self.cache1.read("privates")[0], None)
+        SharedMap.flushAll(self.cache1)
+        self.failUnlessEqual(self.cache1.read("privates")[0], {"a:__foo" : "__a", "a:__bar" : "__b"})
+        # the unused indexes are given back
+        self.failUnlessEqual(self.cache1.read("privates-next")[0], 2)
+
+    def testConcurrentPrivates(self):
+        privates1 = SharedMap.get(self.cache1, "privates", counter=True).map()
+        privates2 = SharedMap.get(self.cache2, "privates", counter=True).map()
+        repl1 = privateoptimizer.crypt("a", "__foo", privates1)
+        repl2 = privateoptimizer.crypt("b", "__bar", privates2)
+        privateoptimizer.crypt("b", "__foo", privates2)
+        self.failIfEqual(repl1, repl2)
+        SharedMap.flushAll(self.cache2)
+        SharedMap.flushAll(self.cache1)
+        privates = self.cache1.read("privates")[0]
+        self.failUnlessEqual(len(privates), 3)
+        self.failUnlessEqual(len(set(privates.values())), 3)
+        # an existing entry is kept, and used by later builds
+        self.failUnlessEqual(privateoptimizer.crypt("a", "__foo",
+            SharedMap.get(self.cache2, "privates", counter=True).map()), repl1)
+
+    def testOverwrite(self):
+        SharedMap.get(self.cache1, "features", overwrite=True).map()["foo"] = 1
+        SharedMap.get(self.cache2, "features", overwrite=True).map()["foo"] = 2
+        SharedMap.flushAll(self.cache2)
+        SharedMap.flushAll(self.cache1)
+        self.failUnlessEqual(self.cache2.read("features")[0], {"foo" : 1})
+
+    def testFailedFlush(self):
+        SharedMap.get(self.cache1, "privates", counter=True).map()["a:__foo"] = "__a"
+        SharedMap.get(self.cache1, "features", overwrite=True).map()["foo"] = 1
+        def write(*args, **kwargs):
+            raise IOError("disk full")
+        self.cache1.write = write
+        self.assertRaises(IOError, SharedMap.flushAll, self.cache1)
+        del self.cache1.write
+        # no map is kept for the next job
+        self.failIf([x for x in SharedMap._maps if x[0] == id(self.cache1)])
+        self.failUnlessEqual(SharedMap.get(self.cache1, "features").map(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()